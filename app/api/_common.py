@@ -0,0 +1,199 @@
+import logging
+import threading
+import time
+
+from app.api.breaker import CircuitBreaker
+from app.api.rate_limit import RateLimiter
+from app.api.rewrites import RewriteTable
+from app.utils import check_protocol_slashed, parse_version
+from app.data import default
+from app.data.api_configuration import ApiConfiguration
+
+
+class Common:
+    """
+    State shared by ApiConnector and AsyncApiConnector: snapshot of rewrite list, detection of single request update,
+    circuit breaker and rate limiter. Connectors only send requests and pass responses here.
+    """
+
+    def __init__(self, config: ApiConfiguration):
+        """
+
+        :param config:
+        """
+        self.config = config
+        self.host = check_protocol_slashed(config.proto()) + config.host() + ":" + str(config.port())
+
+        # indexed snapshot of /control/rewrite/list shared by all jobs, lock is held while snapshot is replaced or
+        # patched, so successful write is never lost by replacing snapshot with list downloaded at the same time
+        self._rewrites = None
+        self._rewrites_time = 0.0
+        self._rewrites_lock = threading.Lock()
+
+        # None until AdGuardHome version is known
+        self._update_supported = None
+
+        # shared by all jobs, when AdGuardHome is down jobs skip api requests instead of waiting for timeouts
+        self.breaker = CircuitBreaker(threshold=default.Api.breaker_threshold, backoff=default.Api.breaker_backoff,
+                                      backoff_max=default.Api.breaker_backoff_max)
+        self.limiter = RateLimiter(rate=config.rate_limit(), endpoint_rates=config.endpoint_rate_limits())
+
+    def targets(self) -> list:
+        """
+        :return: list of connectors to all AdGuardHome instances
+        """
+        return [self]
+
+    def stats(self) -> list:
+        """
+        :return: list with one dict, state of circuit breaker and number of requests rejected by it
+        """
+        breaker_stats = self.breaker.stats()
+        return [{"target": self.host, "breaker": breaker_stats["state"], "rejected": breaker_stats["rejected"]}]
+
+    def _report(self, response):
+        """
+        Report response to circuit breaker, server errors are failures
+        :param response: requests.Response or HttpResponse
+        :return: response
+        """
+        if response.status_code >= 500:
+            self.breaker.failure()
+        else:
+            self.breaker.success()
+        return response
+
+    def _cached_rewrite_table(self, refresh: bool):
+        """
+        :param refresh: ignore cached snapshot
+        :return: RewriteTable if snapshot is younger than cache_ttl, otherwise None
+        """
+        if refresh is False and self._rewrites is not None and \
+                time.monotonic() - self._rewrites_time < self.config.cache_ttl():
+            return self._rewrites
+        return None
+
+    def _store_rewrite_table(self, response):
+        """
+        Index downloaded rewrite list and keep it as snapshot, caller holds _rewrites_lock
+        :param response: response of /control/rewrite/list, None if request failed
+        :return: RewriteTable, None when request status code was other than 200
+        """
+        if response is None:
+            return None
+
+        if response.status_code == 200:
+            self._rewrites = RewriteTable(entries=response.json())
+            self._rewrites_time = time.monotonic()
+            return self._rewrites
+        else:
+            logging.error(msg=f"Server responded with status code: {response.status_code}")
+            return None
+
+    def _patch_rewrite_table(self, answer: str, domain: str, added: bool):
+        """
+        Apply successful add or delete to cached snapshot, so it doesn't have to be downloaded again
+        :param answer: dns answer
+        :param domain: dns domain
+        :param added: True if entry was added, False if entry was deleted
+        :return:
+        """
+        with self._rewrites_lock:
+            if self._rewrites is None:
+                return
+            if added:
+                self._rewrites.add(answer=answer, domain=domain)
+            else:
+                self._rewrites.delete(answer=answer, domain=domain)
+
+    def _store_version(self, response):
+        """
+        Decide from AdGuardHome version if answer can be changed in single request (/control/rewrite/update)
+        :param response: response of /control/status, None if request failed
+        :return: True if supported, False if not or when AdGuardHome version can't be read
+        """
+        if response is None:
+            return False
+        if response.status_code != 200:
+            logging.error(msg=f"Server responded with status code: {response.status_code}")
+            return False
+
+        version = response.json().get("version", "")
+        self._update_supported = parse_version(version=version) >= default.Api.update_version
+        logging.info(msg=f"AdGuardHome version: {version}, answer update in single request: "
+                         f"{self._update_supported}")
+        return self._update_supported
+
+    @staticmethod
+    def _test_result(response) -> bool:
+        """
+        :param response: response of /control/status, None if request failed
+        :return: True if connection was successful, False if connection was failure
+        """
+        if response is None:
+            logging.error(msg="Can't establish connection to API")
+            return False
+
+        if response.status_code != 200:
+            logging.error(msg=f"Api test fail status code: {response.status_code}")
+            return False
+        else:
+            logging.info(msg="Api test successful")
+            return True
+
+    def _write_result(self, response, answer: str, domain: str, added: bool):
+        """
+        Apply result of add or delete request
+        :param response: response of /control/rewrite/add or /control/rewrite/delete, None if request failed
+        :param answer: dns answer
+        :param domain: dns domain
+        :param added: True if entry was added, False if entry was deleted
+        :return: True if write was successful, None if not
+        """
+        action = "Adding" if added else "Deletion"
+        if response is not None and response.status_code == 200:
+            logging.info(msg=f"{action} of entry successful")
+            self._patch_rewrite_table(answer=answer, domain=domain, added=added)
+            return True
+        elif response is not None:
+            logging.info(msg=f"{action} of entry failed, server status code: {response.status_code}")
+        return None
+
+    def _update_result(self, response, new_answer: str, old_answer: str, domain: str):
+        """
+        Apply result of single request update. When AdGuardHome doesn't know update endpoint, single request update is
+        disabled.
+        :param response: response of /control/rewrite/update, None if request failed
+        :param new_answer: dns answer after change
+        :param old_answer: actual dns answer
+        :param domain: dns domain
+        :return: True if change was successful, None if request status code was other than 200
+        """
+        if response is None:
+            return None
+
+        if response.status_code == 200:
+            logging.info(msg="Update of entry successful")
+            self._patch_rewrite_table(answer=old_answer, domain=domain, added=False)
+            self._patch_rewrite_table(answer=new_answer, domain=domain, added=True)
+            return True
+        elif response.status_code in (404, 405):
+            logging.warning(msg="AdGuardHome doesn't support answer update in single request")
+            self._update_supported = False
+            return None
+        else:
+            logging.info(msg=f"Update of entry failed, server status code: {response.status_code}")
+            return None
+
+    @staticmethod
+    def _update_body(new_answer: str, old_answer: str, domain: str) -> dict:
+        return {
+            "target": {
+                "domain": domain,
+                "answer": old_answer
+            },
+            "update": {
+                "domain": domain,
+                "answer": new_answer
+            }
+        }
@@ -0,0 +1,212 @@
+"""
+Minimal asyncio HTTP/1.1 client with keep-alive connection pool. It supports only what rewrite-helper needs:
+plain requests with json body, basic auth, Content-Length or chunked responses and gzip encoding.
+"""
+import asyncio
+import base64
+import gzip
+import json
+import ssl
+from typing import Union
+from urllib.parse import urlsplit
+
+
+class HttpError(Exception):
+    """
+    Raised when server response can't be parsed
+    """
+    pass
+
+
+class HttpResponse:
+    def __init__(self, status_code: int, headers: dict, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncHttpClient:
+    """
+    Keep idle connections per (scheme, host, port), so following requests to the same server don't open new
+    connection (and don't repeat TLS handshake)
+    """
+
+    def __init__(self, pool_size: int = 10, ssl_context: Union[ssl.SSLContext, None] = None):
+        """
+        :param pool_size: maximum number of idle connections kept per server
+        :param ssl_context: context used by https connections, default context if None
+        """
+        self.pool_size = pool_size
+        self.ssl_context = ssl_context if ssl_context is not None else ssl.create_default_context()
+        self._idle = {}
+        self.opened = 0
+        self.reused = 0
+
+    async def _connect(self, key: tuple, connect_timeout: Union[float, None] = None):
+        scheme, host, port = key
+        self.opened += 1
+        return await asyncio.wait_for(asyncio.open_connection(host=host, port=port,
+                                                              ssl=self.ssl_context if scheme == "https" else None),
+                                      timeout=connect_timeout)
+
+    def _release(self, key: tuple, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, keep_alive: bool):
+        idle = self._idle.setdefault(key, [])
+        if keep_alive and len(idle) < self.pool_size and not reader.at_eof():
+            idle.append((reader, writer))
+        else:
+            writer.close()
+
+    async def request(self, method: str, url: str, json_body=None, auth: Union[tuple, None] = None,
+                      timeout: float = 10, headers: Union[dict, None] = None,
+                      connect_timeout: Union[float, None] = None, max_body: Union[int, None] = None) -> HttpResponse:
+        """
+        Send request, connection is taken from pool if possible. When idle connection was closed by server
+        request is sent again using other connection.
+        :param method: http method
+        :param url: full url, for ex.: http://127.0.0.1:80/control/status
+        :param json_body: object sent as json body
+        :param auth: (username, password) for basic auth
+        :param timeout: maximum time for whole request
+        :param headers: additional request headers
+        :param connect_timeout: maximum time for opening of new connection (and TLS handshake), None - only timeout
+        :param max_body: maximum length of read body, longer body is not read (content is empty) and connection is
+                         closed, None - whole body is read
+        :return: HttpResponse
+        :raises asyncio.TimeoutError: request exceed timeout
+        :raises OSError: connection can't be established or was broken
+        :raises HttpError: response can't be parsed
+        """
+        return await asyncio.wait_for(self._request(method=method, url=url, json_body=json_body, auth=auth,
+                                                    headers=headers, connect_timeout=connect_timeout,
+                                                    max_body=max_body), timeout=timeout)
+
+    async def _request(self, method: str, url: str, json_body, auth, headers, connect_timeout=None,
+                       max_body=None) -> HttpResponse:
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        body = b"" if json_body is None else json.dumps(json_body).encode()
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {parts.hostname}:{port}", "Connection: keep-alive",
+                 "Accept-Encoding: gzip", f"Content-Length: {len(body)}"]
+        if json_body is not None:
+            lines.append("Content-Type: application/json")
+        if auth is not None:
+            token = base64.b64encode(f"{auth[0]}:{auth[1]}".encode()).decode()
+            lines.append(f"Authorization: Basic {token}")
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        data = ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+        idle = self._idle.get(key, [])
+        while len(idle) > 0:
+            reader, writer = idle.pop()
+            try:
+                writer.write(data)
+                await writer.drain()
+                status_line = await reader.readline()
+            except OSError:
+                status_line = b""
+            except BaseException:
+                writer.close()
+                raise
+            if status_line != b"":
+                self.reused += 1
+                return await self._read_response(key, reader, writer, method, status_line, max_body)
+            # idle connection was closed by server, try next one
+            writer.close()
+
+        reader, writer = await self._connect(key, connect_timeout=connect_timeout)
+        try:
+            writer.write(data)
+            await writer.drain()
+            status_line = await reader.readline()
+        except BaseException:
+            writer.close()
+            raise
+        return await self._read_response(key, reader, writer, method, status_line, max_body)
+
+    async def _read_response(self, key: tuple, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                             method: str, status_line: bytes, max_body: Union[int, None] = None) -> HttpResponse:
+        try:
+            version, status_code, headers = await self._read_head(reader=reader, status_line=status_line)
+            content, keep_alive = await self._read_body(reader=reader, method=method, status_code=status_code,
+                                                        headers=headers, max_body=max_body)
+            keep_alive = keep_alive and headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            writer.close()
+            raise HttpError(f"Invalid response: {e}")
+        except BaseException:
+            writer.close()
+            raise
+
+        self._release(key, reader, writer, keep_alive=keep_alive)
+
+        if headers.get("content-encoding", "").lower() == "gzip":
+            content = gzip.decompress(content)
+        return HttpResponse(status_code=status_code, headers=headers, content=content)
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader, status_line: bytes):
+        """
+        :return: http version, status code, headers (lower case names)
+        :raises ValueError: status line is not valid
+        """
+        version, status_code = status_line.decode("latin-1").split(" ", 2)[:2]
+        status_code = int(status_code)
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return version, status_code, headers
+
+    @staticmethod
+    async def _read_body(reader: asyncio.StreamReader, method: str, status_code: int, headers: dict,
+                         max_body: Union[int, None] = None):
+        """
+        :param max_body: maximum length of read body, None - no limit
+        :return: body, True if connection can be used again
+        """
+        if method == "HEAD" or status_code in (204, 304) or 100 <= status_code < 200:
+            return b"", True
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            content = b""
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if max_body is not None and len(content) + size > max_body:
+                    return b"", False
+                if size == 0:
+                    # skip trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    return content, True
+                content += await reader.readexactly(size)
+                await reader.readline()
+
+        if "content-length" in headers:
+            if max_body is not None and int(headers["content-length"]) > max_body:
+                return b"", False
+            return await reader.readexactly(int(headers["content-length"])), True
+
+        # body ends when server closes connection
+        if max_body is not None:
+            return b"", False
+        return await reader.read(), False
+
+    async def close(self):
+        for idle in self._idle.values():
+            for reader, writer in idle:
+                writer.close()
+        self._idle = {}
@@ -0,0 +1,259 @@
+import asyncio
+import logging
+
+from app.api._common import Common
+from app.api.aio_http import AsyncHttpClient, HttpError
+from app.data.api_configuration import ApiConfiguration
+
+
+class AsyncApiConnector(Common):
+    """
+    Asyncio version of ApiConnector, methods have the same arguments and return values but must be awaited.
+    All requests share one pool of keep-alive connections.
+    """
+
+    def __init__(self, config: ApiConfiguration):
+        """
+        Connection is not tested here, await wait_for_connection() to do that
+        :param config:
+        """
+        super().__init__(config=config)
+        self.auth = (config.username(), config.passwd())
+        self.client = AsyncHttpClient(pool_size=config.pool_size() if config.pool_size() > 0 else 10)
+
+        # only one download of rewrite list is in flight
+        self._download_lock = asyncio.Lock()
+
+    async def _request(self, method: str, path: str, json_body=None):
+        """
+        Send request to api using pooled connections. Errors are reported to circuit breaker, request is not sent at
+        all when breaker is open. When rate limit is set, request waits for its turn, writes are sent before waiting
+        reads.
+        :param method: http method
+        :param path: api endpoint, for ex.: /control/status
+        :param json_body: object sent as json body
+        :return: HttpResponse, None if connection error occurs or circuit breaker is open
+        """
+        if self.breaker.allow() is False:
+            logging.debug(msg=f"Api request {method} {path} skipped, circuit breaker is open")
+            return None
+
+        try:
+            await self.limiter.async_acquire(path=path, priority=method != "GET")
+            response = await self.client.request(method=method, url=self.host + path, json_body=json_body,
+                                                 auth=self.auth, timeout=self.config.timeout())
+        except (OSError, asyncio.TimeoutError, HttpError) as e:
+            logging.error(msg=f"Api request {method} {path} failed: {e!r}")
+            self.breaker.failure()
+            return None
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+
+        return self._report(response=response)
+
+    def connection_stats(self):
+        """
+        :return: tuple: (opened connections, reused connections)
+        """
+        return self.client.opened, self.client.reused
+
+    async def close(self):
+        await self.client.close()
+
+    async def wait_for_connection(self):
+        """
+        Wait until connection to AdGuardHome can be established (when startup test is enabled)
+        :return:
+        """
+        if self.config.startup_enable():
+            while await self.test_connection() is False:
+                logging.info(msg="Can't connect do server, retry in 10s")
+                await asyncio.sleep(10)
+
+    async def test_connection(self):
+        """
+        Check if connection to AdGuardHome can be established
+        :return: True if connection was successful, False if connection was failure
+        """
+        return self._test_result(response=await self._request(method="GET", path="/control/status"))
+
+    async def get_rewrite_table(self, refresh: bool = False):
+        """
+        Return snapshot of rewrite list. Snapshot is shared between all jobs and downloaded again when it is older than
+        cache_ttl, concurrent callers wait for the download already in progress instead of starting their own.
+        :param refresh: ignore cached snapshot and download rewrite list again
+        :return: RewriteTable, None when request status code was other than 200
+        """
+        async with self._download_lock:
+            rewrites = self._cached_rewrite_table(refresh=refresh)
+            if rewrites is not None:
+                return rewrites
+
+            response = await self._request(method="GET", path="/control/rewrite/list")
+            with self._rewrites_lock:
+                return self._store_rewrite_table(response=response)
+
+    async def update_supported(self):
+        """
+        Check (once) if AdGuardHome supports changing answer in single request (/control/rewrite/update)
+        :return: True if supported, False if not or when AdGuardHome version can't be read
+        """
+        if self._update_supported is None:
+            return self._store_version(response=await self._request(method="GET", path="/control/status"))
+
+        return self._update_supported
+
+    async def entry_exist(self, answer: str, domain: str):
+        """
+        Check if provided entry (answer and domain) exist in rewrite list
+        :param answer: dns answer
+        :param domain: dns domain
+        :return: True if entry exist, False if not, None when request status code was other than 200
+        """
+        rewrites = await self.get_rewrite_table()
+        if rewrites is None:
+            return None
+
+        return rewrites.entry_exist(answer=answer, domain=domain)
+
+    async def domain_exist(self, domain: str):
+        """
+        Check if provided domain exist in rewrite list
+        :param domain: domain to check
+        :return: True if domain exist, False if not, None when request status code was other than 200
+        """
+        rewrites = await self.get_rewrite_table()
+        if rewrites is None:
+            return None
+
+        return rewrites.domain_exist(domain=domain)
+
+    async def get_answer_of_domain(self, domain: str):
+        """
+        Return dns answer of provided domain
+        :param domain: domain to check
+        :return: str: dns answer (ip address), bool: False if domain not exist or None when request status code was
+                 other than 200
+        """
+        rewrites = await self.get_rewrite_table()
+        if rewrites is None:
+            return None
+
+        return rewrites.answer(domain=domain)
+
+    async def ensure_answer(self, answer: str, domain: str, exclusive: bool = True):
+        """
+        Make sure that AdGuardHome answers domain with provided answer, write only if needed
+        :param answer: dns answer
+        :param domain: dns domain
+        :param exclusive: True - answer must be the (first) answer of domain, other answer is changed,
+                          False - entry must only exist, other answers of domain are kept
+        :return: True if answer is in place (or was written), False if write wasn't successful,
+                 None if other error (such as connection error) occurs
+        """
+        if exclusive is False:
+            exist = await self.entry_exist(answer=answer, domain=domain)
+            if exist is False:
+                return await self.add_entry(answer=answer, domain=domain, check=False)
+            return exist
+
+        actual = await self.get_answer_of_domain(domain=domain)
+        if actual is None:
+            return None
+        elif actual is False:
+            return await self.add_entry(answer=answer, domain=domain, check=False)
+        elif actual != answer:
+            return await self.change_entry_answer(new_answer=answer, old_answer=actual, domain=domain, check=False)
+        return True
+
+    async def delete_entry(self, answer: str, domain: str, check: bool = True):
+        """
+        Remove rewrite entry
+        :param answer: dns answer
+        :param domain: dns domain
+        :param check: check if entry exist before deletion, set to False when caller already knows that
+        :return: True if deletion was successful, False if deletion wasn't successful (for ex. entry does not exist),
+                 None if request status code was other than 200
+        """
+        logging.info(msg=f"Processing entry (remove) {domain} {answer}")
+        exist = await self.entry_exist(answer=answer, domain=domain) if check else True
+
+        if exist:
+            response = await self._request(method="POST", path="/control/rewrite/delete",
+                                           json_body={"domain": domain, "answer": answer})
+            return self._write_result(response=response, answer=answer, domain=domain, added=False)
+
+        elif exist is None:
+            logging.info(msg="Deletion of entry failed due to previous errors")
+            return None
+        else:
+            logging.info(msg="Deletion of entry failed (does entry exist ?)")
+            return False
+
+    async def add_entry(self, answer: str, domain: str, check: bool = True):
+        """
+        Add rewrite entry
+        :param answer: dns answer
+        :param domain: dns domain
+        :param check: check if entry not exist before adding, set to False when caller already knows that
+        :return: True if entry was added successful, False if entry wasn't added (for ex. entry exist)
+                 None if other error (such as connection error) occurs
+        """
+        logging.info(msg=f"Processing entry (add) {domain} {answer}")
+        exist = await self.entry_exist(answer=answer, domain=domain) if check else False
+
+        if not exist:
+            response = await self._request(method="POST", path="/control/rewrite/add",
+                                           json_body={"domain": domain, "answer": answer})
+            return self._write_result(response=response, answer=answer, domain=domain, added=True)
+
+        elif exist is None:
+            logging.info(msg="Adding of entry failed due to previous errors")
+            return None
+
+        else:
+            logging.info(msg="Adding of entry failed (does entry exist ?)")
+            return False
+
+    async def change_entry_answer(self, new_answer: str, old_answer: str, domain: str, check: bool = True):
+        """
+        Change answer of dns rewrite entry
+        :param new_answer: dns answer after change
+        :param old_answer: actual dns answer
+        :param domain: dns domain
+        :param check: check if old entry exist before change, set to False when caller already knows that
+        :return: True if change was successful , False if change wasn't successful
+                 None if other error (such ad invalid passwd or network connection error) occurs
+        """
+        logging.info(msg=f"Processing entry (change) {domain} from {old_answer} to {new_answer}")
+
+        if check:
+            status = await self.entry_exist(answer=old_answer, domain=domain)
+            if status is not True:
+                return status
+
+        if await self.update_supported():
+            status = await self.update_entry(new_answer=new_answer, old_answer=old_answer, domain=domain)
+            if self._update_supported:
+                return status
+
+        status = await self.delete_entry(answer=old_answer, domain=domain, check=check)
+        if status:
+            return await self.add_entry(answer=new_answer, domain=domain, check=check)
+        else:
+            return status
+
+    async def update_entry(self, new_answer: str, old_answer: str, domain: str):
+        """
+        Change answer of dns rewrite entry in single request. When AdGuardHome doesn't know update endpoint,
+        single request update is disabled.
+        :param new_answer: dns answer after change
+        :param old_answer: actual dns answer
+        :param domain: dns domain
+        :return: True if change was successful, None if request status code was other than 200
+        """
+        response = await self._request(method="PUT", path="/control/rewrite/update",
+                                       json_body=self._update_body(new_answer=new_answer, old_answer=old_answer,
+                                                                   domain=domain))
+        return self._update_result(response=response, new_answer=new_answer, old_answer=old_answer, domain=domain)
@@ -0,0 +1,107 @@
+import logging
+import random
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """
+    Shared by all threads using one AdGuardHome instance. After several failed requests in a row breaker opens and
+    requests are rejected without touching network. When backoff time elapses, single trial request is let through
+    (half-open): success closes breaker, failure opens it again for twice as long (with random jitter, so threads
+    of more rewrite-helpers don't retry at the same moment).
+    """
+
+    def __init__(self, threshold: int, backoff: float, backoff_max: float, jitter: float = 0.5):
+        """
+        :param threshold: number of failures in a row which opens breaker
+        :param backoff: time (in seconds) for which breaker is opened first time
+        :param backoff_max: maximum time for which breaker is opened
+        :param jitter: part of backoff which is random, 0 - no jitter
+        """
+        self.threshold = threshold
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened = 0  # number of openings since breaker was closed last time
+        self._open_until = 0.0
+        self._trial = False
+        self.transitions = {"closed->open": 0, "open->half-open": 0, "half-open->closed": 0, "half-open->open": 0}
+        self.rejected = 0
+
+    def _transition(self, state: str):
+        self.transitions[f"{self._state}->{state}"] += 1
+        logging.info(msg=f"Api circuit breaker {self._state} -> {state}")
+        self._state = state
+
+    def _open(self):
+        self._opened += 1
+        backoff = min(self.backoff_max, self.backoff * 2 ** (self._opened - 1))
+        backoff = backoff * (1 - self.jitter * random.random())
+        self._open_until = time.monotonic() + backoff
+        self._transition(state=OPEN)
+
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def stats(self) -> dict:
+        """
+        :return: actual state, number of rejected requests and number of every state transition
+        """
+        with self._lock:
+            return {"state": self._state, "rejected": self.rejected, **self.transitions}
+
+    def allow(self) -> bool:
+        """
+        Check if request can be sent, caller must report result using success() or failure()
+        :return: True if request can be sent
+        """
+        with self._lock:
+            if self._state == OPEN and time.monotonic() >= self._open_until:
+                self._transition(state=HALF_OPEN)
+                self._trial = False
+
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._trial is False:
+                self._trial = True
+                return True
+
+            self.rejected += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state == HALF_OPEN:
+                self._opened = 0
+                self._trial = False
+                self._transition(state=CLOSED)
+
+    def failure(self):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial = False
+                self._open()
+            elif self._state == CLOSED:
+                self._failures += 1
+                if self._failures >= self.threshold:
+                    self._failures = 0
+                    self._open()
+
+    def release(self):
+        """
+        Request ended without result (for ex. it was cancelled), trial request of half-open breaker can be sent again
+        """
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trial = False
@@ -1,26 +1,80 @@
 import logging
 import time
 import requests
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
 from requests.auth import HTTPBasicAuth
 
-from app.utils import check_protocol_slashed
+from app.api._common import Common
 from app.data.api_configuration import ApiConfiguration
 
 
-class ApiConnector:
+class ApiConnector(Common):
     """
     Realize connection between script and adguardhome, add, remove or change dns rewrite entries
     """
 
     def __init__(self, config: ApiConfiguration):
         """
-
+        Connection is not tested here, call wait_for_connection() to do that
         :param config:
         """
-        self.config = config
-        self.host = check_protocol_slashed(config.proto()) + config.host() + ":" + str(config.port())
+        super().__init__(config=config)
         self.auth = HTTPBasicAuth(config.username(), config.passwd())
 
+        # one pool of keep-alive connections shared by all jobs threads, pool size should match number of jobs, so no
+        # thread has to open its own connection
+        pool_size = config.pool_size() if config.pool_size() > 0 else DEFAULT_POOLSIZE
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session = requests.Session()
+        self.session.auth = self.auth
+        self.session.headers.update({"Accept-Encoding": "gzip"})
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+    def _request(self, method: str, path: str, **kwargs):
+        """
+        Send request to api using pooled session. Connection errors, timeouts, broken responses and server errors are
+        reported to circuit breaker, request is not sent at all when breaker is open. When rate limit is set, request waits for its
+        turn, writes are sent before waiting reads.
+        :param method: http method
+        :param path: api endpoint, for ex.: /control/status
+        :param kwargs: passed to requests
+        :return: requests.Response, None if connection error occurs or breaker is open
+        """
+        if self.breaker.allow() is False:
+            logging.debug(msg=f"Api request {method} {path} skipped, circuit breaker is open")
+            return None
+
+        self.limiter.acquire(path=path, priority=method != "GET")
+        try:
+            response = self.session.request(method=method, url=self.host + path, timeout=self.config.timeout(),
+                                            **kwargs)
+        except requests.exceptions.RequestException as e:
+            logging.error(msg=f"Api request {method} {path} failed: {e!r}")
+            self.breaker.failure()
+            return None
+
+        return self._report(response=response)
+
+    def connection_stats(self):
+        """
+        Count connections opened to api and requests which reused already opened connection
+        :return: tuple: (opened connections, reused connections)
+        """
+        opened = 0
+        requests_count = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools[key]
+            opened += pool.num_connections
+            requests_count += pool.num_requests
+        return opened, requests_count - opened
+
+    def wait_for_connection(self):
+        """
+        Wait until connection to AdGuardHome can be established (when startup test is enabled)
+        :return:
+        """
         if self.config.startup_enable():
             while self.test_connection() is False:
                 logging.info(msg="Can't connect do server, retry in 10s")
@@ -31,20 +85,31 @@ class ApiConnector:
         Check if connection to AdGuardHome can be established
         :return: True if connection was successful, False if connection was failure
         """
-        url = self.host + "/control/status"
-        try:
-            response = requests.get(url=url, auth=self.auth, timeout=self.config.timeout())
+        return self._test_result(response=self._request(method="GET", path="/control/status"))
 
-            if response.status_code != 200:
-                logging.error(msg=f"Api test fail status code: {response.status_code}")
-                return False
-            else:
-                logging.info(msg="Api test successful")
-                return True
+    def get_rewrite_table(self, refresh: bool = False):
+        """
+        Return snapshot of rewrite list. Snapshot is shared between all jobs and downloaded again when it is older than
+        cache_ttl, concurrent callers wait for the download already in progress instead of starting their own.
+        :param refresh: ignore cached snapshot and download rewrite list again
+        :return: RewriteTable, None when request status code was other than 200
+        """
+        with self._rewrites_lock:
+            rewrites = self._cached_rewrite_table(refresh=refresh)
+            if rewrites is not None:
+                return rewrites
 
-        except requests.ConnectionError:
-            logging.error(msg="Can't establish connection to API")
-            return False
+            return self._store_rewrite_table(response=self._request(method="GET", path="/control/rewrite/list"))
+
+    def update_supported(self):
+        """
+        Check (once) if AdGuardHome supports changing answer in single request (/control/rewrite/update)
+        :return: True if supported, False if not or when AdGuardHome version can't be read
+        """
+        if self._update_supported is None:
+            return self._store_version(response=self._request(method="GET", path="/control/status"))
+
+        return self._update_supported
 
     def entry_exist(self, answer: str, domain: str):
         """
@@ -53,52 +118,24 @@ class ApiConnector:
         :param domain: dns domain
         :return: True if entry exist, False if not, None when request status code was other than 200
         """
-        url = self.host + "/control/rewrite/list"
-        try:
-            response = requests.get(url=url, auth=self.auth, timeout=self.config.timeout())
-
-            if response.status_code == 200:
-                for entry in response.json():
-
-                    if entry["domain"] == domain and entry["answer"] == answer:
-                        return True
-
-                return False
-
-            else:
-                logging.error(msg=f"Server responded with status code: {response.status_code}")
-                return None
-
-        except requests.exceptions.ConnectionError as e:
-            logging.error(e)
+        rewrites = self.get_rewrite_table()
+        if rewrites is None:
             return None
 
+        return rewrites.entry_exist(answer=answer, domain=domain)
+
     def domain_exist(self, domain: str):
         """
         Check if provided domain exist in rewrite list. Check is simple '1:1 check',
         :param domain: domain to check
         :return: True if domain exist, False if not, None when request status code was other than 200
         """
-        url = self.host + "/control/rewrite/list"
-        try:
-            response = requests.get(url=url, auth=self.auth, timeout=self.config.timeout())
-
-            if response.status_code == 200:
-                for entry in response.json():
-
-                    if entry["domain"] == domain:
-                        return True
-
-                return False
-
-            else:
-                logging.error(msg=f"Server responded with status code: status code: {response.status_code}")
-                return None
-
-        except requests.exceptions.ConnectionError as e:
-            logging.error(e)
+        rewrites = self.get_rewrite_table()
+        if rewrites is None:
             return None
 
+        return rewrites.domain_exist(domain=domain)
+
     def get_answer_of_domain(self, domain: str):
         """
         Return dns answer of provided domain
@@ -106,50 +143,56 @@ class ApiConnector:
         :return: str: dns answer (ip address), bool: False if domain not exist or N
                       one when request status code was other than 200
         """
-        url = self.host + "/control/rewrite/list"
-        try:
-            response = requests.get(url=url, auth=self.auth, timeout=self.config.timeout())
-
-            if response.status_code == 200:
-                for entry in response.json():
-
-                    if entry["domain"] == domain:
-                        return entry["answer"]
-
-                return False
+        rewrites = self.get_rewrite_table()
+        if rewrites is None:
+            return None
 
-            else:
-                logging.error(msg=f"Server responded with status code: {response.status_code}")
-                return None
+        return rewrites.answer(domain=domain)
 
-        except requests.exceptions.ConnectionError as e:
-            logging.error(e)
+    def ensure_answer(self, answer: str, domain: str, exclusive: bool = True):
+        """
+        Make sure that AdGuardHome answers domain with provided answer, write only if needed
+        :param answer: dns answer
+        :param domain: dns domain
+        :param exclusive: True - answer must be the (first) answer of domain, other answer is changed,
+                          False - entry must only exist, other answers of domain are kept
+        :return: True if answer is in place (or was written), False if write wasn't successful,
+                 None if other error (such as connection error) occurs
+        """
+        if exclusive is False:
+            exist = self.entry_exist(answer=answer, domain=domain)
+            if exist is False:
+                return self.add_entry(answer=answer, domain=domain, check=False)
+            return exist
+
+        actual = self.get_answer_of_domain(domain=domain)
+        if actual is None:
             return None
+        elif actual is False:
+            return self.add_entry(answer=answer, domain=domain, check=False)
+        elif actual != answer:
+            return self.change_entry_answer(new_answer=answer, old_answer=actual, domain=domain, check=False)
+        return True
 
-    def delete_entry(self, answer: str, domain: str):
+    def delete_entry(self, answer: str, domain: str, check: bool = True):
         """
         Remove rewrite entry
         :param answer: dns answer
         :param domain: dns domain
+        :param check: check if entry exist before deletion, set to False when caller already knows that
         :return: True if deletion was successful, False if deletion wasn't successful (for ex. entry does not exist),
                  None if request status code was other than 200
         """
         logging.info(msg=f"Processing entry (remove) {domain} {answer}")
-        exist = self.entry_exist(answer=answer, domain=domain)
+        exist = self.entry_exist(answer=answer, domain=domain) if check else True
 
         if exist:
-            url = self.host + "/control/rewrite/delete"
             data = {
                 "domain": domain,
                 "answer": answer
             }
-            response = requests.post(url=url, json=data, auth=self.auth, timeout=self.config.timeout())
-            if response.status_code == 200:
-                logging.info(msg="Deletion of entry successful")
-                return True
-            else:
-                logging.info(msg="Deletion of entry failed, server status code: {response.status_code}")
-                return None
+            response = self._request(method="POST", path="/control/rewrite/delete", json=data)
+            return self._write_result(response=response, answer=answer, domain=domain, added=False)
 
         elif exist is None:
             logging.info(msg="Deletion of entry failed due to previous errors")
@@ -158,30 +201,25 @@ class ApiConnector:
             logging.info(msg="Deletion of entry failed (does entry exist ?)")
             return False
 
-    def add_entry(self, answer: str, domain: str):
+    def add_entry(self, answer: str, domain: str, check: bool = True):
         """
         Add rewrite entry
         :param answer: dns answer
         :param domain: dns domain
+        :param check: check if entry not exist before adding, set to False when caller already knows that
         :return: True if entry was added successful, False if entry wasn't added (for ex. entry exist)
                  None if other error (such as connection error) occurs
         """
         logging.info(msg=f"Processing entry (add) {domain} {answer}")
-        exist = self.entry_exist(answer=answer, domain=domain)
+        exist = self.entry_exist(answer=answer, domain=domain) if check else False
 
         if not exist:
-            url = self.host + "/control/rewrite/add"
             data = {
                 "domain": domain,
                 "answer": answer
             }
-            response = requests.post(url=url, json=data, auth=self.auth, timeout=self.config.timeout())
-            if response.status_code == 200:
-                logging.info(msg="Adding of entry successful")
-                return True
-            else:
-                logging.info(msg=f"Adding of entry failed, server status code: {response.status_code}")
-                return None
+            response = self._request(method="POST", path="/control/rewrite/add", json=data)
+            return self._write_result(response=response, answer=answer, domain=domain, added=True)
 
         elif exist is None:
             logging.info(msg="Adding of entry failed due to previous errors")
@@ -191,24 +229,44 @@ class ApiConnector:
             logging.info(msg="Adding of entry failed (does entry exist ?)")
             return False
 
-    def change_entry_answer(self, new_answer: str, old_answer: str, domain: str):
+    def change_entry_answer(self, new_answer: str, old_answer: str, domain: str, check: bool = True):
         """
         Change answer of dns rewrite entry
         :param new_answer: dns answer after change
         :param old_answer: actual dns answer
         :param domain: dns domain
+        :param check: check if old entry exist before change, set to False when caller already knows that
         :return: True if change was successful , False if change wasn't successful
                  None if other error (such ad invalid passwd or network connection error) occurs
         """
         logging.info(msg=f"Processing entry (change) {domain} from {old_answer} to {new_answer}")
 
-        status = self.entry_exist(answer=old_answer, domain=domain)
-        if status is not True:
-            return status
+        if check:
+            status = self.entry_exist(answer=old_answer, domain=domain)
+            if status is not True:
+                return status
+
+        if self.update_supported():
+            status = self.update_entry(new_answer=new_answer, old_answer=old_answer, domain=domain)
+            if self._update_supported:
+                return status
 
-        status = self.delete_entry(answer=old_answer, domain=domain)
+        status = self.delete_entry(answer=old_answer, domain=domain, check=check)
         if status:
-            status = self.add_entry(answer=new_answer, domain=domain)
+            status = self.add_entry(answer=new_answer, domain=domain, check=check)
             return status
         else:
             return status
+
+    def update_entry(self, new_answer: str, old_answer: str, domain: str):
+        """
+        Change answer of dns rewrite entry in single request, domain has an answer all the time. When AdGuardHome
+        doesn't know update endpoint, single request update is disabled.
+        :param new_answer: dns answer after change
+        :param old_answer: actual dns answer
+        :param domain: dns domain
+        :return: True if change was successful, None if request status code was other than 200
+        """
+        response = self._request(method="PUT", path="/control/rewrite/update",
+                                 json=self._update_body(new_answer=new_answer, old_answer=old_answer, domain=domain))
+        return self._update_result(response=response, new_answer=new_answer, old_answer=old_answer, domain=domain)
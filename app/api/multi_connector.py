@@ -0,0 +1,172 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.api.connector import ApiConnector
+
+
+class ApiTarget:
+    """
+    Single AdGuardHome instance of MultiApiConnector: connector with own connection pool and circuit breaker (retry
+    state), executor and latency statistics
+    """
+
+    def __init__(self, connector: ApiConnector, workers: int):
+        self.connector = connector
+        self.name = connector.host
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="api-" + connector.config.host())
+
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.latency = 0.0
+        self.requests = 0
+
+    def call(self, method: str, **kwargs):
+        """
+        Call connector method, update failures and latency. When connector's circuit breaker is open, method returns
+        None without sending any request.
+        :param method: name of ApiConnector method
+        :param kwargs: passed to method
+        :return: value returned by method, None if request raised exception
+        """
+        start = time.monotonic()
+        try:
+            status = getattr(self.connector, method)(**kwargs)
+        except Exception as e:
+            logging.error(msg=f"Api target {self.name} {method} failed: {e!r}")
+            status = None
+        elapsed = time.monotonic() - start
+
+        with self.lock:
+            self.requests += 1
+            # exponential moving average, last requests have the biggest weight
+            self.latency = elapsed if self.requests == 1 else 0.8 * self.latency + 0.2 * elapsed
+            if status is None:
+                self.failures += 1
+                logging.warning(msg=f"Api target {self.name} failed {self.failures}x")
+            else:
+                self.failures = 0
+        return status
+
+    def stats(self) -> dict:
+        breaker_stats = self.connector.breaker.stats()
+        with self.lock:
+            return {"target": self.name, "failures": self.failures, "latency": self.latency,
+                    "requests": self.requests, "breaker": breaker_stats["state"],
+                    "rejected": breaker_stats["rejected"]}
+
+
+class MultiApiConnector:
+    """
+    Same interface as ApiConnector, but writes go to several AdGuardHome instances at once. Every instance has its own
+    connection pool, circuit breaker and executor, so slow or dead instance doesn't delay writes to the others. Reads
+    are answered by the first available instance.
+    """
+
+    def __init__(self, connectors: list, workers: int = 0):
+        """
+        :param connectors: list of configured ApiConnector classes, first is primary (used for reads)
+        :param workers: maximum number of concurrent requests to single instance, 0 - instance pool size
+        """
+        self.connectors = connectors
+        self._targets = [ApiTarget(connector=connector, workers=workers or max(1, connector.config.pool_size()))
+                         for connector in connectors]
+
+    def targets(self) -> list:
+        """
+        :return: list of connectors to all AdGuardHome instances
+        """
+        return list(self.connectors)
+
+    def stats(self) -> list:
+        """
+        :return: list of dicts, failures, breaker state, requests rejected by breaker and latency of every instance
+        """
+        return [target.stats() for target in self._targets]
+
+    def connection_stats(self):
+        """
+        :return: tuple: (opened connections, reused connections) of all instances
+        """
+        opened = 0
+        reused = 0
+        for connector in self.connectors:
+            target_opened, target_reused = connector.connection_stats()
+            opened += target_opened
+            reused += target_reused
+        return opened, reused
+
+    def wait_for_connection(self):
+        """
+        Wait until connection to any instance can be established (when startup test of primary is enabled). Instances
+        which are not accessible are not waited for, their circuit breakers skip requests until they come up.
+        :return:
+        """
+        if self.connectors[0].config.startup_enable():
+            while any([connector.test_connection() for connector in self.connectors]) is False:
+                logging.info(msg="Can't connect do any server, retry in 10s")
+                time.sleep(10)
+
+    def _read(self, method: str, **kwargs):
+        """
+        Ask instances one by one until one of them answers
+        :return: first value other than None
+        """
+        for target in self._targets:
+            status = target.call(method=method, **kwargs)
+            if status is not None:
+                return status
+        return None
+
+    def _write(self, method: str, **kwargs):
+        """
+        Call method on all instances in parallel. Write is confirmed only when all instances confirm it, so caller
+        (job or write queue) retries write which failed on any instance. Instance with open circuit breaker fails
+        without sending request, so dead instance doesn't delay the others.
+        :return: True if write was successful on all instances, False if at least one instance refused it, None if
+                 at least one instance failed
+        """
+        futures = [target.executor.submit(target.call, method, **kwargs) for target in self._targets]
+        statuses = [future.result() for future in futures]
+        if all(status is True for status in statuses):
+            return True
+        return False if False in statuses else None
+
+    def update_supported(self):
+        """
+        :return: True if all instances supports single request update
+        """
+        return all([target.call(method="update_supported") for target in self._targets])
+
+    def test_connection(self):
+        return self._read(method="test_connection")
+
+    def get_rewrite_table(self, refresh: bool = False):
+        return self._read(method="get_rewrite_table", refresh=refresh)
+
+    def entry_exist(self, answer: str, domain: str):
+        return self._read(method="entry_exist", answer=answer, domain=domain)
+
+    def domain_exist(self, domain: str):
+        return self._read(method="domain_exist", domain=domain)
+
+    def get_answer_of_domain(self, domain: str):
+        return self._read(method="get_answer_of_domain", domain=domain)
+
+    def ensure_answer(self, answer: str, domain: str, exclusive: bool = True):
+        """
+        Every instance compares answer with its own rewrite list, so instances which drifted apart are fixed
+        """
+        return self._write(method="ensure_answer", answer=answer, domain=domain, exclusive=exclusive)
+
+    def delete_entry(self, answer: str, domain: str, check: bool = True):
+        # rewrite lists of instances may differ, every instance checks its own
+        return self._write(method="delete_entry", answer=answer, domain=domain, check=True)
+
+    def add_entry(self, answer: str, domain: str, check: bool = True):
+        return self._write(method="add_entry", answer=answer, domain=domain, check=True)
+
+    def change_entry_answer(self, new_answer: str, old_answer: str, domain: str, check: bool = True):
+        # old answer is known only for primary instance, so others just get new answer
+        return self._write(method="ensure_answer", answer=new_answer, domain=domain)
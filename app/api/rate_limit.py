@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+
+# seconds between checks of asyncio request waiting until priority requests are sent
+PRIORITY_POLL = 0.01
+
+
+class TokenBucket:
+    """
+    Bucket filled with `rate` tokens per second, it holds at most `rate` tokens (one second of traffic), so requests
+    which were not sent for a while can't be sent in one big burst
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """
+        :return: time until bucket has one token
+        """
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+
+class RateLimiter:
+    """
+    Limit number of api requests per second, globally and per endpoint. Priority requests (writes) are always served
+    before waiting normal requests (reads).
+    """
+
+    def __init__(self, rate: float, endpoint_rates: dict):
+        """
+        :param rate: maximum number of all requests per second, 0 - no global limit
+        :param endpoint_rates: endpoint path -> maximum number of requests per second to that endpoint
+        """
+        self._buckets = {path: TokenBucket(rate=endpoint_rate) for path, endpoint_rate in endpoint_rates.items()
+                         if endpoint_rate > 0}
+        self._global = TokenBucket(rate=rate) if rate > 0 else None
+        self._condition = threading.Condition()
+        self._priority_waiting = 0
+        self.delayed = 0
+
+    def enabled(self) -> bool:
+        return self._global is not None or len(self._buckets) > 0
+
+    def _buckets_of(self, path: str) -> list:
+        return [bucket for bucket in (self._global, self._buckets.get(path)) if bucket is not None]
+
+    def _take(self, buckets: list, priority: bool):
+        """
+        Take one token from every bucket if all of them have one, caller holds condition
+        :return: 0 if tokens were taken, otherwise time to wait, None - wait until priority requests are sent
+        """
+        now = time.monotonic()
+        for bucket in buckets:
+            bucket.refill(now=now)
+
+        if priority or self._priority_waiting == 0:
+            if all([bucket.tokens >= 1 for bucket in buckets]):
+                for bucket in buckets:
+                    bucket.tokens -= 1
+                return 0
+            return max([bucket.wait_time() for bucket in buckets])
+        return None
+
+    def acquire(self, path: str, priority: bool = False):
+        """
+        Wait until request can be sent
+        :param path: api endpoint, for ex.: /control/rewrite/list
+        :param priority: True if request must be sent before all waiting normal requests
+        :return:
+        """
+        buckets = self._buckets_of(path=path)
+        if len(buckets) == 0:
+            return
+
+        with self._condition:
+            if priority:
+                self._priority_waiting += 1
+            try:
+                delayed = False
+                while True:
+                    wait = self._take(buckets=buckets, priority=priority)
+                    if wait == 0:
+                        return
+
+                    if delayed is False:
+                        delayed = True
+                        self.delayed += 1
+                    self._condition.wait(timeout=wait)
+            finally:
+                if priority:
+                    self._priority_waiting -= 1
+                self._condition.notify_all()
+
+    async def async_acquire(self, path: str, priority: bool = False):
+        """
+        Asyncio version of acquire(), waiting doesn't block event loop. Limits are shared with acquire().
+        :param path: api endpoint, for ex.: /control/rewrite/list
+        :param priority: True if request must be sent before all waiting normal requests
+        :return:
+        """
+        buckets = self._buckets_of(path=path)
+        if len(buckets) == 0:
+            return
+
+        with self._condition:
+            if priority:
+                self._priority_waiting += 1
+        try:
+            delayed = False
+            while True:
+                with self._condition:
+                    wait = self._take(buckets=buckets, priority=priority)
+                if wait == 0:
+                    return
+
+                if delayed is False:
+                    delayed = True
+                    self.delayed += 1
+                # condition can't be awaited, waiting for priority requests is polled
+                await asyncio.sleep(wait if wait is not None else PRIORITY_POLL)
+        finally:
+            with self._condition:
+                if priority:
+                    self._priority_waiting -= 1
+                self._condition.notify_all()
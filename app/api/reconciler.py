@@ -0,0 +1,116 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.api.connector import ApiConnector
+from app.api.rewrites import RewriteTable
+
+
+class Reconciler(threading.Thread):
+    """
+    Write answers published by jobs to AdGuardHome. Once per tick rewrite list is downloaded once, compared with
+    answers wanted by all jobs and only differences are written, so api traffic depends on number of changes
+    instead of number of jobs. When there are more AdGuardHome instances, every instance is reconciled separately
+    and at the same time, so slow instance doesn't delay the others.
+    """
+
+    def __init__(self, api_connect: ApiConnector, interval: int, workers: int):
+        """
+        :param api_connect: configured ApiConnector (or MultiApiConnector) class
+        :param interval: seconds between ticks
+        :param workers: maximum number of writes done at the same time
+        """
+        threading.Thread.__init__(self)
+        self.api_connector = api_connect
+        self.interval = interval
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+
+        # domain -> (answer, exclusive)
+        self._desired = {}
+        self._lock = threading.Lock()
+
+    def publish(self, domain: str, answer, exclusive: bool = True):
+        """
+        Set answer which job wants for domain, it will be written on next tick
+        :param domain: dns domain
+        :param answer: dns answer, None if job has no preference (for ex. all hosts are down)
+        :param exclusive: True - answer must be the answer of domain (other answer is changed),
+                          False - entry must only exist
+        :return:
+        """
+        with self._lock:
+            if answer is None:
+                self._desired.pop(domain, None)
+            else:
+                self._desired[domain] = (answer, exclusive)
+
+    def diff(self, rewrites: RewriteTable) -> list:
+        """
+        Compare published answers with rewrite list
+        :param rewrites: actual rewrite list
+        :return: list of changes (domain, new answer, old answer), old answer is False when entry must be added
+        """
+        with self._lock:
+            desired = list(self._desired.items())
+
+        changes = []
+        for domain, (answer, exclusive) in desired:
+            if exclusive:
+                actual = rewrites.answer(domain=domain)
+                if actual != answer:
+                    changes.append((domain, answer, actual))
+            elif rewrites.entry_exist(answer=answer, domain=domain) is False:
+                changes.append((domain, answer, False))
+        return changes
+
+    def apply(self, change: tuple, api_connect: ApiConnector = None):
+        """
+        Write single change, rewrite list was checked by diff() so connector doesn't check it again
+        :param change: (domain, new answer, old answer)
+        :param api_connect: instance where change is written, None - all instances
+        :return: status returned by connector
+        """
+        if api_connect is None:
+            api_connect = self.api_connector
+        domain, answer, old_answer = change
+        if old_answer is False:
+            return api_connect.add_entry(answer=answer, domain=domain, check=False)
+        return api_connect.change_entry_answer(new_answer=answer, old_answer=old_answer, domain=domain, check=False)
+
+    def reconcile_target(self, api_connect: ApiConnector):
+        """
+        Download rewrite list of single instance, and write all differences
+        :param api_connect: instance to reconcile
+        :return: number of changes, None if rewrite list can't be downloaded
+        """
+        rewrites = api_connect.get_rewrite_table(refresh=True)
+        if rewrites is None:
+            logging.error(msg=f"Reconcile of {api_connect.host} skipped, can't download rewrite list")
+            return None
+
+        changes = self.diff(rewrites=rewrites)
+        if len(changes) > 0:
+            statuses = list(self.executor.map(lambda change: self.apply(change=change, api_connect=api_connect),
+                                              changes))
+            logging.info(msg=f"Reconcile of {api_connect.host}: {statuses.count(True)} of {len(changes)} changes "
+                             f"written")
+        return len(changes)
+
+    def reconcile(self):
+        """
+        Reconcile all instances
+        :return: number of changes, None if rewrite list can't be downloaded from any instance
+        """
+        targets = self.api_connector.targets()
+        if len(targets) == 1:
+            return self.reconcile_target(api_connect=targets[0])
+
+        with ThreadPoolExecutor(max_workers=len(targets)) as executor:
+            counts = [count for count in executor.map(self.reconcile_target, targets) if count is not None]
+        return sum(counts) if len(counts) > 0 else None
+
+    def run(self):
+        while True:
+            self.reconcile()
+            time.sleep(self.interval)
@@ -0,0 +1,57 @@
+class RewriteTable:
+    """
+    Rewrite list downloaded from AdGuardHome indexed by domain. Answers of every domain are kept in the same order as
+    AdGuardHome returned them, so the first answer is the one which was returned by linear scan of the list.
+    """
+
+    def __init__(self, entries: list):
+        """
+        Build index, it's done once per download of rewrite list
+        :param entries: rewrite list as returned by /control/rewrite/list
+        """
+        # domain -> answers (dict used as ordered set), answers of domain are replaced not modified, so readers
+        # never see them changing
+        self._answers = {}
+        for entry in entries:
+            self._answers.setdefault(entry["domain"], {})[entry["answer"]] = None
+
+    def __len__(self):
+        return sum(len(answers) for answers in self._answers.values())
+
+    def entry_exist(self, answer: str, domain: str) -> bool:
+        return answer in self._answers.get(domain, ())
+
+    def domain_exist(self, domain: str) -> bool:
+        return domain in self._answers
+
+    def answers(self, domain: str) -> list:
+        """
+        :param domain: dns domain
+        :return: all answers of domain, empty list if domain not exist
+        """
+        return list(self._answers.get(domain, ()))
+
+    def answer(self, domain: str):
+        """
+        :param domain: dns domain
+        :return: str: first answer of domain, False if domain not exist
+        """
+        for answer in self._answers.get(domain, ()):
+            return answer
+        return False
+
+    def domains(self) -> list:
+        return list(self._answers)
+
+    def add(self, answer: str, domain: str) -> None:
+        answers = dict(self._answers.get(domain, {}))
+        answers[answer] = None
+        self._answers[domain] = answers
+
+    def delete(self, answer: str, domain: str) -> None:
+        answers = dict(self._answers.get(domain, {}))
+        answers.pop(answer, None)
+        if len(answers) > 0:
+            self._answers[domain] = answers
+        else:
+            self._answers.pop(domain, None)
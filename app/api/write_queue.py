@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+
+from app.api.connector import ApiConnector
+from app.data import default
+
+# seconds between reports of queue statistics
+REPORT_INTERVAL = 60
+
+
+class WriteQueue(threading.Thread):
+    """
+    Single writer of answers published by jobs. Writes waiting in queue for the same domain are collapsed to the latest
+    answer and writes for the same domain are spaced, so host which flaps doesn't make AdGuardHome rewrite its
+    configuration file on every change. Failed write is queued again, unless job published other answer meanwhile, and
+    retried after backoff which doubles with every failure of domain, so queue doesn't spin while AdGuardHome is down.
+    """
+
+    def __init__(self, api_connect: ApiConnector, spacing: float, retry_backoff: float = default.Api.breaker_backoff,
+                 retry_backoff_max: float = default.Api.breaker_backoff_max):
+        """
+        :param api_connect: configured ApiConnector class
+        :param spacing: minimum time (in seconds) between two writes for the same domain
+        :param retry_backoff: time (in seconds) before first retry of failed write
+        :param retry_backoff_max: maximum time (in seconds) before retry of failed write
+        """
+        threading.Thread.__init__(self)
+        self.api_connector = api_connect
+        self.spacing = spacing
+        self.retry_backoff = retry_backoff
+        self.retry_backoff_max = retry_backoff_max
+
+        # domain -> (answer, exclusive), dict keeps order in which domains were queued
+        self._pending = {}
+        # domain -> (answer, exclusive) published last time, failed write is queued again only if it is still wanted
+        self._published = {}
+        self._last_write = {}
+        # domain -> (time of retry, backoff) of domain which write failed, removed when write succeeds
+        self._retry = {}
+        self._condition = threading.Condition()
+
+        self.processed = 0
+        self.coalesced = 0
+        self.retried = 0
+
+    def publish(self, domain: str, answer, exclusive: bool = True):
+        """
+        Queue answer for domain, answer which is already waiting for the same domain is replaced
+        :param domain: dns domain
+        :param answer: dns answer, None if job has no preference (for ex. all hosts are down)
+        :param exclusive: True - answer must be the answer of domain (other answer is changed),
+                          False - entry must only exist
+        :return:
+        """
+        with self._condition:
+            self._published[domain] = (answer, exclusive)
+            if domain in self._pending:
+                self.coalesced += 1
+                if answer is None:
+                    del self._pending[domain]
+            if answer is not None:
+                self._pending[domain] = (answer, exclusive)
+                self._condition.notify()
+
+    def pending(self) -> int:
+        """
+        :return: number of domains waiting for write
+        """
+        with self._condition:
+            return len(self._pending)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {"processed": self.processed, "coalesced": self.coalesced, "retried": self.retried,
+                    "pending": len(self._pending)}
+
+    def take(self, timeout=None):
+        """
+        Wait until write for some domain can be done (spacing of domain elapsed) and remove it from queue
+        :param timeout: maximum time to wait, None - wait forever
+        :return: (domain, answer, exclusive), None if timeout elapsed
+        """
+        stop = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                wait = None
+                for domain in self._pending:
+                    ready_at = self._last_write.get(domain, now - self.spacing) + self.spacing
+                    if domain in self._retry:
+                        ready_at = max(ready_at, self._retry[domain][0])
+                    if ready_at <= now:
+                        answer, exclusive = self._pending.pop(domain)
+                        # reserve slot now, so next write of domain is spaced even if this one takes long time
+                        self._last_write[domain] = now
+                        return domain, answer, exclusive
+                    wait = ready_at - now if wait is None else min(wait, ready_at - now)
+
+                if stop is not None:
+                    if now >= stop:
+                        return None
+                    wait = stop - now if wait is None else min(wait, stop - now)
+                self._condition.wait(timeout=wait)
+
+    def write(self, domain: str, answer: str, exclusive: bool):
+        """
+        Write single answer, connector compares it with rewrite list first. Failed write is queued again and retried
+        after backoff of domain (but not sooner than spacing of domain).
+        :return: status returned by connector
+        """
+        status = self.api_connector.ensure_answer(answer=answer, domain=domain, exclusive=exclusive)
+        with self._condition:
+            self.processed += 1
+            if status is True:
+                self._retry.pop(domain, None)
+                return status
+
+            backoff = self.retry_backoff
+            if domain in self._retry:
+                backoff = min(self.retry_backoff_max, self._retry[domain][1] * 2)
+            self._retry[domain] = (time.monotonic() + backoff, backoff)
+            if domain not in self._pending and self._published.get(domain) == (answer, exclusive):
+                self._pending[domain] = (answer, exclusive)
+                self.retried += 1
+                self._condition.notify()
+        logging.error(msg=f"Write of {domain} {answer} failed, retry in {max(backoff, self.spacing)}s")
+        return status
+
+    def run(self):
+        report_at = time.monotonic() + REPORT_INTERVAL
+        while True:
+            item = self.take(timeout=max(0.0, report_at - time.monotonic()))
+            if item is not None:
+                domain, answer, exclusive = item
+                self.write(domain=domain, answer=answer, exclusive=exclusive)
+
+            if time.monotonic() >= report_at:
+                stats = self.stats()
+                logging.info(msg=f"Write queue: {stats['processed']} writes processed, {stats['coalesced']} coalesced, "
+                                 f"{stats['retried']} retried, {stats['pending']} pending")
+                report_at = time.monotonic() + REPORT_INTERVAL
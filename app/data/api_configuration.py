@@ -1,3 +1,6 @@
+from app.data import default
+
+
 class ApiConfiguration:
     """
     Store configuration for Api Connector
@@ -9,8 +12,15 @@ class ApiConfiguration:
     __port = ""
     __timeout = ""
     __startup_enable = ""
+    __cache_ttl = default.Api.cache_ttl
+    __pool_size = default.Api.pool_size
+    __rate_limit = default.Api.rate_limit
+    __endpoint_rate_limits = {}
+    __replicas = ()
 
-    def set(self, host: str, username: str, passwd: str, proto: str, port: int, timeout: float, startup_enable: bool):
+    def set(self, host: str, username: str, passwd: str, proto: str, port: int, timeout: float, startup_enable: bool,
+            cache_ttl: float = default.Api.cache_ttl, pool_size: int = default.Api.pool_size,
+            rate_limit: float = default.Api.rate_limit, endpoint_rate_limits: dict = None):
         """
         Set configuration for api
 
@@ -21,6 +31,10 @@ class ApiConfiguration:
         :param port: api port
         :param timeout: api connection timeout
         :param startup_enable: enable test of api connection startup
+        :param cache_ttl: maximum age (in seconds) of cached rewrite list, 0 disable cache
+        :param pool_size: maximum number of keep-alive connections to api, 0 use requests default
+        :param rate_limit: maximum number of api requests per second, 0 - no limit
+        :param endpoint_rate_limits: endpoint path -> maximum number of requests per second to that endpoint
         :return:
         """
 
@@ -31,6 +45,10 @@ class ApiConfiguration:
         self.__port = port
         self.__timeout = timeout
         self.__startup_enable = startup_enable
+        self.__cache_ttl = cache_ttl
+        self.__pool_size = pool_size
+        self.__rate_limit = rate_limit
+        self.__endpoint_rate_limits = dict(endpoint_rate_limits) if endpoint_rate_limits is not None else {}
 
     def host(self) -> str:
         return self.__host
@@ -53,3 +71,25 @@ class ApiConfiguration:
     def startup_enable(self) -> bool:
         return self.__startup_enable
 
+    def cache_ttl(self) -> float:
+        return self.__cache_ttl
+
+    def pool_size(self) -> int:
+        return self.__pool_size
+
+    def rate_limit(self) -> float:
+        return self.__rate_limit
+
+    def endpoint_rate_limits(self) -> dict:
+        return dict(self.__endpoint_rate_limits)
+
+    def add_replica(self, config: 'ApiConfiguration'):
+        """
+        Add other AdGuardHome instance, which gets the same writes as this one
+        :param config: configuration of replica
+        :return:
+        """
+        self.__replicas = self.__replicas + (config,)
+
+    def replicas(self) -> list:
+        return list(self.__replicas)
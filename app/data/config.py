@@ -1,5 +1,7 @@
 from typing import Union
 
+from app.data import default
+
 
 class Config:
     """
@@ -10,8 +12,28 @@ class Config:
         self.__entry_exist = ""
         self.__log_file = ""
         self.__log_level = 0
+        self.__write_mode = default.Config.write_mode
+        self.__reconcile_interval = default.Config.reconcile_interval
+        self.__reconcile_workers = default.Config.reconcile_workers
+        self.__write_spacing = default.Config.write_spacing
+        self.__probe_cache = default.Config.probe_cache
+        self.__batch_ping = default.Config.batch_ping
+        self.__probe_pool = default.Config.probe_pool
+        self.__async_http = default.Config.async_http
+        self.__http_concurrency = default.Config.http_concurrency
+        self.__stagger = default.Config.stagger
+        self.__jitter = default.Config.jitter
+        self.__drift_check = default.Config.drift_check
 
-    def set(self, wait: int, entry_exist: str, log_file: str, log_level: Union[int, bool]) -> None:
+    def set(self, wait: int, entry_exist: str, log_file: str, log_level: Union[int, bool],
+            write_mode: str = default.Config.write_mode, reconcile_interval: int = default.Config.reconcile_interval,
+            reconcile_workers: int = default.Config.reconcile_workers,
+            write_spacing: float = default.Config.write_spacing,
+            probe_cache: bool = default.Config.probe_cache, batch_ping: bool = default.Config.batch_ping,
+            probe_pool: bool = default.Config.probe_pool, async_http: bool = default.Config.async_http,
+            http_concurrency: int = default.Config.http_concurrency,
+            stagger: bool = default.Config.stagger, jitter: float = default.Config.jitter,
+            drift_check: int = default.Config.drift_check) -> None:
         """
         Set miscellaneous program configurations
 
@@ -20,12 +42,38 @@ class Config:
                             any of answers from config file.
         :param log_file: log file
         :param log_level: log level
+        :param write_mode: how jobs write answers to AdGuardHome, DIRECT - every job writes its own answer,
+                           RECONCILE - jobs publish answers, reconciler writes all differences once per tick,
+                           QUEUE - jobs publish answers, single writer writes them, waiting writes are collapsed
+        :param reconcile_interval: seconds between reconciler ticks
+        :param reconcile_workers: maximum number of writes done by reconciler at the same time
+        :param write_spacing: minimum time (in seconds) between two writes for the same domain in QUEUE mode
+        :param probe_cache: share probe results between jobs which probe the same host
+        :param batch_ping: send pings of all jobs through one shared socket
+        :param probe_pool: http jobs reuse keep-alive connections and TLS sessions of their hosts
+        :param async_http: probes of all http jobs are sent by one asyncio engine
+        :param http_concurrency: maximum number of probes in flight in asyncio http engine
+        :param stagger: spread first tests of jobs over their intervals
+        :param jitter: maximum random time (in seconds) added to every interval of job
+        :param drift_check: seconds between checks of AdGuardHome when answer of job doesn't change
         :return:
         """
         self.__wait = wait
         self.__entry_exist = entry_exist
         self.__log_file = log_file
         self.__log_level = log_level
+        self.__write_mode = write_mode
+        self.__reconcile_interval = reconcile_interval
+        self.__reconcile_workers = reconcile_workers
+        self.__write_spacing = write_spacing
+        self.__probe_cache = probe_cache
+        self.__batch_ping = batch_ping
+        self.__probe_pool = probe_pool
+        self.__async_http = async_http
+        self.__http_concurrency = http_concurrency
+        self.__stagger = stagger
+        self.__jitter = jitter
+        self.__drift_check = drift_check
 
     def wait(self) -> int:
         return self.__wait
@@ -38,3 +86,39 @@ class Config:
 
     def log_level(self) -> Union[int, bool]:
         return self.__log_level
+
+    def write_mode(self) -> str:
+        return self.__write_mode
+
+    def reconcile_interval(self) -> int:
+        return self.__reconcile_interval
+
+    def reconcile_workers(self) -> int:
+        return self.__reconcile_workers
+
+    def write_spacing(self) -> float:
+        return self.__write_spacing
+
+    def probe_cache(self) -> bool:
+        return self.__probe_cache
+
+    def batch_ping(self) -> bool:
+        return self.__batch_ping
+
+    def probe_pool(self) -> bool:
+        return self.__probe_pool
+
+    def async_http(self) -> bool:
+        return self.__async_http
+
+    def http_concurrency(self) -> int:
+        return self.__http_concurrency
+
+    def stagger(self) -> bool:
+        return self.__stagger
+
+    def jitter(self) -> float:
+        return self.__jitter
+
+    def drift_check(self) -> int:
+        return self.__drift_check
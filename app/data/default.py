@@ -4,10 +4,21 @@ Stores default configuration values, if you change any of these values change te
 
 
 class Api:
+    update_version = (0, 107, 33)  # first AdGuardHome version with /control/rewrite/update endpoint
     proto = "http"
     port = 80
     timeout = 10
     startup = True
+    cache_ttl = 5
+    pool_size = 0  # 0 - number of jobs
+    breaker_threshold = 3  # failed requests in a row which stop api requests for a while
+    breaker_backoff = 1
+    breaker_backoff_max = 60
+    rate_limit = 0.0  # 0 - no limit
+    rate_limit_list = 0.0
+    rate_limit_add = 0.0
+    rate_limit_delete = 0.0
+    rate_limit_update = 0.0
 
 
 class Config:
@@ -15,6 +26,18 @@ class Config:
     log_level = False  # default False allow to set log level from coman line arguments
     log_file = "N/A"
     entry_exist = 'KEEP'
+    write_mode = 'DIRECT'
+    reconcile_interval = 10
+    reconcile_workers = 4
+    write_spacing = 1.0
+    probe_cache = False
+    batch_ping = False
+    probe_pool = False
+    async_http = False
+    http_concurrency = 1000  # maximum number of http probes in flight when async_http is set
+    stagger = False
+    jitter = 0.0
+    drift_check = 300  # seconds between checks of AdGuardHome when answer of job doesn't change
 
 
 class PingJob:
@@ -22,6 +45,13 @@ class PingJob:
     count = 2
     timeout = 2
     privileged = False
+    probe_mode = 'ALL'
+    min_interval = 0  # 0 - the same as interval
+    max_interval = 0
+    rise = 1
+    fall = 1
+    hold = 0.0
+    budget = 0  # 0 - cycle has no time limit
 
 
 class HttpJob:
@@ -30,6 +60,29 @@ class HttpJob:
     status = 200
     proto = "http"
     port = 80
+    probe_mode = 'ALL'
+    min_interval = 0  # 0 - the same as interval
+    max_interval = 0
+    rise = 1
+    fall = 1
+    hold = 0.0
+    method = 'GET'
+    max_body = 4096  # bytes of body read, so connection can be reused
+    connect_timeout = 0  # 0 - the same as timeout
+    read_timeout = 0
+    budget = 0  # 0 - cycle has no time limit
+
+
+class TcpJob:
+    interval = 60
+    timeout = 2
+    probe_mode = 'ALL'
+    min_interval = 0  # 0 - the same as interval
+    max_interval = 0
+    rise = 1
+    fall = 1
+    hold = 0.0
+    budget = 0  # 0 - cycle has no time limit
 
 
 class StaticEntry:
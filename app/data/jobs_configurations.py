@@ -1,4 +1,5 @@
 from app.utils import check_protocol_slashed
+from app.data import default
 
 
 class DNS:
@@ -8,6 +9,13 @@ class DNS:
     def __init__(self):
         self._domain = ""
         self._answers = []
+        self._probe_mode = "ALL"
+        self._min_interval = 0
+        self._max_interval = 0
+        self._rise = 1
+        self._fall = 1
+        self._hold = 0.0
+        self._budget = 0
 
     def domain(self) -> str:
         return self._domain
@@ -15,16 +23,53 @@ class DNS:
     def answers(self) -> list:
         return self._answers
 
+    def probe_mode(self) -> str:
+        return self._probe_mode
+
+    def min_interval(self) -> int:
+        return self._min_interval
+
+    def max_interval(self) -> int:
+        return self._max_interval
+
+    def rise(self) -> int:
+        return self._rise
+
+    def fall(self) -> int:
+        return self._fall
+
+    def hold(self) -> float:
+        return self._hold
+
+    def budget(self) -> float:
+        return self._budget
+
 
 class JobHttp(DNS):
     def __init__(self, interval: int, status_code: int, proto: str, domain: str, answers: list, timeout: float,
-                 port: int):
+                 port: int, probe_mode: str = default.HttpJob.probe_mode,
+                 min_interval: int = default.HttpJob.min_interval, max_interval: int = default.HttpJob.max_interval,
+                 rise: int = default.HttpJob.rise, fall: int = default.HttpJob.fall,
+                 hold: float = default.HttpJob.hold, method: str = default.HttpJob.method,
+                 max_body: int = default.HttpJob.max_body, connect_timeout: float = default.HttpJob.connect_timeout,
+                 read_timeout: float = default.HttpJob.read_timeout, budget: float = default.HttpJob.budget):
         super().__init__()
+        self._probe_mode = probe_mode
         self._interval = interval
+        self._min_interval = min_interval or interval
+        self._max_interval = max_interval or interval
+        self._rise = rise
+        self._fall = fall
+        self._hold = hold
         self._status_code = status_code
         self._proto = proto
         self._timeout = timeout
+        self._connect_timeout = connect_timeout or timeout
+        self._read_timeout = read_timeout or timeout
+        self._budget = budget
         self._port = port
+        self._method = method
+        self._max_body = max_body
         self._domain = domain
         self._answers = answers
 
@@ -40,9 +85,21 @@ class JobHttp(DNS):
     def timeout(self) -> float:
         return self._timeout
 
+    def connect_timeout(self) -> float:
+        return self._connect_timeout
+
+    def read_timeout(self) -> float:
+        return self._read_timeout
+
     def port(self) -> int:
         return self._port
 
+    def method(self) -> str:
+        return self._method
+
+    def max_body(self) -> int:
+        return self._max_body
+
 
 class JobsHttp:
     """
@@ -53,7 +110,13 @@ class JobsHttp:
         self._http_objs = []
 
     def append(self, interval: int, status_code: int, proto: str, domain: str, answers: list, timeout: float,
-               port: int) -> None:
+               port: int, probe_mode: str = default.HttpJob.probe_mode,
+               min_interval: int = default.HttpJob.min_interval,
+               max_interval: int = default.HttpJob.max_interval, rise: int = default.HttpJob.rise,
+               fall: int = default.HttpJob.fall, hold: float = default.HttpJob.hold,
+               method: str = default.HttpJob.method, max_body: int = default.HttpJob.max_body,
+               connect_timeout: float = default.HttpJob.connect_timeout,
+               read_timeout: float = default.HttpJob.read_timeout, budget: float = default.HttpJob.budget) -> None:
         """
         Add new set of config data for http job
 
@@ -64,10 +127,25 @@ class JobsHttp:
         :param answers: dns answers (first answer is primary)
         :param timeout: request timeout, if timeout is exceeded host request is treated as failed
         :param port: request port
+        :param probe_mode: how answers are probed: ALL - all at the same time, LAZY - one by one until first healthy,
+                           RACE - all at the same time, result is ready when first healthy answer is known
+        :param min_interval: seconds between tests when answer changed, 0 - the same as interval
+        :param max_interval: maximum seconds between tests when answer is stable, 0 - the same as interval
+        :param rise: number of successful tests in a row which make host healthy
+        :param fall: number of failed tests in a row which make host unhealthy
+        :param hold: minimum time (in seconds) for which answer is kept after change
+        :param method: http method of request, GET or HEAD
+        :param max_body: maximum bytes of response body read to keep connection reusable, 0 - body is never read
+        :param connect_timeout: timeout of connecting to host, 0 - the same as timeout
+        :param read_timeout: timeout of waiting for response, 0 - the same as timeout
+        :param budget: maximum time (in seconds) of probing all answers, 0 - no limit
         :return: None
         """
         self._http_objs.append(JobHttp(interval=interval, status_code=status_code, proto=proto, domain=domain,
-                                       answers=answers, timeout=timeout, port=port))
+                                       answers=answers, timeout=timeout, port=port, probe_mode=probe_mode,
+                                       min_interval=min_interval, max_interval=max_interval, rise=rise, fall=fall,
+                                       hold=hold, method=method, max_body=max_body,
+                                       connect_timeout=connect_timeout, read_timeout=read_timeout, budget=budget))
 
         self._count += 1
 
@@ -92,11 +170,22 @@ class JobsHttp:
 
 
 class JobPing(DNS):
-    def __init__(self, interval: int, count: int, timeout: float, domain: str, answers: list, privileged: bool):
+    def __init__(self, interval: int, count: int, timeout: float, domain: str, answers: list, privileged: bool,
+                 probe_mode: str = default.PingJob.probe_mode, min_interval: int = default.PingJob.min_interval,
+                 max_interval: int = default.PingJob.max_interval, rise: int = default.PingJob.rise,
+                 fall: int = default.PingJob.fall, hold: float = default.PingJob.hold,
+                 budget: float = default.PingJob.budget):
         super().__init__()
+        self._probe_mode = probe_mode
         self._interval = interval
+        self._min_interval = min_interval or interval
+        self._max_interval = max_interval or interval
+        self._rise = rise
+        self._fall = fall
+        self._hold = hold
         self._count = count
         self._timeout = timeout
+        self._budget = budget
         self._privileged = privileged
         self._domain = domain
         self._answers = answers
@@ -122,7 +211,11 @@ class JobsPing:
         self._count = 0
         self._ping_objs = []
 
-    def append(self, interval: int, count: int, timeout: float, domain: str, answers: list, privileged: bool) -> None:
+    def append(self, interval: int, count: int, timeout: float, domain: str, answers: list, privileged: bool,
+               probe_mode: str = default.PingJob.probe_mode, min_interval: int = default.PingJob.min_interval,
+               max_interval: int = default.PingJob.max_interval, rise: int = default.PingJob.rise,
+               fall: int = default.PingJob.fall, hold: float = default.PingJob.hold,
+               budget: float = default.PingJob.budget) -> None:
         """
         Add new set of config data for http job
 
@@ -132,11 +225,21 @@ class JobsPing:
         :param domain: dns domain
         :param answers: dns answers (first answer is primary)
         :param privileged: set True to run in privileged mode, see icmplib documentation for more
+        :param probe_mode: how answers are probed: ALL - all at the same time, LAZY - one by one until first healthy,
+                           RACE - all at the same time, result is ready when first healthy answer is known
+        :param min_interval: seconds between tests when answer changed, 0 - the same as interval
+        :param max_interval: maximum seconds between tests when answer is stable, 0 - the same as interval
+        :param rise: number of successful tests in a row which make host healthy
+        :param fall: number of failed tests in a row which make host unhealthy
+        :param hold: minimum time (in seconds) for which answer is kept after change
+        :param budget: maximum time (in seconds) of probing all answers, 0 - no limit
         :return: None
         """
 
         self._ping_objs.append(JobPing(interval=interval, count=count, timeout=timeout, domain=domain,
-                                       answers=answers, privileged=privileged))
+                                       answers=answers, privileged=privileged, probe_mode=probe_mode,
+                                       min_interval=min_interval, max_interval=max_interval, rise=rise, fall=fall,
+                                       hold=hold, budget=budget))
 
         self._count += 1
 
@@ -160,6 +263,93 @@ class JobsPing:
         return self._ping_objs[temporary_index]
 
 
+class JobTcp(DNS):
+    def __init__(self, interval: int, timeout: float, domain: str, answers: list, port: int,
+                 probe_mode: str = default.TcpJob.probe_mode, min_interval: int = default.TcpJob.min_interval,
+                 max_interval: int = default.TcpJob.max_interval, rise: int = default.TcpJob.rise,
+                 fall: int = default.TcpJob.fall, hold: float = default.TcpJob.hold,
+                 budget: float = default.TcpJob.budget):
+        super().__init__()
+        self._probe_mode = probe_mode
+        self._interval = interval
+        self._min_interval = min_interval or interval
+        self._max_interval = max_interval or interval
+        self._rise = rise
+        self._fall = fall
+        self._hold = hold
+        self._timeout = timeout
+        self._budget = budget
+        self._port = port
+        self._domain = domain
+        self._answers = answers
+
+    def interval(self) -> int:
+        return self._interval
+
+    def timeout(self) -> float:
+        return self._timeout
+
+    def port(self) -> int:
+        return self._port
+
+
+class JobsTcp:
+    """
+    Stores configurations for tcp jobs
+    """
+    def __init__(self):
+        self._count = 0
+        self._tcp_objs = []
+
+    def append(self, interval: int, timeout: float, domain: str, answers: list, port: int,
+               probe_mode: str = default.TcpJob.probe_mode, min_interval: int = default.TcpJob.min_interval,
+               max_interval: int = default.TcpJob.max_interval, rise: int = default.TcpJob.rise,
+               fall: int = default.TcpJob.fall, hold: float = default.TcpJob.hold,
+               budget: float = default.TcpJob.budget) -> None:
+        """
+        Add new set of config data for tcp job
+
+        :param interval: seconds between tests
+        :param timeout: connect timeout, if timeout is exceeded host is treated as inaccessible
+        :param domain: dns domain
+        :param answers: dns answers (first answer is primary)
+        :param port: tcp port of tested service
+        :param probe_mode: how answers are probed: ALL - all at the same time, LAZY - one by one until first healthy,
+                           RACE - all at the same time, result is ready when first healthy answer is known
+        :param min_interval: seconds between tests when answer changed, 0 - the same as interval
+        :param max_interval: maximum seconds between tests when answer is stable, 0 - the same as interval
+        :param rise: number of successful tests in a row which make host healthy
+        :param fall: number of failed tests in a row which make host unhealthy
+        :param hold: minimum time (in seconds) for which answer is kept after change
+        :param budget: maximum time (in seconds) of probing all answers, 0 - no limit
+        :return: None
+        """
+        self._tcp_objs.append(JobTcp(interval=interval, timeout=timeout, domain=domain, answers=answers, port=port,
+                                     probe_mode=probe_mode, min_interval=min_interval, max_interval=max_interval,
+                                     rise=rise, fall=fall, hold=hold, budget=budget))
+
+        self._count += 1
+
+    def __getitem__(self, item) -> JobTcp:
+        return self._tcp_objs[item]
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        self._index = 0
+        return self
+
+    def __next__(self) -> JobTcp:
+        if self._index >= self._count:
+            raise StopIteration
+
+        temporary_index = self._index
+        self._index += 1
+
+        return self._tcp_objs[temporary_index]
+
+
 class JobStaticEntry(DNS):
     def __init__(self, interval: int, domain: str, answer: str):
         super().__init__()
@@ -216,4 +406,5 @@ class JobsConfs:
     def __init__(self):
         self.JobsHttp = JobsHttp()
         self.JobsPing = JobsPing()
+        self.JobsTcp = JobsTcp()
         self.JobsStaticEntry = JobsStaticEntry()
@@ -140,6 +140,34 @@ def validate_interval(interval: int) -> bool:
         return True
 
 
+def validate_threshold(threshold: int) -> bool:
+    """
+    Check if number of tests in a row which change state of host (rise, fall) is correct
+    :param threshold: number of tests
+    :return: True if correct, False if not
+    """
+    if type(threshold) is not int or threshold < 1:
+        logging.warning(msg="Threshold is not valid (value must be greater or equal to one)")
+        return False
+
+    return True
+
+
+def validate_interval_range(min_interval: int, interval: int, max_interval: int) -> bool:
+    """
+    Check if interval is between minimum and maximum interval, intervals must be valid (see validate_interval)
+    :param min_interval: the shortest interval
+    :param interval: interval
+    :param max_interval: the longest interval
+    :return: True if correct, False if not
+    """
+    if not min_interval <= interval <= max_interval:
+        logging.warning(msg="Interval range is not valid (min_interval <= interval <= max_interval)")
+        return False
+
+    return True
+
+
 def validate_proto(proto: str) -> bool:
     """
     Check if protocol is valid
@@ -154,3 +182,107 @@ def validate_proto(proto: str) -> bool:
         return False
     else:
         return True
+
+
+def validate_pool_size(pool_size: int) -> bool:
+    """
+    Check if size of connection pool is correct
+    :param pool_size: maximum number of connections kept in pool
+    :return: True if correct, False if not
+    """
+    if type(pool_size) is not int or pool_size <= 0:
+        logging.warning(msg="Pool size is not valid (value to low)")
+        return False
+
+    return True
+
+
+def validate_rate_limit(rate_limit: Union[int, float]) -> bool:
+    """
+    Check if rate limit (requests per second) is correct
+    :param rate_limit: requests per second, 0 - no limit
+    :return: True if correct, False if not
+    """
+    if (type(rate_limit) is not int and type(rate_limit) is not float) or rate_limit < 0:
+        logging.warning(msg="Rate limit is not valid (value to low)")
+        return False
+
+    return True
+
+
+def validate_write_spacing(write_spacing: Union[int, float]) -> bool:
+    """
+    Check if time between two writes for the same domain is correct
+    :param write_spacing: time in seconds, must be more than 0
+    :return: True if correct, False if not
+    """
+    if (type(write_spacing) is not int and type(write_spacing) is not float) or write_spacing <= 0:
+        logging.warning(msg="Write spacing is not valid (value to low)")
+        return False
+
+    return True
+
+
+def validate_write_mode(write_mode: str) -> bool:
+    """
+    Check if write mode is one of known modes
+    :param write_mode: write mode
+    :return: True if correct, False if not
+    """
+    if write_mode not in ("DIRECT", "RECONCILE", "QUEUE"):
+        logging.warning(msg="Write mode is not valid (unknown mode)")
+        return False
+
+    return True
+
+
+def validate_probe_mode(probe_mode: str) -> bool:
+    """
+    Check if probe mode is one of known modes
+    :param probe_mode: probe mode
+    :return: True if correct, False if not
+    """
+    if probe_mode not in ("ALL", "LAZY", "RACE"):
+        logging.warning(msg="Probe mode is not valid (unknown mode)")
+        return False
+
+    return True
+
+
+def validate_http_method(method: str) -> bool:
+    """
+    Check if http method used by http job is supported
+    :param method: http method
+    :return: True if correct, False if not
+    """
+    if method not in ("GET", "HEAD"):
+        logging.warning(msg="Http method is not valid (only GET and HEAD are supported)")
+        return False
+
+    return True
+
+
+def validate_max_body(max_body: int) -> bool:
+    """
+    Check if maximum number of bytes of response body read by http job is correct
+    :param max_body: number of bytes, 0 - body is never read
+    :return: True if correct, False if not
+    """
+    if type(max_body) is not int or max_body < 0:
+        logging.warning(msg="Max body is not valid (value to low)")
+        return False
+
+    return True
+
+
+def validate_tcp_port(port: int) -> bool:
+    """
+    Check if port tested by tcp job is correct, port 0 can't be connected to
+    :param port: tcp port
+    :return: True if correct, False if not
+    """
+    if type(port) is not int or port < 1 or port > 65535:
+        logging.warning(msg="Tcp port is not valid (out of range)")
+        return False
+
+    return True
@@ -1,17 +1,41 @@
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Union
+
 from app.api.connector import ApiConnector
+from app.api.reconciler import Reconciler
+from app.api.write_queue import WriteQueue
+from app.data import default
+from app.jobs.health import HostHealth
+from app.jobs.pacing import Pacing
+from app.jobs.probe_cache import ProbeCache
 
 
-class Common:
+class Common(ABC):
     """
-    Common method for other classes
+    Common method for other classes, job implements probe_key(), probe_hosts() and async_probe_hosts()
     """
 
-    def __init__(self, domain: str, answers: list, api_connect: ApiConnector):
+    def __init__(self, domain: str, answers: list, api_connect: ApiConnector,
+                 writer: Union[Reconciler, WriteQueue, None], cache: Union[ProbeCache, None] = None,
+                 pacing: Union[Pacing, None] = None, health: Union[HostHealth, None] = None,
+                 drift_check: float = default.Config.drift_check):
         """
         Create configuration variables
         :param domain: domain which is used in dns rewrite
         :param answers
         :param api_connect: configured ApiConnector class
+        :param writer: when set (reconciler or write queue), answers are published to it instead of being written
+                       by job
+        :param cache: probe results shared by all jobs, None - every probe is sent
+        :param pacing: decides when tests run
+        :param health: confirms changes of hosts states (rise, fall, hold), None - result of every test is used
+        :param drift_check: seconds between checks of AdGuardHome when answer doesn't change
         """
 
         self.domain = domain
@@ -19,30 +43,329 @@ class Common:
 
         self.hosts_statuses = []
         self.api_connector = api_connect
+        self.writer = writer
+        self.cache = cache
+        self.pacing = pacing
+        self.health = health
+        # answer chosen by last test, None - no host was accessible
+        self.healthy_answer = None
+        self._tested = False
         self.actual_dns_answer = ""
+        # (answer, exclusive) written (or published) last time, api is used only when it changes or drift check is due
+        self.applied_answer = None
+        self.drift_check = drift_check
+        self._drift_check_at = 0.0
+        # created on first use, one thread per answer, so cycle takes as long as the slowest probe, replaced when probe
+        # is abandoned at deadline of cycle (see abandon_probe_executor())
+        self._probe_executor = None
+
+        # probes which timed out, time spent in them and probes which didn't finish within budget of cycle
+        self._stats_lock = threading.Lock()
+        self.timeouts = 0
+        self.timeout_time = 0.0
+        self.expired = 0
+
+    def count_timeout(self, seconds: float):
+        """
+        Count probe which failed due to timeout
+        :param seconds: time spent by probe
+        :return:
+        """
+        with self._stats_lock:
+            self.timeouts += 1
+            self.timeout_time += seconds
+
+    def timeout_stats(self) -> dict:
+        """
+        :return: number of timed out probes, time (in seconds) spent in them and number of probes which didn't finish
+                 within budget of cycle
+        """
+        with self._stats_lock:
+            return {"domain": self.domain, "timeouts": self.timeouts, "timeout_time": self.timeout_time,
+                    "expired": self.expired}
+
+    def deadline(self):
+        """
+        :return: monotonic time when probes of cycle which starts now must be finished, None if job has no budget
+        """
+        budget = self.conf.budget()
+        return time.monotonic() + budget if budget > 0 else None
+
+    def expire(self, host: str):
+        """
+        Count probe which didn't finish within budget of cycle, it is treated as failed
+        :return: False
+        """
+        logging.info("Test (status) of: " + host + " failed (budget of cycle exceeded)")
+        with self._stats_lock:
+            self.expired += 1
+        return False
+
+    def result(self, future: Future, host: str, deadline):
+        """
+        Wait for result of probe at most until deadline of cycle, probe which is still running is abandoned
+        :return: status of host
+        """
+        if deadline is None:
+            return future.result()
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except concurrent.futures.TimeoutError:
+            if not future.cancel():
+                self.abandon_probe_executor()
+            return self.expire(host=host)
+
+    async def async_result(self, task: asyncio.Future, host: str, deadline):
+        """
+        Asyncio version of result(), probe which is still running at deadline is cancelled
+        """
+        if deadline is None:
+            return await task
+        try:
+            return await asyncio.wait_for(task, timeout=max(0.0, deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            return self.expire(host=host)
+
+    def probe_executor(self) -> ThreadPoolExecutor:
+        if self._probe_executor is None:
+            self._probe_executor = ThreadPoolExecutor(max_workers=len(self.answers),
+                                                      thread_name_prefix="probe-" + self.domain)
+        return self._probe_executor
+
+    def abandon_probe_executor(self):
+        """
+        Drop executor which runs abandoned probe, probe keeps its thread until it ends (at latest after its timeout), so
+        executor would have less threads than answers in next cycle and probes of other answers would wait for it
+        :return:
+        """
+        if self._probe_executor is not None:
+            self._probe_executor.shutdown(wait=False)
+            self._probe_executor = None
+
+    def probe_all(self, probe, mode: str = "ALL") -> list:
+        """
+        Probe answers, only the first healthy answer is used by api_callback, so in LAZY and RACE mode answers after it
+        are not waited for
+        :param probe: function which takes host and returns its status
+        :param mode: ALL - probe all answers at the same time,
+                     LAZY - probe answers one by one, stop at the first healthy,
+                     RACE - probe all answers at the same time, return when all answers before the first healthy one
+                            are known
+        :return: list of hosts statuses in order of answers, None for answers which weren't probed (or waited for)
+        """
+        deadline = self.deadline()
+        if len(self.answers) == 1 and deadline is None:
+            return [probe(self.answers[0])]
+
+        statuses = [None] * len(self.answers)
+        if mode == "LAZY":
+            for index, host in enumerate(self.answers):
+                if deadline is None:
+                    statuses[index] = probe(host)
+                else:
+                    statuses[index] = self.result(future=self.probe_executor().submit(probe, host), host=host,
+                                                  deadline=deadline)
+                if statuses[index] is True or (deadline is not None and time.monotonic() >= deadline):
+                    break
+            return statuses
+
+        futures = [self.probe_executor().submit(probe, host) for host in self.answers]
+        for index, future in enumerate(futures):
+            statuses[index] = self.result(future=future, host=self.answers[index], deadline=deadline)
+            if mode == "RACE" and statuses[index] is True:
+                break
+        return statuses
+
+    async def async_probe_all(self, probe, mode: str = "ALL") -> list:
+        """
+        Asyncio version of probe_all(), probes which are not needed in RACE mode are cancelled
+        :param probe: coroutine function which takes host and returns its status
+        :param mode: ALL, LAZY or RACE, see probe_all()
+        :return: list of hosts statuses in order of answers, None for answers which weren't probed (or waited for)
+        """
+        deadline = self.deadline()
+        statuses = [None] * len(self.answers)
+        if mode == "LAZY":
+            for index, host in enumerate(self.answers):
+                statuses[index] = await self.async_result(task=asyncio.ensure_future(probe(host)), host=host,
+                                                          deadline=deadline)
+                if statuses[index] is True or (deadline is not None and time.monotonic() >= deadline):
+                    break
+            return statuses
+
+        tasks = [asyncio.ensure_future(probe(host)) for host in self.answers]
+        try:
+            for index, task in enumerate(tasks):
+                statuses[index] = await self.async_result(task=task, host=self.answers[index], deadline=deadline)
+                if mode == "RACE" and statuses[index] is True:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+        return statuses
+
+    @abstractmethod
+    def probe_key(self, host: str) -> tuple:
+        """
+        Key of probe result in probe cache, implemented by job
+        :param host: probed host
+        :return: tuple of probe type, host and all parameters which changes result of probe
+        """
+
+    def cache_ttl(self) -> float:
+        """
+        :return: time (in seconds) for which probe result is kept in cache, tests which confirm change of answer come
+                 after min_interval, so they must not get result cached for whole interval
+        """
+        if self.pacing is None:
+            return self.conf.interval()
+        return min(self.pacing.interval, self.pacing.min_interval)
+
+    def cached(self, probe):
+        """
+        Make probe use probe cache, results are kept at most for cache_ttl()
+        :param probe: function which takes host and returns its status
+        :return: function which takes host and returns its (possibly cached) status
+        """
+        if self.cache is None:
+            return probe
+        return lambda host: self.cache.get(key=self.probe_key(host=host), probe=lambda: probe(host),
+                                           ttl=self.cache_ttl())
+
+    def async_cached(self, probe):
+        """
+        Asyncio version of cached()
+        :param probe: coroutine function which takes host and returns its status
+        :return: coroutine function which takes host and returns its (possibly cached) status
+        """
+        if self.cache is None:
+            return probe
+        return lambda host: self.cache.async_get(key=self.probe_key(host=host), probe=lambda: probe(host),
+                                                 ttl=self.cache_ttl())
+
+    @abstractmethod
+    def probe_hosts(self) -> list:
+        """
+        Test all hosts, implemented by job
+        :return: list of hosts statuses (in order of answers)
+        """
+
+    @abstractmethod
+    async def async_probe_hosts(self, executor: Executor) -> list:
+        """
+        Test all hosts without blocking event loop, implemented by job
+        :param executor: executor for blocking calls
+        :return: list of hosts statuses (in order of answers)
+        """
+
+    def cycle(self):
+        """
+        Test all hosts once and write answer
+        :return:
+        """
+        logging.info("Test start for domain:" + self.domain)
+        self.update_statuses(statuses=self.probe_hosts())
+        logging.info("Test stop for domain:" + self.domain)
+        self.api_callback()
+
+    async def async_cycle(self, executor: Executor):
+        """
+        Test all hosts once and write answer, used by asyncio engine. Api calls are blocking, so they are done by
+        executor, publishing answer to writer doesn't block, so it is done directly.
+        :param executor: executor for blocking calls, shared by all jobs
+        :return:
+        """
+        logging.info("Test start for domain:" + self.domain)
+        self.update_statuses(statuses=await self.async_probe_hosts(executor=executor))
+        logging.info("Test stop for domain:" + self.domain)
+        if self.writer is not None:
+            self.api_callback()
+        else:
+            await asyncio.get_running_loop().run_in_executor(executor, self.api_callback)
+
+    def update_statuses(self, statuses: list):
+        """
+        Store results of test, only confirmed changes of hosts states are used (see HostHealth). When test disagrees
+        with actual answer, pacing is told, so next test comes sooner.
+        :param statuses: results of test in order of answers
+        :return:
+        """
+        tested = HostHealth.first_healthy(statuses=statuses)
+        if self.health is not None:
+            statuses = self.health.update(statuses=statuses, now=time.monotonic())
+        self.hosts_statuses = statuses
+        confirmed = HostHealth.first_healthy(statuses=statuses)
+        if tested != confirmed:
+            logging.info(f"Change of answer of {self.domain} is not confirmed yet")
+        answer = None if confirmed is None else self.answers[confirmed]
+
+        if self.pacing is not None and self._tested:
+            self.pacing.adapt(stable=tested == confirmed and answer == self.healthy_answer)
+        self.healthy_answer = answer
+        self._tested = True
+
+    def desired_answer(self) -> tuple:
+        """
+        :return: tuple (answer, exclusive) of first accessible host, answer is None when job has no preference
+        """
+        for host_status, host_answer in zip(self.hosts_statuses, self.answers):
+            if host_status is True:
+                return host_answer, True
+        if len(self.answers) == 1:
+            return self.answers[0], False
+        return None, True
+
+    def publish_answer(self):
+        """
+        Publish answer of first accessible host to writer
+        :return:
+        """
+        for host_status, host_answer in zip(self.hosts_statuses, self.answers):
+            if host_status is True:
+                self.writer.publish(domain=self.domain, answer=host_answer)
+                return
+
+        if len(self.answers) == 1:
+            self.writer.publish(domain=self.domain, answer=self.answers[0], exclusive=False)
+        else:
+            self.writer.publish(domain=self.domain, answer=None)
 
     def api_callback(self):
         """
-        Decide if IP address in dns rewrite needs to be changed, change dns rewrite answer if needed
+        Decide if IP address in dns rewrite needs to be changed, change dns rewrite answer if needed. Api is used only
+        when desired answer changed, or once per drift_check seconds to verify that AdGuardHome still matches.
         :return:
         """
+        desired = self.desired_answer()
+        now = time.monotonic()
+        if desired == self.applied_answer and now < self._drift_check_at:
+            return
+        self._drift_check_at = now + self.drift_check
 
+        if self.writer is not None:
+            self.publish_answer()
+            self.applied_answer = desired
+            return
+
+        applied = None
         for host_status, host_answer in zip(self.hosts_statuses, self.answers):
             if host_status is True:
-                answer = self.api_connector.get_answer_of_domain(domain=self.domain)
-                if answer is False:
-                    if self.api_connector.add_entry(answer=host_answer, domain=self.domain):
-                        return
-                else:
-                    if answer != host_answer:
-                        if self.api_connector.change_entry_answer(new_answer=host_answer, old_answer=answer,
-                                                                  domain=self.domain):
-                            return
-                    else:
-                        return
+                if self.api_connector.ensure_answer(answer=host_answer, domain=self.domain):
+                    applied = (host_answer, True)
+                    self.actual_dns_answer = host_answer
+                    break
         else:
             if len(self.answers) == 1:
-                answer = self.api_connector.get_answer_of_domain(domain=self.domain)
-                if answer is False:
-                    if self.api_connector.add_entry(answer=self.answers[0], domain=self.domain):
-                        return
+                # only host is down, its answer is added only when domain has no answer, existing answer is kept
+                actual = self.api_connector.get_answer_of_domain(domain=self.domain)
+                if actual is False and self.api_connector.add_entry(answer=self.answers[0], domain=self.domain,
+                                                                    check=False):
+                    actual = self.answers[0]
+                if actual:
+                    applied = desired
+                    self.actual_dns_answer = actual
+            elif desired[0] is None:
+                # no host is accessible, there is nothing to write
+                applied = desired
+        # failed write (or write of other than desired answer) is retried on next test
+        self.applied_answer = applied
@@ -0,0 +1,79 @@
+class HostHealth:
+    """
+    Confirmed state of answers of one job. State of host changes only after `rise` successful or `fall` failed tests in
+    a row, so single lost ping doesn't change answer (and write AdGuardHome configuration) twice. After answer changes
+    it is kept at least `hold` seconds, unless host which is the answer fails.
+    """
+
+    def __init__(self, hosts: int, rise: int = 1, fall: int = 1, hold: float = 0.0):
+        """
+        :param hosts: number of answers of job
+        :param rise: number of successful tests in a row which make host healthy
+        :param fall: number of failed tests in a row which make host unhealthy
+        :param hold: minimum time (in seconds) for which answer is kept after change
+        """
+        self.rise = rise
+        self.fall = fall
+        self.hold = hold
+
+        # per host: confirmed state (None - not tested yet) and number of tests in a row which disagree with it
+        self._state = [None] * hosts
+        self._streak = [0] * hosts
+        self._answer = None
+        self._changed = 0.0
+        # answer of tests which is not confirmed yet, change is counted as suppressed once, not on every test
+        self._unconfirmed = None
+        self._suppressing = False
+        self.suppressed = 0
+
+    @staticmethod
+    def first_healthy(statuses: list):
+        """
+        :return: index of first healthy host, None if there is none
+        """
+        for index, status in enumerate(statuses):
+            if status is True:
+                return index
+        return None
+
+    def update(self, statuses: list, now: float) -> list:
+        """
+        Update confirmed states by results of test
+        :param statuses: results of test in order of answers, None - host wasn't tested
+        :param now: actual monotonic time
+        :return: confirmed states of hosts in order of answers
+        """
+        for index, status in enumerate(statuses):
+            if status is None:
+                continue
+            if self._state[index] is None or status == self._state[index]:
+                # first test of host is trusted, there is nothing to compare it with
+                self._state[index] = status
+                self._streak[index] = 0
+                continue
+
+            self._streak[index] += 1
+            if self._streak[index] >= (self.rise if status else self.fall):
+                self._state[index] = status
+                self._streak[index] = 0
+
+        confirmed = list(self._state)
+        answer = self.first_healthy(statuses=confirmed)
+        if self._answer is not None and answer is not None and answer < self._answer and \
+                confirmed[self._answer] is True and now - self._changed < self.hold:
+            # host with higher priority recovered, but answer is held
+            for index in range(answer, self._answer):
+                confirmed[index] = False
+            answer = self._answer
+
+        if answer != self._answer:
+            self._answer = answer
+            self._changed = now
+        tested = self.first_healthy(statuses=statuses)
+        if answer == tested:
+            self._suppressing = False
+        elif self._suppressing is False or tested != self._unconfirmed:
+            self.suppressed += 1
+            self._suppressing = True
+            self._unconfirmed = tested
+        return confirmed
@@ -1,68 +1,217 @@
+import asyncio
 import logging
 import threading
 import time
+from concurrent.futures import Executor
 from typing import Union
+from urllib.parse import urljoin
 
 import requests
+import urllib3
 
+from app.api.aio_http import HttpError
 from app.api.connector import ApiConnector
+from app.api.reconciler import Reconciler
+from app.api.write_queue import WriteQueue
+from app.data import default
+from app.jobs.health import HostHealth
+from app.jobs.http_engine import HttpEngine, MAX_REDIRECTS, REDIRECT_CODES
+from app.jobs.pacing import Pacing
+from app.jobs.probe_cache import ProbeCache
+from app.jobs.probe_pool import ProbePool, send
 from ._common import Common
 from app.data.jobs_configurations import JobHttp
 
+# maximum number of bytes read from socket at once while body is drained
+CHUNK_SIZE = 16384
+
+
+def drain(response: requests.Response, max_body: int) -> bool:
+    """
+    Read rest of response body, so connection can be returned to pool and reused. Body longer than max_body is not
+    read, connection is closed with response instead.
+    :param response: streamed response with unread body
+    :param max_body: maximum number of bytes read
+    :return: True if whole body was read
+    """
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) > max_body:
+        return False
+
+    read = 0
+    try:
+        # body is counted as it is sent, not decompressed
+        while read <= max_body:
+            chunk = response.raw.read(min(CHUNK_SIZE, max_body + 1 - read), decode_content=False)
+            if not chunk:
+                return True
+            read += len(chunk)
+    except (urllib3.exceptions.HTTPError, OSError):
+        pass
+    return False
+
 
 class Test(Common, threading.Thread):
     """
     Get http(s) status code of webpage
     """
 
-    def __init__(self, config: JobHttp, api_connect: Union[ApiConnector, None]):
+    def __init__(self, config: JobHttp, api_connect: Union[ApiConnector, None],
+                 writer: Union[Reconciler, WriteQueue, None] = None, cache: Union[ProbeCache, None] = None,
+                 pool: Union[ProbePool, None] = None, http_engine: Union[HttpEngine, None] = None,
+                 stagger: bool = False, jitter: float = 0.0,
+                 drift_check: float = default.Config.drift_check):
         """
         Create configuration variables
 
         :param api_connect: configured ApiConnector class, may be set to None by unittests
+        :param writer: reconciler or write queue which writes answers, None if job writes answers itself
+        :param cache: probe results shared by all jobs, None - every probe is sent
+        :param pool: keep-alive connections shared by all http jobs, None - every probe opens new connection
+        :param http_engine: asyncio engine which sends probes of all http jobs, None - probes are sent by requests
+                            (pool is not used when engine is set)
+        :param stagger: delay first test by offset of job within interval (derived from domain)
+        :param jitter: maximum random time (in seconds) added to every interval
+        :param drift_check: seconds between checks of AdGuardHome when answer doesn't change
         """
         if api_connect is not None:
             threading.Thread.__init__(self)
-        super().__init__(domain=config.domain(), answers=config.answers(), api_connect=api_connect)
+        super().__init__(domain=config.domain(), answers=config.answers(), api_connect=api_connect,
+                         writer=writer, cache=cache,
+                         pacing=Pacing(domain=config.domain(), interval=config.interval(), stagger=stagger,
+                                       jitter=jitter, min_interval=config.min_interval(),
+                                       max_interval=config.max_interval()),
+                         health=HostHealth(hosts=len(config.answers()), rise=config.rise(), fall=config.fall(),
+                                           hold=config.hold()),
+                         drift_check=drift_check)
 
         self.conf = config
+        self.pool = pool
+        self.http_engine = http_engine
+
+    def request(self, url: str) -> requests.Response:
+        """
+        Send streamed request of probe, through pool when it is set, redirect is not followed
+        """
+        timeout = (self.conf.connect_timeout(), self.conf.read_timeout())
+        if self.pool is not None:
+            return self.pool.request(method=self.conf.method(), url=url, timeout=timeout)
+        with requests.Session() as session:
+            return send(session=session, method=self.conf.method(), url=url, timeout=timeout)
+
+    def probe(self, url: str) -> int:
+        """
+        Send probe and follow redirects. Body of response is drained only when connection is kept by pool, connection
+        of request sent without pool is closed with response.
+        :return: status code of last response
+        :raises HttpError: there are too many redirects
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            with self.request(url=url) as response:
+                if self.pool is not None:
+                    drain(response=response, max_body=self.conf.max_body())
+            location = response.headers.get("location")
+            if response.status_code not in REDIRECT_CODES or location is None:
+                return response.status_code
+            url = urljoin(url, location)
+        raise HttpError(f"Exceeded {MAX_REDIRECTS} redirects")
+
+    def url(self, host: str) -> str:
+        return self.conf.proto() + host + ":" + str(self.conf.port())
+
+    def log_status(self, host: str, status_code: int) -> bool:
+        """
+        Log result of probe
+        :return: True if status code is the same as configured
+        """
+        if status_code == self.conf.status_code():
+            logging.info("Test (status) of: " + self.url(host=host) + " ok")
+            return True
+        logging.info("Test (status) of: " + self.url(host=host) + " failed (status code " + str(status_code) + ")")
+        return False
+
+    def engine_args(self, host: str) -> dict:
+        return {"method": self.conf.method(), "url": self.url(host=host),
+                "connect_timeout": self.conf.connect_timeout(), "read_timeout": self.conf.read_timeout(),
+                "max_body": self.conf.max_body()}
 
     def job_request(self, host: str):
 
         """
-        Test what status code website generate
+        Test what status code website generate, only status line and headers are downloaded, at most max_body bytes of
+        body are read to release connection
         :return: True if host returns status the same code as configuration, False in other cases
         """
+        started = time.monotonic()
         try:
-            logging.info("Test (start) of: " + self.conf.proto() + host + ":" + str(self.conf.port()))
-            response = requests.get(url=self.conf.proto() + host + ":" + str(self.conf.port()),
-                                    timeout=self.conf.timeout())
-            if response.status_code == self.conf.status_code():
-                logging.info("Test (status) of: " + self.conf.proto() + host + ":" + str(self.conf.port()) + " ok")
-                return True
-            else:
-                logging.info(
-                    "Test (status) of: " + self.conf.proto() + host + ":" + str(self.conf.port()) +
-                    " failed (status code " + str(response.status_code) + ")")
-                return False
+            logging.info("Test (start) of: " + self.url(host=host))
+            if self.http_engine is not None:
+                return self.log_status(host=host, status_code=self.http_engine.probe(**self.engine_args(host=host)))
+            return self.log_status(host=host, status_code=self.probe(url=self.url(host=host)))
         except requests.exceptions.InvalidSchema as e:
-            logging.info("Test (status) of: " + self.conf.proto() + host + ":" + str(self.conf.port()) +
-                         " failed (Invalid schema)")
+            logging.info("Test (status) of: " + self.url(host=host) + " failed (Invalid schema)")
             logging.warning(str(e))
             return False
-        except requests.ConnectionError:
-            logging.info("Test (status) of: " + self.conf.proto() + host + ":" + str(self.conf.port()) +
-                         " failed (Connection error)")
+        except (requests.Timeout, asyncio.TimeoutError):
+            # connect timeout is connection error too, it is counted as timeout
+            self.count_timeout(seconds=time.monotonic() - started)
+            logging.info("Test (status) of: " + self.url(host=host) + " failed (Timeout)")
+            return False
+        except (requests.ConnectionError, OSError, HttpError):
+            logging.info("Test (status) of: " + self.url(host=host) + " failed (Connection error)")
+            return False
+
+    async def async_job_request(self, host: str):
+        """
+        Test status code of website through http engine without blocking event loop
+        :return: True if host returns status the same code as configuration, False in other cases
+        """
+        started = time.monotonic()
+        try:
+            logging.info("Test (start) of: " + self.url(host=host))
+            return self.log_status(host=host,
+                                   status_code=await self.http_engine.async_probe(**self.engine_args(host=host)))
+        except asyncio.TimeoutError:
+            self.count_timeout(seconds=time.monotonic() - started)
+            logging.info("Test (status) of: " + self.url(host=host) + " failed (Timeout)")
             return False
+        except (OSError, HttpError):
+            logging.info("Test (status) of: " + self.url(host=host) + " failed (Connection error)")
+            return False
+
+    def probe_key(self, host: str) -> tuple:
+        return "http", self.conf.proto(), host, self.conf.port(), self.conf.method(), self.conf.status_code(), \
+            self.conf.connect_timeout(), self.conf.read_timeout()
+
+    def probe_hosts(self) -> list:
+        """
+        Test hosts as configured by probe mode
+        :return: list of hosts statuses
+        """
+        return self.probe_all(probe=self.cached(probe=self.job_request), mode=self.conf.probe_mode())
+
+    async def async_probe_hosts(self, executor: Executor) -> list:
+        """
+        Test all hosts, requests are blocking so they are sent from executor threads, probes of http engine don't need
+        executor
+        :param executor: executor shared by all jobs
+        :return: list of hosts statuses
+        """
+        if self.http_engine is not None:
+            return await self.async_probe_all(probe=self.async_cached(probe=self.async_job_request),
+                                              mode=self.conf.probe_mode())
+        loop = asyncio.get_running_loop()
+        probe = self.cached(probe=self.job_request)
+        return await self.async_probe_all(probe=lambda host: loop.run_in_executor(executor, probe, host),
+                                          mode=self.conf.probe_mode())
 
     def run(self):
         """
         Async loop for testing webpage
         :return: nothing
         """
+        time.sleep(self.pacing.first(now=time.monotonic()))
         while True:
-            logging.info("Test start for domain:" + self.conf.domain())
-            self.hosts_statuses = [self.job_request(host=host) for host in self.conf.answers()]
-            logging.info("Test stop for domain:" + self.conf.domain())
-            self.api_callback()
-            time.sleep(self.conf.interval())
+            self.pacing.begin(now=time.monotonic())
+            self.cycle()
+            time.sleep(self.pacing.end(now=time.monotonic()))
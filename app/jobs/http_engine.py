@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+import ssl
+import time
+from typing import Union
+from urllib.parse import urljoin
+
+import requests
+
+from app.api.aio_http import AsyncHttpClient, HttpError
+from app.data import default
+from app.jobs.loop_thread import LoopThread
+from app.jobs.probe_pool import CONNECTIONS_PER_TARGET, REPORT_INTERVAL
+
+# status codes after which probe follows Location header (as requests does)
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+# maximum number of followed redirects, the same limit as requests has
+MAX_REDIRECTS = 30
+
+
+def default_context() -> ssl.SSLContext:
+    """
+    :return: TLS context which verifies certificates against the same CA bundle as requests
+    """
+    return ssl.create_default_context(cafile=os.environ.get("REQUESTS_CA_BUNDLE") or
+                                      os.environ.get("CURL_CA_BUNDLE") or requests.utils.DEFAULT_CA_BUNDLE_PATH)
+
+
+class HttpEngine(LoopThread):
+    """
+    Http probe engine shared by all http jobs. Probes of all jobs are sent by one asyncio HTTP/1.1 client, so thousands
+    of probes can be in flight without thread per probe. Number of probes in flight is limited by concurrency, probes
+    above the limit wait for free slot. Idle keep-alive connections are kept per target (proto, address, port).
+    """
+
+    def __init__(self, concurrency: int = default.Config.http_concurrency,
+                 ssl_context: Union[ssl.SSLContext, None] = None):
+        """
+        :param concurrency: maximum number of probes in flight
+        :param ssl_context: context used by https probes, None - default context with CA bundle of requests
+        """
+        super().__init__(name="http-engine")
+        self.concurrency = concurrency
+        self.context = ssl_context if ssl_context is not None else default_context()
+        self.client = AsyncHttpClient(pool_size=CONNECTIONS_PER_TARGET, ssl_context=self.context)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._last_report = time.monotonic()
+
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def stats(self) -> dict:
+        """
+        :return: number of requests, probes in flight (actual and maximum), opened and reused connections
+        """
+        return {"requests": self.requests, "in_flight": self.in_flight, "max_in_flight": self.max_in_flight,
+                "opened": self.client.opened, "reused": self.client.reused}
+
+    async def _close(self):
+        await self.client.close()
+
+    def _report(self):
+        now = time.monotonic()
+        if now - self._last_report >= REPORT_INTERVAL:
+            self._last_report = now
+            stats = self.stats()
+            logging.info(msg=f"Http engine requests: {stats['requests']}, max in flight: {stats['max_in_flight']}, "
+                             f"connections opened: {stats['opened']}, reused: {stats['reused']}")
+
+    async def _probe(self, method: str, url: str, connect_timeout: float, read_timeout: float, max_body: int) -> int:
+        """
+        Send probe and follow redirects, called only from engine loop
+        :return: status code of last response
+        """
+        async with self._semaphore:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self._report()
+            try:
+                for _ in range(MAX_REDIRECTS + 1):
+                    response = await self.client.request(method=method, url=url,
+                                                         timeout=connect_timeout + read_timeout,
+                                                         connect_timeout=connect_timeout, max_body=max_body)
+                    location = response.headers.get("location")
+                    if response.status_code not in REDIRECT_CODES or location is None:
+                        return response.status_code
+                    url = urljoin(url, location)
+                raise HttpError(f"Exceeded {MAX_REDIRECTS} redirects")
+            finally:
+                self.in_flight -= 1
+
+    def probe(self, method: str, url: str, connect_timeout: float, read_timeout: float, max_body: int) -> int:
+        """
+        Get status code of url, blocks caller until result is known. Redirects are followed, every request (and
+        redirect) must end within connect_timeout + read_timeout.
+        :param method: http method (GET or HEAD)
+        :param url: url of target
+        :param connect_timeout: time (in seconds) to open connection
+        :param read_timeout: time (in seconds) to read response
+        :param max_body: maximum number of bytes of body read, connection with longer body is closed
+        :return: status code
+        :raises asyncio.TimeoutError: probe exceeded timeout
+        :raises OSError: connection can't be established or was broken
+        :raises HttpError: response can't be parsed or there are too many redirects
+        """
+        return self.run(self._probe(method=method, url=url, connect_timeout=connect_timeout,
+                                    read_timeout=read_timeout, max_body=max_body))
+
+    async def async_probe(self, method: str, url: str, connect_timeout: float, read_timeout: float,
+                          max_body: int) -> int:
+        """
+        Same as probe(), but doesn't block event loop of caller
+        """
+        return await self.async_run(self._probe(method=method, url=url, connect_timeout=connect_timeout,
+                                                read_timeout=read_timeout, max_body=max_body))
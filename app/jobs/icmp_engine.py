@@ -0,0 +1,223 @@
+import asyncio
+import ipaddress
+import itertools
+import logging
+import os
+import socket
+import struct
+
+from app.jobs.loop_thread import LoopThread
+
+ICMP_ECHO_REQUEST = {socket.AF_INET: 8, socket.AF_INET6: 128}
+ICMP_ECHO_REPLY = {socket.AF_INET: 0, socket.AF_INET6: 129}
+PAYLOAD = b"rewrite-helper".ljust(56, b"\x00")
+# maximum number of requests sent in one tick, replies are read between ticks
+BATCH_SIZE = 256
+# replies of whole batch must fit into socket buffer (kernel limits it to net.core.rmem_max)
+RECEIVE_BUFFER = 4 * 1024 * 1024
+
+
+def checksum(data: bytes) -> int:
+    """
+    Internet checksum (RFC 1071) of ICMPv4 packet, ICMPv6 checksum is computed by kernel
+    """
+    if len(data) % 2:
+        data += b"\x00"
+    total = sum(struct.unpack(f"!{len(data) // 2}H", data))
+    total = (total >> 16) + (total & 0xffff)
+    total += total >> 16
+    return ~total & 0xffff
+
+
+class Channel:
+    """
+    One ICMP socket of engine (per address family and privilege mode) and requests waiting for reply on it
+    """
+
+    def __init__(self, family: int, privileged: bool):
+        self.family = family
+        self.privileged = privileged
+        self.sock = socket.socket(family, socket.SOCK_RAW if privileged else socket.SOCK_DGRAM,
+                                  socket.IPPROTO_ICMP if family == socket.AF_INET else socket.IPPROTO_ICMPV6)
+        self.sock.setblocking(False)
+        try:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RECEIVE_BUFFER)
+        except OSError:
+            pass
+        # raw socket receives replies to all processes, so only replies with our identifier are used, datagram
+        # socket gets identifier from kernel on first send (it is local port of socket)
+        self.id = os.getpid() & 0xffff if privileged else None
+        self._sequence = itertools.count()
+        # (address, sequence) -> future of request
+        self.waiting = {}
+
+    def next_sequence(self) -> int:
+        return next(self._sequence) & 0xffff
+
+    def packet(self, sequence: int) -> bytes:
+        header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST[self.family], 0, 0, self.id or 0, sequence)
+        if self.family == socket.AF_INET:
+            header = struct.pack("!BBHHH", ICMP_ECHO_REQUEST[self.family], 0, checksum(header + PAYLOAD),
+                                 self.id or 0, sequence)
+        return header + PAYLOAD
+
+    def send(self, address: str, sequence: int):
+        self.sock.sendto(self.packet(sequence=sequence), (address, 0))
+        if self.id is None:
+            self.id = self.sock.getsockname()[1]
+
+    def parse(self, packet: bytes):
+        """
+        :return: tuple (type, identifier, sequence) of ICMP message, None if packet is too short
+        """
+        # raw IPv4 socket returns packet with IP header, datagram and IPv6 sockets return ICMP message only
+        if self.family == socket.AF_INET and self.privileged:
+            if len(packet) < 1:
+                return None
+            packet = packet[(packet[0] & 0x0f) * 4:]
+        if len(packet) < 8:
+            return None
+        message_type, _, _, identifier, sequence = struct.unpack("!BBHHH", packet[:8])
+        return message_type, identifier, sequence
+
+    def close(self):
+        self.sock.close()
+
+
+class IcmpEngine(LoopThread):
+    """
+    Ping engine shared by all ping jobs. Instead of socket per ping, all echo requests are sent through one socket per
+    address family (and privilege mode). Requests queued during one event loop iteration (tick) are sent together,
+    replies are read by single receive loop and matched to requests by identifier, address and sequence number.
+    """
+
+    def __init__(self):
+        super().__init__(name="icmp-engine")
+        # (family, privileged) -> Channel
+        self._channels = {}
+        # (channel, address, sequence) waiting for send in next tick
+        self._outgoing = []
+
+        self.sent = 0
+        self.received = 0
+        self.batches = 0
+
+    def stats(self) -> dict:
+        """
+        :return: number of sent requests, received replies, send batches and opened sockets
+        """
+        return {"sent": self.sent, "received": self.received, "batches": self.batches, "sockets": len(self._channels)}
+
+    async def _close(self):
+        loop = asyncio.get_running_loop()
+        for channel in self._channels.values():
+            loop.remove_reader(channel.sock)
+            channel.close()
+        self._channels = {}
+
+    def _channel(self, family: int, privileged: bool) -> Channel:
+        """
+        Get socket for family, socket is created on first use, called only from engine loop
+        """
+        key = (family, privileged)
+        if key not in self._channels:
+            channel = Channel(family=family, privileged=privileged)
+            self._loop.add_reader(channel.sock, self._receive, channel)
+            self._channels[key] = channel
+        return self._channels[key]
+
+    def _flush(self):
+        """
+        Send requests queued in this tick, when there is more than BATCH_SIZE requests rest is sent in next tick
+        """
+        outgoing, self._outgoing = self._outgoing[:BATCH_SIZE], self._outgoing[BATCH_SIZE:]
+        if len(self._outgoing) > 0:
+            self._loop.call_soon(self._flush)
+        self.batches += 1
+        for channel, address, sequence in outgoing:
+            try:
+                channel.send(address=address, sequence=sequence)
+                self.sent += 1
+            except OSError as e:
+                logging.info(f"Test (status) of: {address} failed ({e.strerror})")
+                future = channel.waiting.get((address, sequence))
+                if future is not None and not future.done():
+                    future.set_result(False)
+
+    def _receive(self, channel: Channel):
+        """
+        Read all replies waiting in socket
+        """
+        while True:
+            try:
+                packet, source = channel.sock.recvfrom(1024)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logging.warning(f"Icmp engine receive failed: {e!r}")
+                return
+
+            message = channel.parse(packet=packet)
+            if message is None:
+                continue
+            message_type, identifier, sequence = message
+            if message_type != ICMP_ECHO_REPLY[channel.family] or identifier != channel.id:
+                continue
+
+            # link local IPv6 source contains scope
+            future = channel.waiting.get((source[0].split("%")[0], sequence))
+            if future is not None and not future.done():
+                self.received += 1
+                future.set_result(True)
+
+    async def _ping(self, address: str, count: int, timeout: float, privileged: bool) -> bool:
+        """
+        Send up to count echo requests one by one, each waits for reply at most timeout seconds
+        :return: True when host replied to any request
+        """
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            logging.info("Test (status) of: " + address + " failed ( not an ip address )")
+            return False
+        family = socket.AF_INET if ip.version == 4 else socket.AF_INET6
+
+        try:
+            channel = self._channel(family=family, privileged=privileged)
+        except PermissionError:
+            logging.error("Icmp socket can't be opened, run as root or set privileged: False")
+            return False
+
+        address = str(ip)
+        for _ in range(count):
+            sequence = channel.next_sequence()
+            future = self._loop.create_future()
+            channel.waiting[(address, sequence)] = future
+            if len(self._outgoing) == 0:
+                self._loop.call_soon(self._flush)
+            self._outgoing.append((channel, address, sequence))
+            try:
+                if await asyncio.wait_for(future, timeout=timeout):
+                    return True
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                del channel.waiting[(address, sequence)]
+        return False
+
+    def ping(self, address: str, count: int, timeout: float, privileged: bool) -> bool:
+        """
+        Ping host, blocks caller until result is known
+        :param address: ip address of host
+        :param count: maximum number of echo requests
+        :param timeout: time (in seconds) to wait for reply of every request
+        :param privileged: True - raw socket, False - datagram socket (see icmplib documentation)
+        :return: True if host replied
+        """
+        return self.run(self._ping(address=address, count=count, timeout=timeout, privileged=privileged))
+
+    async def async_ping(self, address: str, count: int, timeout: float, privileged: bool) -> bool:
+        """
+        Same as ping(), but doesn't block event loop of caller
+        """
+        return await self.async_run(self._ping(address=address, count=count, timeout=timeout, privileged=privileged))
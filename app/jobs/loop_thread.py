@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+
+class LoopThread:
+    """
+    Base of engines shared by all jobs. Engine runs own event loop in daemon thread, loop is started on first use, so
+    engine is used by thread per job engine (run(), blocks calling thread) and by asyncio engine (async_run(), doesn't
+    block event loop of caller) the same way.
+    """
+
+    def __init__(self, name: str):
+        """
+        :param name: name of loop thread
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name=self.name, daemon=True)
+                self._thread.start()
+            return self._loop
+
+    async def _close(self):
+        """
+        Release sockets and connections of engine, called from engine loop before it stops
+        """
+
+    def stop(self):
+        """
+        Close engine and stop its event loop
+        :return:
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self._close(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+
+    def run(self, coroutine):
+        """
+        Run coroutine on engine loop, blocks caller until it ends
+        :return: result of coroutine
+        """
+        loop = self._start()
+        return asyncio.run_coroutine_threadsafe(coroutine, loop).result()
+
+    async def async_run(self, coroutine):
+        """
+        Run coroutine on engine loop without blocking event loop of caller
+        :return: result of coroutine
+        """
+        loop = self._start()
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, loop))
@@ -0,0 +1,131 @@
+import logging
+import random
+import zlib
+
+# number of stable tests in a row after which interval is doubled (up to max_interval)
+STABLE_CYCLES = 3
+
+
+class Pacing:
+    """
+    Decide when job runs its tests. Jobs started at the same moment with the same interval would test hosts (and send
+    api requests) at the same second forever, with stagger every job gets fixed offset within its interval derived
+    from its domain, so tests of all jobs are spread over the interval.
+
+    Tests are planned on absolute deadlines of monotonic clock, so time spent by test doesn't move next tests. Test
+    which takes longer than interval (overrun) is counted and next test is planned one interval after it ends, so late
+    job never runs tests back to back.
+
+    Interval is adaptive when min_interval or max_interval differs from interval: when answer changes (for ex. host
+    which was answer failed) next test comes after min_interval to confirm new state quickly, after every STABLE_CYCLES
+    tests without change interval is doubled up to max_interval.
+    """
+
+    def __init__(self, domain: str, interval: float, stagger: bool = False, jitter: float = 0.0,
+                 min_interval: float = None, max_interval: float = None):
+        """
+        :param domain: domain of job, offset of job is derived from it
+        :param interval: seconds between tests
+        :param stagger: True - first test is delayed by offset of job, False - first test runs immediately
+        :param jitter: maximum random time (in seconds) added to every interval
+        :param min_interval: seconds between tests when answer changed, None - the same as interval
+        :param max_interval: maximum seconds between tests when answer is stable, None - the same as interval
+        """
+        self.domain = domain
+        self.interval = interval
+        self.min_interval = min_interval or interval
+        self.max_interval = max_interval or interval
+        self._stable = 0
+        self.stagger = stagger
+        self.jitter = jitter
+
+        # deadlines are aligned to interval, jitter is added only to planned time of single test, so it doesn't
+        # accumulate
+        self.deadline = None
+        self.planned = None
+        self.overruns = 0
+        self.lag = 0.0
+        self.max_lag = 0.0
+
+    def offset(self) -> float:
+        """
+        :return: offset of job within interval, the same domain gets always the same offset
+        """
+        return zlib.crc32(self.domain.encode()) % 1000 / 1000 * self.interval
+
+    def start_delay(self) -> float:
+        """
+        :return: time (in seconds) to first test
+        """
+        return self.offset() if self.stagger else 0.0
+
+    def jitter_delay(self) -> float:
+        """
+        :return: random time (in seconds) added to deadline of next test
+        """
+        if self.jitter > 0:
+            return random.uniform(0, self.jitter)
+        return 0.0
+
+    def first(self, now: float) -> float:
+        """
+        Plan first test
+        :param now: actual monotonic time
+        :return: time (in seconds) to first test
+        """
+        delay = self.start_delay()
+        self.deadline = now + delay
+        self.planned = self.deadline
+        return delay
+
+    def begin(self, now: float):
+        """
+        Test starts, measure how late it is
+        :param now: actual monotonic time
+        :return:
+        """
+        if self.deadline is None:
+            self.deadline = now
+            self.planned = now
+        self.lag = max(0.0, now - self.planned)
+        self.max_lag = max(self.max_lag, self.lag)
+
+    def end(self, now: float) -> float:
+        """
+        Test ended, plan next one
+        :param now: actual monotonic time
+        :return: time (in seconds) to next test
+        """
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += self.interval
+        if self.deadline <= now:
+            self.overruns += 1
+            logging.warning(msg=f"Test of {self.domain} took longer than interval ({self.overruns}x), "
+                                f"late by {now - self.deadline:.1f}s")
+            self.deadline = now + self.interval
+        self.planned = self.deadline + self.jitter_delay()
+        return self.planned - now
+
+    def adapt(self, stable: bool):
+        """
+        Change interval by result of test, must be called before end()
+        :param stable: True if answer of job didn't change
+        :return:
+        """
+        if stable is False:
+            self._stable = 0
+            self.interval = self.min_interval
+            return
+
+        self._stable += 1
+        if self._stable >= STABLE_CYCLES:
+            self._stable = 0
+            self.interval = min(self.max_interval, self.interval * 2)
+
+    def stats(self) -> dict:
+        """
+        :return: actual interval, number of overruns, lag of last test and maximum lag (in seconds)
+        """
+        return {"domain": self.domain, "interval": self.interval, "overruns": self.overruns, "lag": self.lag,
+                "max_lag": self.max_lag}
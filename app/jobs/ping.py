@@ -1,12 +1,20 @@
 import logging
 import threading
 import time
+from concurrent.futures import Executor
 from typing import Union
 
 from icmplib import NameLookupError as ICMPLookupError
-from icmplib import ping
+from icmplib import ping, async_ping
 
 from app.api.connector import ApiConnector
+from app.api.reconciler import Reconciler
+from app.api.write_queue import WriteQueue
+from app.data import default
+from app.jobs.icmp_engine import IcmpEngine
+from app.jobs.health import HostHealth
+from app.jobs.pacing import Pacing
+from app.jobs.probe_cache import ProbeCache
 from app.data.jobs_configurations import JobPing
 from ._common import Common
 
@@ -16,42 +24,110 @@ class Test(Common, threading.Thread):
     Send ICMP package to all host mentioned in dns answers
     """
 
-    def __init__(self, config: JobPing, api_connect: Union[ApiConnector, None]):
+    def __init__(self, config: JobPing, api_connect: Union[ApiConnector, None],
+                 writer: Union[Reconciler, WriteQueue, None] = None, cache: Union[ProbeCache, None] = None,
+                 icmp_engine: Union[IcmpEngine, None] = None, stagger: bool = False, jitter: float = 0.0,
+                 drift_check: float = default.Config.drift_check):
         """
         Create configuration variables
 
         :param config: Configuration storage class for ping job
         :param api_connect: configured ApiConnector clas, may be set to None by unittests
+        :param writer: reconciler or write queue which writes answers, None if job writes answers itself
+        :param cache: probe results shared by all jobs, None - every probe is sent
+        :param icmp_engine: engine which sends pings of all jobs through shared socket, None - icmplib socket is
+                            opened for every ping
+        :param stagger: delay first test by offset of job within interval (derived from domain)
+        :param jitter: maximum random time (in seconds) added to every interval
+        :param drift_check: seconds between checks of AdGuardHome when answer doesn't change
          """
         if api_connect is not None:
             threading.Thread.__init__(self)
-        super().__init__(domain=config.domain(), answers=config.answers(), api_connect=api_connect)
+        super().__init__(domain=config.domain(), answers=config.answers(), api_connect=api_connect,
+                         writer=writer, cache=cache,
+                         pacing=Pacing(domain=config.domain(), interval=config.interval(), stagger=stagger,
+                                       jitter=jitter, min_interval=config.min_interval(),
+                                       max_interval=config.max_interval()),
+                         health=HostHealth(hosts=len(config.answers()), rise=config.rise(), fall=config.fall(),
+                                           hold=config.hold()),
+                         drift_check=drift_check)
 
         self.conf = config
+        self.icmp_engine = icmp_engine
+
+    def log_status(self, host: str, is_alive: bool, started: float) -> bool:
+        """
+        Log result of ping, host which didn't reply is counted as timeout
+        :param started: monotonic time when ping started
+        :return: is_alive
+        """
+        if is_alive:
+            logging.info("Test (status) of: " + host + " ok")
+        else:
+            self.count_timeout(seconds=time.monotonic() - started)
+            logging.info("Test (status) of: " + host + " host dead")
+        return is_alive
 
     def job_request(self, host: str):
         """
         Send ping to host
         :return: True if the host respond to ping, otherwise return False
         """
+        started = time.monotonic()
         try:
             logging.info("Test (start) of: " + host)
+            if self.icmp_engine is not None:
+                return self.log_status(host=host, started=started, is_alive=self.icmp_engine.ping(
+                    address=host, count=self.conf.count(), timeout=self.conf.timeout(),
+                    privileged=self.conf.privileged()))
             response = ping(address=host, count=self.conf.count(), timeout=self.conf.timeout(),
                             privileged=self.conf.privileged())
-            if response.is_alive:
-                logging.info("Test (status) of: " + host + " ok")
-            else:
-                logging.info("Test (status) of: " + host + " host dead")
-            return response.is_alive
+            return self.log_status(host=host, is_alive=response.is_alive, started=started)
         except ICMPLookupError:
             logging.info("Test (status) of: " + host + " failed ( NameLookupError )")
             return False
 
-    def run(self):
+    async def async_job_request(self, host: str):
+        """
+        Send ping to host without blocking event loop
+        :return: True if the host respond to ping, otherwise return False
+        """
+        started = time.monotonic()
+        try:
+            logging.info("Test (start) of: " + host)
+            if self.icmp_engine is not None:
+                return self.log_status(host=host, started=started, is_alive=await self.icmp_engine.async_ping(
+                    address=host, count=self.conf.count(), timeout=self.conf.timeout(),
+                    privileged=self.conf.privileged()))
+            response = await async_ping(address=host, count=self.conf.count(), timeout=self.conf.timeout(),
+                                        privileged=self.conf.privileged())
+            return self.log_status(host=host, is_alive=response.is_alive, started=started)
+        except ICMPLookupError:
+            logging.info("Test (status) of: " + host + " failed ( NameLookupError )")
+            return False
+
+    def probe_key(self, host: str) -> tuple:
+        return "ping", host, self.conf.count(), self.conf.timeout(), self.conf.privileged()
+
+    def probe_hosts(self) -> list:
+        """
+        Ping hosts as configured by probe mode
+        :return: list of hosts statuses
+        """
+        return self.probe_all(probe=self.cached(probe=self.job_request), mode=self.conf.probe_mode())
 
+    async def async_probe_hosts(self, executor: Executor) -> list:
+        """
+        Ping all hosts, icmplib sockets are used directly by event loop so executor is not needed
+        :param executor: executor shared by all jobs
+        :return: list of hosts statuses
+        """
+        return await self.async_probe_all(probe=self.async_cached(probe=self.async_job_request),
+                                          mode=self.conf.probe_mode())
+
+    def run(self):
+        time.sleep(self.pacing.first(now=time.monotonic()))
         while True:
-            logging.info("Test start for domain:" + self.conf.domain())
-            self.hosts_statuses = [self.job_request(host=host) for host in self.conf.answers()]
-            logging.info("Test stop for domain:" + self.conf.domain())
-            self.api_callback()
-            time.sleep(self.conf.interval())
+            self.pacing.begin(now=time.monotonic())
+            self.cycle()
+            time.sleep(self.pacing.end(now=time.monotonic()))
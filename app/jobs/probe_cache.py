@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+# seconds between reports of cache statistics
+REPORT_INTERVAL = 60
+
+
+class ProbeCache:
+    """
+    Results of probes shared by all jobs. The same host is often an answer of several jobs, with cache it is probed
+    once per TTL instead of once per job. Jobs which ask for host which is being probed wait for that probe instead of
+    starting their own.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> (time of result, result)
+        self._results = {}
+        # key -> Future of probe which is running
+        self._in_flight = {}
+        # key -> shortest interval of jobs which use key
+        self._ttl = {}
+        # asyncio probes which are running, detached from jobs which started them
+        self._tasks = set()
+        self._last_report = time.monotonic()
+
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+
+    def stats(self) -> dict:
+        """
+        :return: number of results taken from cache (hits), probes which were sent (misses) and probes shared by
+                 more jobs at the same time (shared)
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "shared": self.shared, "keys": len(self._results)}
+
+    def _lookup(self, key: tuple, ttl: float):
+        """
+        Find result of key or probe which is running, must be called with lock held
+        :return: tuple (cached result or None, Future of running probe or None, True if caller must probe)
+        """
+        now = time.monotonic()
+        if now - self._last_report >= REPORT_INTERVAL:
+            self._last_report = now
+            logging.info(msg=f"Probe cache hits: {self.hits}, misses: {self.misses}, shared: {self.shared}")
+
+        self._ttl[key] = min(ttl, self._ttl.get(key, ttl))
+        if key in self._results:
+            probed_at, result = self._results[key]
+            if now - probed_at < self._ttl[key]:
+                self.hits += 1
+                return result, None, False
+
+        if key in self._in_flight:
+            self.shared += 1
+            return None, self._in_flight[key], False
+
+        self.misses += 1
+        future = Future()
+        self._in_flight[key] = future
+        return None, future, True
+
+    def _finish(self, key: tuple, future: Future, result):
+        with self._lock:
+            del self._in_flight[key]
+            if result is not None:
+                self._results[key] = (time.monotonic(), result)
+        future.set_result(result)
+
+    def get(self, key: tuple, probe, ttl: float):
+        """
+        Return cached result of probe, probe host when result is older than ttl
+        :param key: identifies probe, for ex.: ("ping", address, count, timeout, privileged)
+        :param probe: function without arguments which probes host
+        :param ttl: maximum age of result (in seconds), the shortest ttl used with key is kept
+        :return: result of probe
+        """
+        with self._lock:
+            result, future, owner = self._lookup(key=key, ttl=ttl)
+        if future is None:
+            return result
+        if owner is False:
+            return future.result()
+
+        result = None
+        try:
+            result = probe()
+        finally:
+            # waiting jobs get None when probe raised, they treat it as not probed host
+            self._finish(key=key, future=future, result=result)
+        return result
+
+    async def async_get(self, key: tuple, probe, ttl: float):
+        """
+        Same as get(), but probe is coroutine function, waiting for running probe doesn't block event loop
+        """
+        with self._lock:
+            result, future, owner = self._lookup(key=key, ttl=ttl)
+        if future is None:
+            return result
+        if owner is False:
+            # shield, so job cancelled while waiting (RACE mode) doesn't cancel probe of other job
+            return await asyncio.shield(asyncio.wrap_future(future))
+
+        # probe runs in own task, so job which started it and is cancelled (RACE mode) doesn't cancel probe which
+        # other jobs wait for
+        task = asyncio.ensure_future(self._async_probe(key=key, future=future, probe=probe))
+        self._tasks.add(task)
+        task.add_done_callback(self._forget)
+        return await asyncio.shield(task)
+
+    async def _async_probe(self, key: tuple, future: Future, probe):
+        result = None
+        try:
+            result = await probe()
+        finally:
+            # waiting jobs get None when probe raised, they treat it as not probed host
+            self._finish(key=key, future=future, result=result)
+        return result
+
+    def _forget(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        # exception was already passed to job which started probe, unless that job was cancelled
+        if task.cancelled() is False:
+            task.exception()
@@ -0,0 +1,189 @@
+import logging
+import ssl
+import threading
+import time
+from typing import Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+# keep-alive connections kept per target, more connections are opened when needed but not kept
+CONNECTIONS_PER_TARGET = 2
+# seconds between reports of pool statistics
+REPORT_INTERVAL = 60
+
+
+def send(session: requests.Session, method: str, url: str, timeout: Union[float, tuple]) -> requests.Response:
+    """
+    Send streamed request, redirect is not followed. Session.request() reads whole body of redirect response even when
+    redirects are not followed, so request is sent by transport adapter of session directly.
+    :param session: session which prepares request and which adapter sends it
+    :param method: http method
+    :param url: url of target
+    :param timeout: request timeout, or tuple (connect timeout, read timeout)
+    :return: response with unread body
+    """
+    prepared = session.prepare_request(requests.Request(method=method, url=url))
+    # CA bundle and proxies from environment, the same as Session.request() uses
+    settings = session.merge_environment_settings(url=prepared.url, proxies={}, stream=True, verify=None, cert=None)
+    return session.get_adapter(url=prepared.url).send(prepared, timeout=timeout, **settings)
+
+
+class StaleRetry(Retry):
+    """
+    Retry request once when connection was closed by server (for ex. idle keep-alive connection closed while request
+    was sent). Failed connects and timeouts are not retried, so host which is down is still reported after one attempt.
+    Read timeout which is not retried ends as MaxRetryError, ProbePool.request() raises it as requests.ReadTimeout.
+    """
+
+    def _is_read_error(self, err: Exception) -> bool:
+        return isinstance(err, ProtocolError)
+
+
+class ResumingSocket(ssl.SSLSocket):
+    """
+    TLS socket which gives its session to context when it is closed. TLS 1.3 session becomes resumable only after
+    ticket sent by server after handshake is read, so session is taken as late as possible.
+    """
+    target = None
+
+    def _real_close(self):
+        # called once, when socket is closed and no file object uses it
+        self.context.remember(ssl_sock=self)
+        super()._real_close()
+
+
+class ResumingContext(ssl.SSLContext):
+    """
+    TLS context which resumes TLS sessions, new connection to target reuses session of previous connection to the same
+    target, so full handshake is done only once per target (until server forgets session)
+    """
+    sslsocket_class = ResumingSocket
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._lock = threading.Lock()
+        # (address, port) -> last session of target
+        self._sessions = {}
+        # CA bundles (file, directory) already loaded into context
+        self._locations = set()
+        self.handshakes = 0
+        self.resumed = 0
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        target = sock.getpeername()[:2]
+        with self._lock:
+            session = session or self._sessions.get(target)
+        ssl_sock = super().wrap_socket(sock, *args, server_hostname=server_hostname, session=session, **kwargs)
+        ssl_sock.target = target
+        with self._lock:
+            self.handshakes += 1
+            if ssl_sock.session_reused:
+                self.resumed += 1
+        self.remember(ssl_sock=ssl_sock)
+        return ssl_sock
+
+    def load_once(self, cafile: str = None, capath: str = None):
+        """
+        Load CA bundle into context, bundle which is already loaded is skipped
+        """
+        with self._lock:
+            if (cafile, capath) not in self._locations:
+                self.load_verify_locations(cafile=cafile, capath=capath)
+                self._locations.add((cafile, capath))
+
+    def remember(self, ssl_sock: ResumingSocket):
+        """
+        Keep session of connection for next connection to the same target
+        """
+        try:
+            session = ssl_sock.session
+            version = ssl_sock.version()
+        except (OSError, ValueError):
+            return
+        # TLS 1.3 session without ticket can't be resumed, it would replace usable session
+        if ssl_sock.target is not None and session is not None and (session.has_ticket or version != "TLSv1.3"):
+            with self._lock:
+                self._sessions[ssl_sock.target] = session
+
+
+class ProbeAdapter(HTTPAdapter):
+    """
+    Transport adapter which opens https connections with resuming TLS context
+    """
+
+    def __init__(self, context: ResumingContext, **kwargs):
+        self.context = context
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections: int, maxsize: int, block: bool = False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block=block, ssl_context=self.context, **pool_kwargs)
+
+    def cert_verify(self, conn, url: str, verify, cert):
+        super().cert_verify(conn, url, verify, cert)
+        if conn.ca_certs is not None or getattr(conn, "ca_cert_dir", None) is not None:
+            # CA bundle is loaded into context once, not on every connect
+            self.context.load_once(cafile=conn.ca_certs, capath=getattr(conn, "ca_cert_dir", None))
+            conn.ca_certs = None
+            conn.ca_cert_dir = None
+
+
+class ProbePool:
+    """
+    Keep-alive connections of http probes shared by all http jobs, one pool per target (proto, address, port). Https
+    connections resume TLS sessions, so reconnect to target doesn't need full handshake.
+    """
+
+    def __init__(self, targets: int):
+        """
+        :param targets: number of different targets probed by http jobs, pool of every target is kept
+        """
+        self.context = ResumingContext(ssl.PROTOCOL_TLS_CLIENT)
+        self.adapter = ProbeAdapter(context=self.context, pool_connections=max(targets, 1),
+                                    pool_maxsize=CONNECTIONS_PER_TARGET,
+                                    max_retries=StaleRetry(total=1, connect=0, read=1, redirect=None, status=0,
+                                                           other=0, raise_on_redirect=False, raise_on_status=False))
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+        self._lock = threading.Lock()
+        self._last_report = time.monotonic()
+        self.requests = 0
+
+    def stats(self) -> dict:
+        """
+        :return: number of requests, TLS handshakes and resumed TLS sessions (handshakes without certificate exchange)
+        """
+        return {"requests": self.requests, "handshakes": self.context.handshakes, "resumed": self.context.resumed}
+
+    def request(self, method: str, url: str, timeout: Union[float, tuple]) -> requests.Response:
+        """
+        Send request using pooled connection, response is streamed, body must be drained or response closed by caller.
+        Redirect is not followed (see send()), body of redirect response is drained by caller too.
+        :param method: http method
+        :param url: url of target
+        :param timeout: request timeout, or tuple (connect timeout, read timeout)
+        :return: response
+        :raises requests.ReadTimeout: host didn't send response in time, the same as without pool
+        """
+        with self._lock:
+            self.requests += 1
+            now = time.monotonic()
+            report = now - self._last_report >= REPORT_INTERVAL
+            if report:
+                self._last_report = now
+        if report:
+            stats = self.stats()
+            logging.info(msg=f"Probe pool requests: {stats['requests']}, handshakes: {stats['handshakes']}, "
+                             f"resumed: {stats['resumed']}")
+
+        try:
+            return send(session=self.session, method=method, url=url, timeout=timeout)
+        except requests.ConnectionError as e:
+            reason = e.args[0].reason if len(e.args) > 0 and isinstance(e.args[0], MaxRetryError) else None
+            if isinstance(reason, ReadTimeoutError):
+                raise requests.ReadTimeout(reason, request=e.request) from e
+            raise
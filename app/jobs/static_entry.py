@@ -1,33 +1,67 @@
+import asyncio
 import logging
 import threading
 import time
+from concurrent.futures import Executor
 from typing import Union
 
 from app.api.connector import ApiConnector
+from app.api.reconciler import Reconciler
+from app.api.write_queue import WriteQueue
 from app.data.jobs_configurations import JobStaticEntry
+from app.jobs.pacing import Pacing
 
 
 class Test(threading.Thread):
-    def __init__(self, config: JobStaticEntry, api_connect: Union[ApiConnector, None]):
+    def __init__(self, config: JobStaticEntry, api_connect: Union[ApiConnector, None],
+                 writer: Union[Reconciler, WriteQueue, None] = None, stagger: bool = False, jitter: float = 0.0):
         if api_connect is not None:
             threading.Thread.__init__(self)
         self.domain = config.domain()
         self.answer = config.answers()
         self.conf = config
         self.api_connect = api_connect
+        self.writer = writer
+        self.pacing = Pacing(domain=config.domain(), interval=config.interval(), stagger=stagger, jitter=jitter)
 
     def job_request(self):
         """
-        Check if entry exist
-        :return: True if entry exist false if not
+        Check if entry exist, add it if not
+        :return: True if entry exist (or was added), False or None if entry can't be added
         """
-        return self.api_connect.entry_exist(answer=self.answer[0], domain=self.domain)
+        return self.api_connect.ensure_answer(answer=self.answer[0], domain=self.domain, exclusive=False)
+
+    def cycle(self):
+        """
+        Check entry once
+        :return:
+        """
+        if self.writer is not None:
+            # reconciler keeps published entry in place, write queue writes it once, so it is published every interval
+            # to be checked (and added again when it was deleted)
+            self.writer.publish(domain=self.domain, answer=self.answer[0], exclusive=False)
+            return
+
+        logging.info(msg="Test start for domain:" + self.domain)
+        self.job_request()
+        logging.info(msg="Test stop for domain:" + self.domain)
+
+    async def async_cycle(self, executor: Executor):
+        """
+        Check entry once, used by asyncio engine
+        :param executor: executor for blocking calls, shared by all jobs
+        :return:
+        """
+        await asyncio.get_running_loop().run_in_executor(executor, self.cycle)
 
     def run(self):
+        if isinstance(self.writer, Reconciler):
+            # desired state never changes, reconciler compares it with rewrite list on every tick
+            self.cycle()
+            return
+
+        time.sleep(self.pacing.first(now=time.monotonic()))
         while True:
-            logging.info(msg="Test start for domain:" + self.domain)
-            status = self.job_request()
-            if status is False:
-                self.api_connect.add_entry(answer=self.answer[0], domain=self.domain)
-            logging.info(msg="Test stop for domain:" + self.domain)
-            time.sleep(self.conf.interval())
+            self.pacing.begin(now=time.monotonic())
+            self.cycle()
+            time.sleep(self.pacing.end(now=time.monotonic()))
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import Executor
+from typing import Union
+
+from app.api.connector import ApiConnector
+from app.api.reconciler import Reconciler
+from app.api.write_queue import WriteQueue
+from app.data import default
+from app.jobs.health import HostHealth
+from app.jobs.pacing import Pacing
+from app.jobs.probe_cache import ProbeCache
+from app.jobs.tcp_engine import TcpEngine
+from app.data.jobs_configurations import JobTcp
+from ._common import Common
+
+
+class Test(Common, threading.Thread):
+    """
+    Open tcp connection to port of all hosts mentioned in dns answers, host which completes handshake is live
+    """
+
+    def __init__(self, config: JobTcp, api_connect: Union[ApiConnector, None],
+                 writer: Union[Reconciler, WriteQueue, None] = None, cache: Union[ProbeCache, None] = None,
+                 tcp_engine: Union[TcpEngine, None] = None, stagger: bool = False, jitter: float = 0.0,
+                 drift_check: float = default.Config.drift_check):
+        """
+        Create configuration variables
+
+        :param config: Configuration storage class for tcp job
+        :param api_connect: configured ApiConnector class, may be set to None by unittests
+        :param writer: reconciler or write queue which writes answers, None if job writes answers itself
+        :param cache: probe results shared by all jobs, None - every probe is sent
+        :param tcp_engine: engine which multiplexes connects of all tcp jobs, None - job creates its own engine
+        :param stagger: delay first test by offset of job within interval (derived from domain)
+        :param jitter: maximum random time (in seconds) added to every interval
+        :param drift_check: seconds between checks of AdGuardHome when answer doesn't change
+        """
+        if api_connect is not None:
+            threading.Thread.__init__(self)
+        super().__init__(domain=config.domain(), answers=config.answers(), api_connect=api_connect,
+                         writer=writer, cache=cache,
+                         pacing=Pacing(domain=config.domain(), interval=config.interval(), stagger=stagger,
+                                       jitter=jitter, min_interval=config.min_interval(),
+                                       max_interval=config.max_interval()),
+                         health=HostHealth(hosts=len(config.answers()), rise=config.rise(), fall=config.fall(),
+                                           hold=config.hold()),
+                         drift_check=drift_check)
+
+        self.conf = config
+        self.tcp_engine = tcp_engine if tcp_engine is not None else TcpEngine()
+
+    def target(self, host: str) -> str:
+        return host + ":" + str(self.conf.port())
+
+    def log_failed(self, host: str, reason: str) -> bool:
+        logging.info("Test (status) of: " + self.target(host=host) + " failed (" + reason + ")")
+        return False
+
+    def job_request(self, host: str):
+        """
+        Connect to port of host, refused connect is reported apart from timeout and is not counted as timeout
+        :return: True if host accepted connection, otherwise return False
+        """
+        started = time.monotonic()
+        try:
+            logging.info("Test (start) of: " + self.target(host=host))
+            self.tcp_engine.connect(address=host, port=self.conf.port(), timeout=self.conf.timeout())
+        except asyncio.TimeoutError:
+            self.count_timeout(seconds=time.monotonic() - started)
+            return self.log_failed(host=host, reason="Timeout")
+        except ConnectionRefusedError:
+            return self.log_failed(host=host, reason="Connection refused")
+        except OSError as e:
+            return self.log_failed(host=host, reason=str(e.strerror))
+        logging.info("Test (status) of: " + self.target(host=host) + " ok")
+        return True
+
+    async def async_job_request(self, host: str):
+        """
+        Connect to port of host without blocking event loop
+        :return: True if host accepted connection, otherwise return False
+        """
+        started = time.monotonic()
+        try:
+            logging.info("Test (start) of: " + self.target(host=host))
+            await self.tcp_engine.async_connect(address=host, port=self.conf.port(), timeout=self.conf.timeout())
+        except asyncio.TimeoutError:
+            self.count_timeout(seconds=time.monotonic() - started)
+            return self.log_failed(host=host, reason="Timeout")
+        except ConnectionRefusedError:
+            return self.log_failed(host=host, reason="Connection refused")
+        except OSError as e:
+            return self.log_failed(host=host, reason=str(e.strerror))
+        logging.info("Test (status) of: " + self.target(host=host) + " ok")
+        return True
+
+    def probe_key(self, host: str) -> tuple:
+        return "tcp", host, self.conf.port(), self.conf.timeout()
+
+    def probe_hosts(self) -> list:
+        """
+        Connect to hosts as configured by probe mode
+        :return: list of hosts statuses
+        """
+        return self.probe_all(probe=self.cached(probe=self.job_request), mode=self.conf.probe_mode())
+
+    async def async_probe_hosts(self, executor: Executor) -> list:
+        """
+        Connect to all hosts, connects are done by engine so executor is not needed
+        :param executor: executor shared by all jobs
+        :return: list of hosts statuses
+        """
+        return await self.async_probe_all(probe=self.async_cached(probe=self.async_job_request),
+                                          mode=self.conf.probe_mode())
+
+    def run(self):
+        time.sleep(self.pacing.first(now=time.monotonic()))
+        while True:
+            self.pacing.begin(now=time.monotonic())
+            self.cycle()
+            time.sleep(self.pacing.end(now=time.monotonic()))
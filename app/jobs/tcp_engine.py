@@ -0,0 +1,79 @@
+import asyncio
+import ipaddress
+import socket
+import struct
+
+from app.jobs.loop_thread import LoopThread
+
+# close connection with RST right after handshake, so client doesn't keep socket in TIME_WAIT for every probe
+LINGER_RESET = struct.pack("ii", 1, 0)
+
+
+class TcpEngine(LoopThread):
+    """
+    Tcp connect engine shared by all tcp jobs. Sockets are non-blocking and connects of all jobs are multiplexed by
+    selector of one event loop, so hundreds of connects can be in flight without thread per connect. Connection is
+    closed right after handshake, nothing is sent. Refused connect (RST from host) ends as soon as it is received,
+    only host which doesn't answer at all waits for timeout.
+    """
+
+    def __init__(self):
+        super().__init__(name="tcp-engine")
+
+        self.connects = 0
+        self.established = 0
+        self.refused = 0
+        self.timeouts = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def stats(self) -> dict:
+        """
+        :return: number of connects, established and refused connections, timed out connects and maximum number of
+                 connects in flight
+        """
+        return {"connects": self.connects, "established": self.established, "refused": self.refused,
+                "timeouts": self.timeouts, "max_in_flight": self.max_in_flight}
+
+    async def _connect(self, address: str, port: int, timeout: float):
+        """
+        Open and close connection, called only from engine loop
+        """
+        ip = ipaddress.ip_address(address)
+        sock = socket.socket(socket.AF_INET if ip.version == 4 else socket.AF_INET6, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        self.connects += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.wait_for(self._loop.sock_connect(sock, (str(ip), port)), timeout=timeout)
+            self.established += 1
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, LINGER_RESET)
+        except ConnectionRefusedError:
+            self.refused += 1
+            raise
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            sock.close()
+
+    def connect(self, address: str, port: int, timeout: float):
+        """
+        Connect to port of host, blocks caller until result is known
+        :param address: ip address of host
+        :param port: tcp port
+        :param timeout: time (in seconds) to wait for handshake
+        :return:
+        :raises ConnectionRefusedError: host refused connection (port is closed)
+        :raises asyncio.TimeoutError: host didn't answer in time
+        :raises OSError: other connect error, for ex. host is unreachable
+        """
+        self.run(self._connect(address=address, port=port, timeout=timeout))
+
+    async def async_connect(self, address: str, port: int, timeout: float):
+        """
+        Same as connect(), but doesn't block event loop of caller
+        """
+        await self.async_run(self._connect(address=address, port=port, timeout=timeout))
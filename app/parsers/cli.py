@@ -17,6 +17,7 @@ class CliParser:
         self.config_file = ""
         self.log_file = ""
         self.log_level = INFO
+        self.engine = "threads"
 
     def print_help(self):
         """
@@ -31,6 +32,8 @@ class CliParser:
         print("\t--log-file=<file name>, set log output file")
         print("\t--log-level=<level>, set log level")
         print("\t\tavailable levels: DEBUG, INFO, WARNING, ERROR, CRITICAL")
+        print("\t--engine=<engine>, set how jobs are run")
+        print("\t\tavailable engines: threads (thread per job, default), asyncio (all jobs on one event loop)")
         exit(0)
 
     def find_args(self):
@@ -41,7 +44,7 @@ class CliParser:
 
         config_file_set = False
 
-        if len(self.argv) <= 1 or len(self.argv) > 5:
+        if len(self.argv) <= 1 or len(self.argv) > 6:
             self.print_help()
 
         for arg in self.argv[1:]:
@@ -58,6 +61,13 @@ class CliParser:
                 level = parse_logging_level(arg[len('--log-level') + 1:])
                 if level is not False:
                     self.log_level = level
+
+            elif arg[0:len('--engine')] == '--engine':
+                engine = arg[len('--engine') + 1:]
+                if engine in ("threads", "asyncio"):
+                    self.engine = engine
+                else:
+                    self.print_help()
             else:
                 if config_file_set is False:
                     self.config_file = arg
@@ -8,7 +8,9 @@ from yaml.loader import SafeLoader
 from app.utils import parse_value_with_default, check_linux_permissions, parse_logging_level, match_port_to_protocol
 from app.data import default
 from app.data.validator import validate_ip, validate_domain, validate_network_port, validate_http_response_code, \
-    validate_ips, validate_ping_count, validate_interval, validate_timeout, validate_proto
+    validate_ips, validate_ping_count, validate_interval, validate_timeout, validate_proto, validate_pool_size, \
+    validate_write_mode, validate_write_spacing, validate_rate_limit, validate_probe_mode, validate_interval_range, \
+    validate_threshold, validate_http_method, validate_max_body, validate_tcp_port
 from app.data.jobs_configurations import JobsConfs
 from app.data.api_configuration import ApiConfiguration
 from app.data.config import Config
@@ -120,6 +122,30 @@ class ConfigParser:
                 timeout = parse_value_with_default(content=job, key='timeout',
                                                    default_value=default.HttpJob.timeout)
 
+                probe_mode = parse_value_with_default(content=job, key='probe_mode',
+                                                      default_value=default.HttpJob.probe_mode)
+
+                # 0 - the same as interval
+                min_interval = parse_value_with_default(content=job, key='min_interval',
+                                                        default_value=default.HttpJob.min_interval) or interval
+                max_interval = parse_value_with_default(content=job, key='max_interval',
+                                                        default_value=default.HttpJob.max_interval) or interval
+
+                rise = parse_value_with_default(content=job, key='rise', default_value=default.HttpJob.rise)
+                fall = parse_value_with_default(content=job, key='fall', default_value=default.HttpJob.fall)
+                hold = parse_value_with_default(content=job, key='hold', default_value=default.HttpJob.hold)
+
+                method = parse_value_with_default(content=job, key='method', default_value=default.HttpJob.method)
+                max_body = parse_value_with_default(content=job, key='max_body',
+                                                    default_value=default.HttpJob.max_body)
+
+                # 0 - the same as timeout
+                connect_timeout = parse_value_with_default(content=job, key='connect_timeout',
+                                                           default_value=default.HttpJob.connect_timeout)
+                read_timeout = parse_value_with_default(content=job, key='read_timeout',
+                                                        default_value=default.HttpJob.read_timeout)
+                budget = parse_value_with_default(content=job, key='budget', default_value=default.HttpJob.budget)
+
             except KeyError:
                 logging.error("Error in config file, http_jobs KeyError")
                 break
@@ -127,11 +153,21 @@ class ConfigParser:
             data_valid = validate_domain(domain=domain) and validate_interval(interval=interval) and \
                 validate_ips(ips=answers) and validate_network_port(port=port) and \
                 validate_http_response_code(code=status_code) and validate_timeout(timeout=timeout) and \
-                validate_proto(proto=proto)
+                validate_proto(proto=proto) and validate_probe_mode(probe_mode=probe_mode) and \
+                validate_interval(interval=min_interval) and validate_interval(interval=max_interval) and \
+                validate_interval_range(min_interval=min_interval, interval=interval, max_interval=max_interval) and \
+                validate_threshold(threshold=rise) and validate_threshold(threshold=fall) and \
+                validate_timeout(timeout=hold, gt=0) and validate_http_method(method=method) and \
+                validate_max_body(max_body=max_body) and validate_timeout(timeout=connect_timeout, gt=0) and \
+                validate_timeout(timeout=read_timeout, gt=0) and validate_timeout(timeout=budget, gt=0)
 
             if data_valid:
                 self.JobConfs.JobsHttp.append(interval=interval, status_code=status_code, proto=proto, domain=domain,
-                                              answers=answers, timeout=timeout, port=port)
+                                              answers=answers, timeout=timeout, port=port, probe_mode=probe_mode,
+                                              min_interval=min_interval, max_interval=max_interval, rise=rise,
+                                              fall=fall, hold=hold, method=method, max_body=max_body,
+                                              connect_timeout=connect_timeout, read_timeout=read_timeout,
+                                              budget=budget)
             else:
                 logging.info(f"Job for domain: {domain} not added, due to invalid parameters")
 
@@ -157,18 +193,90 @@ class ConfigParser:
                 privileged = parse_value_with_default(content=job, key='privileged',
                                                       default_value=default.PingJob.privileged)
 
+                probe_mode = parse_value_with_default(content=job, key='probe_mode',
+                                                      default_value=default.PingJob.probe_mode)
+
+                # 0 - the same as interval
+                min_interval = parse_value_with_default(content=job, key='min_interval',
+                                                        default_value=default.PingJob.min_interval) or interval
+                max_interval = parse_value_with_default(content=job, key='max_interval',
+                                                        default_value=default.PingJob.max_interval) or interval
+
+                rise = parse_value_with_default(content=job, key='rise', default_value=default.PingJob.rise)
+                fall = parse_value_with_default(content=job, key='fall', default_value=default.PingJob.fall)
+                hold = parse_value_with_default(content=job, key='hold', default_value=default.PingJob.hold)
+                budget = parse_value_with_default(content=job, key='budget', default_value=default.PingJob.budget)
+
             except KeyError:
                 logging.error("Error in config file, ping_jobs KeyError")
                 break
 
             data_valid = validate_domain(domain=domain) and validate_ips(ips=answers) and \
                 validate_ping_count(count=count) and validate_interval(interval=interval) and \
-                validate_timeout(timeout=timeout)
+                validate_timeout(timeout=timeout) and validate_probe_mode(probe_mode=probe_mode) and \
+                validate_interval(interval=min_interval) and validate_interval(interval=max_interval) and \
+                validate_interval_range(min_interval=min_interval, interval=interval, max_interval=max_interval) and \
+                validate_threshold(threshold=rise) and validate_threshold(threshold=fall) and \
+                validate_timeout(timeout=hold, gt=0) and validate_timeout(timeout=budget, gt=0)
 
             if data_valid:
                 self.JobConfs.JobsPing.append(interval=interval, count=count, timeout=timeout, domain=domain,
-                                              answers=answers, privileged=privileged)
+                                              answers=answers, privileged=privileged, probe_mode=probe_mode,
+                                              min_interval=min_interval, max_interval=max_interval, rise=rise,
+                                              fall=fall, hold=hold, budget=budget)
+
+            else:
+                logging.info(f"Job for domain: {domain} not added, due to invalid parameters")
+
+    def parse_tcp(self):
+        """
+        Parse tcp jobs, create dictionary compatible with run_jobs.py
+        :return:
+        """
+
+        for jobs in self.file_content['tcp_jobs']:
+            try:
+                job = jobs['job']
+                domain = job['domain']
+                answers = job['answers']
+                port = job['port']
 
+                interval = parse_value_with_default(content=job, key='interval',
+                                                    default_value=default.TcpJob.interval)
+                timeout = parse_value_with_default(content=job, key='timeout',
+                                                   default_value=default.TcpJob.timeout)
+
+                probe_mode = parse_value_with_default(content=job, key='probe_mode',
+                                                      default_value=default.TcpJob.probe_mode)
+
+                # 0 - the same as interval
+                min_interval = parse_value_with_default(content=job, key='min_interval',
+                                                        default_value=default.TcpJob.min_interval) or interval
+                max_interval = parse_value_with_default(content=job, key='max_interval',
+                                                        default_value=default.TcpJob.max_interval) or interval
+
+                rise = parse_value_with_default(content=job, key='rise', default_value=default.TcpJob.rise)
+                fall = parse_value_with_default(content=job, key='fall', default_value=default.TcpJob.fall)
+                hold = parse_value_with_default(content=job, key='hold', default_value=default.TcpJob.hold)
+                budget = parse_value_with_default(content=job, key='budget', default_value=default.TcpJob.budget)
+
+            except KeyError:
+                logging.error("Error in config file, tcp_jobs KeyError")
+                break
+
+            data_valid = validate_domain(domain=domain) and validate_ips(ips=answers) and \
+                validate_tcp_port(port=port) and validate_interval(interval=interval) and \
+                validate_timeout(timeout=timeout) and validate_probe_mode(probe_mode=probe_mode) and \
+                validate_interval(interval=min_interval) and validate_interval(interval=max_interval) and \
+                validate_interval_range(min_interval=min_interval, interval=interval, max_interval=max_interval) and \
+                validate_threshold(threshold=rise) and validate_threshold(threshold=fall) and \
+                validate_timeout(timeout=hold, gt=0) and validate_timeout(timeout=budget, gt=0)
+
+            if data_valid:
+                self.JobConfs.JobsTcp.append(interval=interval, timeout=timeout, domain=domain, answers=answers,
+                                             port=port, probe_mode=probe_mode, min_interval=min_interval,
+                                             max_interval=max_interval, rise=rise, fall=fall, hold=hold,
+                                             budget=budget)
             else:
                 logging.info(f"Job for domain: {domain} not added, due to invalid parameters")
 
@@ -197,37 +305,71 @@ class ConfigParser:
 
     def parse_api(self):
         """
-        Parse api configuration
+        Parse api configuration, api may be single AdGuardHome instance or list of instances. First instance is stored
+        in ApiConfs, others are added as its replicas.
         :return:
         """
         try:
             api = self.file_content['api']
-            host = api['host']
-            username = str(api['username'])
-            passwd = str(api['passwd'])
-
-            proto = parse_value_with_default(content=api, key='proto',
-                                             default_value=default.Api.proto)
-            port = parse_value_with_default(content=api, key='port',
-                                            default_value=default.Api.port)
-            timeout = parse_value_with_default(content=api, key='timeout',
-                                               default_value=default.Api.timeout)
-
-            startup = parse_value_with_default(content=api, key='startup',
-                                               default_value=default.Api.startup)
-
-            data_valid = validate_ip(ip=host) or validate_domain(domain=host)
-            data_valid = data_valid and validate_network_port(port=port)
-            if data_valid:
-                self.ApiConfs.set(host=host, username=username, passwd=passwd, proto=proto, timeout=timeout, port=port,
-                                  startup_enable=startup)
-            else:
-                logging.info("Api configuration error")
+            targets = api if isinstance(api, list) else [api]
+
+            for index, target in enumerate(targets):
+                config = self.ApiConfs if index == 0 else ApiConfiguration()
+                if self.parse_api_target(api=target, config=config) is False:
+                    logging.info("Api configuration error")
+                elif index > 0:
+                    self.ApiConfs.add_replica(config=config)
 
         except KeyError:
             logging.error("Config file error / api / KeyError")
             exit(-2)
 
+    def parse_api_target(self, api: dict, config: ApiConfiguration) -> bool:
+        """
+        Parse configuration of single AdGuardHome instance
+        :param api: content of api section (or list item)
+        :param config: configuration class where valid data are stored
+        :return: True if data are valid
+        """
+        host = api['host']
+        username = str(api['username'])
+        passwd = str(api['passwd'])
+
+        proto = parse_value_with_default(content=api, key='proto',
+                                         default_value=default.Api.proto)
+        port = parse_value_with_default(content=api, key='port',
+                                        default_value=default.Api.port)
+        timeout = parse_value_with_default(content=api, key='timeout',
+                                           default_value=default.Api.timeout)
+
+        startup = parse_value_with_default(content=api, key='startup',
+                                           default_value=default.Api.startup)
+        cache_ttl = parse_value_with_default(content=api, key='cache_ttl',
+                                             default_value=default.Api.cache_ttl)
+        pool_size = parse_value_with_default(content=api, key='pool_size',
+                                             default_value=default.Api.pool_size)
+        rate_limit = parse_value_with_default(content=api, key='rate_limit',
+                                              default_value=default.Api.rate_limit)
+        endpoint_rate_limits = {}
+        for endpoint in ('list', 'add', 'delete', 'update'):
+            endpoint_rate_limits['/control/rewrite/' + endpoint] = parse_value_with_default(
+                content=api, key='rate_limit_' + endpoint, default_value=getattr(default.Api, 'rate_limit_' + endpoint))
+
+        if pool_size == 0:
+            # every job runs in own thread, each thread may need own connection
+            pool_size = max(1, len(self.JobConfs.JobsHttp) + len(self.JobConfs.JobsPing) +
+                            len(self.JobConfs.JobsTcp) + len(self.JobConfs.JobsStaticEntry))
+
+        data_valid = validate_ip(ip=host) or validate_domain(domain=host)
+        data_valid = data_valid and validate_network_port(port=port) and validate_timeout(timeout=cache_ttl, gt=0) \
+            and validate_pool_size(pool_size=pool_size) and validate_rate_limit(rate_limit=rate_limit) \
+            and all([validate_rate_limit(rate_limit=limit) for limit in endpoint_rate_limits.values()])
+        if data_valid:
+            config.set(host=host, username=username, passwd=passwd, proto=proto, timeout=timeout, port=port,
+                       startup_enable=startup, cache_ttl=cache_ttl, pool_size=pool_size, rate_limit=rate_limit,
+                       endpoint_rate_limits=endpoint_rate_limits)
+        return data_valid
+
     def parse_config(self):
         """
         Pase config section
@@ -248,13 +390,78 @@ class ConfigParser:
                 entry_exist = parse_value_with_default(content=self.file_content['config'],
                                                        key='entry_exist',
                                                        default_value=default.Config.entry_exist)
+                write_mode = parse_value_with_default(content=self.file_content['config'],
+                                                      key='write_mode',
+                                                      default_value=default.Config.write_mode)
+                reconcile_interval = parse_value_with_default(content=self.file_content['config'],
+                                                              key='reconcile_interval',
+                                                              default_value=default.Config.reconcile_interval)
+                reconcile_workers = parse_value_with_default(content=self.file_content['config'],
+                                                             key='reconcile_workers',
+                                                             default_value=default.Config.reconcile_workers)
+                write_spacing = parse_value_with_default(content=self.file_content['config'],
+                                                         key='write_spacing',
+                                                         default_value=default.Config.write_spacing)
+                probe_cache = parse_value_with_default(content=self.file_content['config'],
+                                                       key='probe_cache',
+                                                       default_value=default.Config.probe_cache)
+                batch_ping = parse_value_with_default(content=self.file_content['config'],
+                                                      key='batch_ping',
+                                                      default_value=default.Config.batch_ping)
+                probe_pool = parse_value_with_default(content=self.file_content['config'],
+                                                      key='probe_pool',
+                                                      default_value=default.Config.probe_pool)
+                async_http = parse_value_with_default(content=self.file_content['config'],
+                                                      key='async_http',
+                                                      default_value=default.Config.async_http)
+                http_concurrency = parse_value_with_default(content=self.file_content['config'],
+                                                            key='http_concurrency',
+                                                            default_value=default.Config.http_concurrency)
+                stagger = parse_value_with_default(content=self.file_content['config'], key='stagger',
+                                                   default_value=default.Config.stagger)
+                jitter = parse_value_with_default(content=self.file_content['config'], key='jitter',
+                                                  default_value=default.Config.jitter)
+                drift_check = parse_value_with_default(content=self.file_content['config'], key='drift_check',
+                                                       default_value=default.Config.drift_check)
+
+                if validate_write_mode(write_mode=write_mode) is False:
+                    write_mode = default.Config.write_mode
+                if validate_interval(interval=reconcile_interval) is False:
+                    reconcile_interval = default.Config.reconcile_interval
+                if validate_pool_size(pool_size=reconcile_workers) is False:
+                    reconcile_workers = default.Config.reconcile_workers
+                if validate_write_spacing(write_spacing=write_spacing) is False:
+                    write_spacing = default.Config.write_spacing
+                if validate_timeout(timeout=jitter, gt=0) is False:
+                    jitter = default.Config.jitter
+                if validate_interval(interval=drift_check) is False:
+                    drift_check = default.Config.drift_check
+                if validate_pool_size(pool_size=http_concurrency) is False:
+                    http_concurrency = default.Config.http_concurrency
             else:
                 wait = default.Config.wait
                 log_level = default.Config.log_level
                 log_file = default.Config.log_file
                 entry_exist = default.Config.entry_exist
-
-            self.Confs.set(wait=wait, log_level=log_level, log_file=log_file, entry_exist=entry_exist)
+                write_mode = default.Config.write_mode
+                reconcile_interval = default.Config.reconcile_interval
+                reconcile_workers = default.Config.reconcile_workers
+                write_spacing = default.Config.write_spacing
+                probe_cache = default.Config.probe_cache
+                batch_ping = default.Config.batch_ping
+                probe_pool = default.Config.probe_pool
+                async_http = default.Config.async_http
+                http_concurrency = default.Config.http_concurrency
+                stagger = default.Config.stagger
+                jitter = default.Config.jitter
+                drift_check = default.Config.drift_check
+
+            self.Confs.set(wait=wait, log_level=log_level, log_file=log_file, entry_exist=entry_exist,
+                           write_mode=write_mode, reconcile_interval=reconcile_interval,
+                           reconcile_workers=reconcile_workers, write_spacing=write_spacing,
+                           probe_cache=probe_cache, batch_ping=batch_ping, probe_pool=probe_pool,
+                           async_http=async_http, http_concurrency=http_concurrency, stagger=stagger, jitter=jitter,
+                           drift_check=drift_check)
 
         except KeyError:
             logging.error("Config file error / Config / KeyError")
@@ -280,6 +487,10 @@ class ConfigParser:
             logging.info(msg="ping jobs found")
             self.parse_ping()
 
+        if "tcp_jobs" in self.file_content:
+            logging.info(msg="tcp jobs found")
+            self.parse_tcp()
+
         if 'static_entry' in self.file_content:
             logging.info(msg="static entry found")
             self.parser_static_entry()
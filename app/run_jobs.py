@@ -11,33 +11,75 @@ Difference between job and job request:
 
 When a job request failed (host is dead), appropriate action will be done, to change dns answer of specific domain.
 """
+import logging
+import threading
+import time
 
-
-from app.jobs import http, ping, static_entry
+from app.jobs import http, ping, static_entry, tcp
 from app.api.connector import ApiConnector
+from app.api.reconciler import Reconciler
+from app.api.write_queue import WriteQueue
+from app.jobs.http_engine import HttpEngine
+from app.jobs.icmp_engine import IcmpEngine
+from app.jobs.probe_cache import ProbeCache
+from app.jobs.probe_pool import ProbePool
+from app.jobs.tcp_engine import TcpEngine
 from app.data.jobs_configurations import JobsConfs
 from app.data.config import Config
+from app.scheduler import Scheduler
+
+# seconds between reports of jobs and api statistics
+REPORT_INTERVAL = 60
 
 
 class TestHosts:
 
     def __init__(self, jobs_confs: JobsConfs, config_configs: Config,
-                 api_connector: ApiConnector):
+                 api_connector: ApiConnector, engine: str = "threads"):
         """
         Configure and run jobs, interact with adguardhome
 
         To run all job use method start()
 
-
+        :param engine: threads - every job runs in own thread, asyncio - all jobs run on one event loop
         """
 
         self.job_confs = jobs_confs
+        self.engine = engine
 
         self.api_connector = api_connector
         self.config_configs = config_configs
 
         self.tasks = []
 
+        if self.config_configs.write_mode() == "RECONCILE":
+            self.writer = Reconciler(api_connect=self.api_connector,
+                                     interval=self.config_configs.reconcile_interval(),
+                                     workers=self.config_configs.reconcile_workers())
+        elif self.config_configs.write_mode() == "QUEUE":
+            self.writer = WriteQueue(api_connect=self.api_connector, spacing=self.config_configs.write_spacing())
+        else:
+            self.writer = None
+
+        # one cache for all jobs, so host which is answer of several jobs is probed once per interval
+        self.probe_cache = ProbeCache() if self.config_configs.probe_cache() else None
+        # pings of all jobs go through one socket per address family
+        self.icmp_engine = IcmpEngine() if self.config_configs.batch_ping() else None
+        # keep-alive connections of http jobs, one pool per (proto, answer, port)
+        if self.config_configs.probe_pool():
+            targets = {(conf.proto(), answer, conf.port()) for conf in self.job_confs.JobsHttp
+                       for answer in conf.answers()}
+            self.probe_pool = ProbePool(targets=len(targets))
+        else:
+            self.probe_pool = None
+        # probes of all http jobs are sent from one event loop, it replaces probe pool
+        if self.config_configs.async_http():
+            self.http_engine = HttpEngine(concurrency=self.config_configs.http_concurrency())
+        else:
+            self.http_engine = None
+        # connects of all tcp jobs are multiplexed by one event loop, loop starts on first connect
+        self.tcp_engine = TcpEngine()
+
     def add_task(self, domain: str) -> bool:
         """
         Depends on config/invalid_answer and domain state decide if task should be added or not, when connection can't
@@ -72,7 +114,12 @@ class TestHosts:
         """
         for conf in self.job_confs.JobsHttp:
             if self.add_task(domain=conf.domain()):
-                self.tasks.append(http.Test(config=conf, api_connect=self.api_connector))
+                self.tasks.append(http.Test(config=conf, api_connect=self.api_connector,
+                                            writer=self.writer, cache=self.probe_cache, pool=self.probe_pool,
+                                            http_engine=self.http_engine,
+                                            stagger=self.config_configs.stagger(),
+                                            jitter=self.config_configs.jitter(),
+                                            drift_check=self.config_configs.drift_check()))
         return True
 
     def prepare_ping_tasks(self):
@@ -83,7 +130,27 @@ class TestHosts:
 
         for conf in self.job_confs.JobsPing:
             if self.add_task(domain=conf.domain()):
-                self.tasks.append(ping.Test(config=conf, api_connect=self.api_connector))
+                self.tasks.append(ping.Test(config=conf, api_connect=self.api_connector,
+                                            writer=self.writer, cache=self.probe_cache,
+                                            icmp_engine=self.icmp_engine,
+                                            stagger=self.config_configs.stagger(),
+                                            jitter=self.config_configs.jitter(),
+                                            drift_check=self.config_configs.drift_check()))
+        return True
+
+    def prepare_tcp_tasks(self):
+        """
+        Add tcp jobs to task list
+        :return:
+        """
+        for conf in self.job_confs.JobsTcp:
+            if self.add_task(domain=conf.domain()):
+                self.tasks.append(tcp.Test(config=conf, api_connect=self.api_connector,
+                                           writer=self.writer, cache=self.probe_cache,
+                                           tcp_engine=self.tcp_engine,
+                                           stagger=self.config_configs.stagger(),
+                                           jitter=self.config_configs.jitter(),
+                                           drift_check=self.config_configs.drift_check()))
         return True
 
     def prepare_static_entry_tasks(self):
@@ -93,12 +160,76 @@ class TestHosts:
         """
         for conf in self.job_confs.JobsStaticEntry:
             if self.add_task(domain=conf.domain()):
-                self.tasks.append(static_entry.Test(config=conf, api_connect=self.api_connector))
+                self.tasks.append(static_entry.Test(config=conf, api_connect=self.api_connector,
+                                                    writer=self.writer, stagger=self.config_configs.stagger(),
+                                                    jitter=self.config_configs.jitter()))
         return True
 
+    def pacing_stats(self) -> list:
+        """
+        :return: list of dicts, number of overruns and lag of tests of every job
+        """
+        return [task.pacing.stats() for task in self.tasks]
+
+    def health_stats(self) -> list:
+        """
+        :return: list of dicts, number of answer changes suppressed by rise, fall and hold of every ping, http and tcp
+                 job
+        """
+        return [{"domain": task.domain, "suppressed": task.health.suppressed} for task in self.tasks
+                if getattr(task, "health", None) is not None]
+
+    def timeout_stats(self) -> list:
+        """
+        :return: list of dicts, number of timed out probes, time spent in them and number of probes which exceeded
+                 budget of cycle of every ping, http and tcp job
+        """
+        return [task.timeout_stats() for task in self.tasks if hasattr(task, "timeout_stats")]
+
+    def report_stats(self):
+        """
+        Log summary of statistics of all jobs and of every AdGuardHome instance, statistics of single jobs are logged
+        at debug level
+        :return:
+        """
+        pacing = self.pacing_stats()
+        timeouts = {stats["domain"]: stats for stats in self.timeout_stats()}
+        health = {stats["domain"]: stats for stats in self.health_stats()}
+        if len(pacing) > 0:
+            late = max(pacing, key=lambda stats: stats["max_lag"])
+            logging.info(msg=f"Jobs: {sum(stats['overruns'] for stats in pacing)} overruns, maximum lag "
+                             f"{late['max_lag']:.1f}s ({late['domain']}), "
+                             f"{sum(stats['timeouts'] for stats in timeouts.values())} timeouts, "
+                             f"{sum(stats['expired'] for stats in timeouts.values())} over budget, "
+                             f"{sum(stats['suppressed'] for stats in health.values())} answer changes suppressed")
+        for stats in pacing:
+            job_timeouts = timeouts.get(stats["domain"], {})
+            logging.debug(msg=f"Job {stats['domain']}: interval {stats['interval']}s, {stats['overruns']} overruns, "
+                              f"lag {stats['lag']:.1f}s, {job_timeouts.get('timeouts', 0)} timeouts "
+                              f"({job_timeouts.get('timeout_time', 0.0):.1f}s), "
+                              f"{job_timeouts.get('expired', 0)} over budget, "
+                              f"{health.get(stats['domain'], {}).get('suppressed', 0)} suppressed")
+
+        for stats in self.api_connector.stats():
+            message = f"Api {stats['target']}: breaker {stats['breaker']}, {stats['rejected']} requests rejected"
+            if "latency" in stats:
+                message += f", {stats['requests']} requests, {stats['failures']} failures in a row, latency " \
+                           f"{stats['latency'] * 1000:.0f} ms"
+            logging.info(msg=message)
+
+    def report(self):
+        """
+        Report statistics every REPORT_INTERVAL seconds, runs in daemon thread
+        :return:
+        """
+        while True:
+            time.sleep(REPORT_INTERVAL)
+            self.report_stats()
+
     def prepare_tasks(self):
         self.prepare_http_tasks()
         self.prepare_ping_tasks()
+        self.prepare_tcp_tasks()
         self.prepare_static_entry_tasks()
 
     def start(self):
@@ -108,5 +239,22 @@ class TestHosts:
         :return:
         """
         self.prepare_tasks()
+        opened, reused = self.api_connector.connection_stats()
+        logging.info(msg=f"Api connections opened: {opened}, reused: {reused}")
+        self.api_connector.update_supported()
+        threading.Thread(target=self.report, name="stats", daemon=True).start()
+
+        if self.engine == "asyncio":
+            scheduler = Scheduler()
+            for task in self.tasks:
+                scheduler.add(job=task, delay=task.pacing.first(now=time.monotonic()))
+            if self.writer is not None:
+                self.writer.start()
+            logging.info(msg=f"Running {len(scheduler)} jobs on asyncio engine")
+            scheduler.start()
+            return
+
         for task in self.tasks:
             task.start()
+        if self.writer is not None:
+            self.writer.start()
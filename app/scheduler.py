@@ -0,0 +1,92 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# threads used by all jobs for blocking calls (http requests, api requests)
+DEFAULT_WORKERS = 32
+
+
+class Scheduler:
+    """
+    Run all jobs on one asyncio event loop instead of one thread per job. Jobs are kept in heap ordered by time of
+    next test, only jobs which are due run, others don't use any resources until their time comes.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS):
+        """
+        :param workers: number of threads used by jobs for blocking calls
+        """
+        self.workers = workers
+        # (due time, sequence number, job), sequence number keeps order of jobs with the same due time
+        self._heap = []
+        self._sequence = itertools.count()
+        self._wakeup = None
+        self.cycles = 0
+
+    def add(self, job, delay: float = 0.0):
+        """
+        Schedule job
+        :param job: job with async_cycle() method and pacing
+        :param delay: time (in seconds) to first test of job
+        :return:
+        """
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._sequence), job))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def __len__(self):
+        return len(self._heap)
+
+    async def _run_job(self, job, executor: ThreadPoolExecutor):
+        job.pacing.begin(now=time.monotonic())
+        try:
+            await job.async_cycle(executor=executor)
+        except Exception as e:
+            logging.error(msg=f"Test of {job.domain} failed: {e!r}")
+        self.cycles += 1
+        self.add(job=job, delay=job.pacing.end(now=time.monotonic()))
+
+    async def run(self, duration: float = None):
+        """
+        Run jobs
+        :param duration: stop after this many seconds, None - run forever
+        :return:
+        """
+        self._wakeup = asyncio.Event()
+        stop = None if duration is None else time.monotonic() + duration
+        running = set()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job") as executor:
+            try:
+                while stop is None or time.monotonic() < stop:
+                    now = time.monotonic()
+                    while len(self._heap) > 0 and self._heap[0][0] <= now:
+                        _, _, job = heapq.heappop(self._heap)
+                        task = asyncio.create_task(self._run_job(job=job, executor=executor))
+                        running.add(task)
+                        task.add_done_callback(running.discard)
+
+                    timeout = self._heap[0][0] - now if len(self._heap) > 0 else None
+                    if stop is not None:
+                        timeout = stop - now if timeout is None else min(timeout, stop - now)
+
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                for task in running:
+                    task.cancel()
+                await asyncio.gather(*running, return_exceptions=True)
+                self._wakeup = None
+
+    def start(self):
+        """
+        Run jobs forever on new event loop
+        :return:
+        """
+        asyncio.run(self.run())
@@ -101,3 +101,29 @@ def match_port_to_protocol(proto: str, default_port=80):
         return protocols_and_ports[proto]
     else:
         return default_port
+
+
+def parse_version(version: str):
+    """
+    Convert version string to tuple of numbers, parts which aren't numbers (for ex. pre-release suffix) are skipped.
+    For example:
+        version = v0.107.33 -> return (0, 107, 33)
+        version = v0.108.0-b.1 -> return (0, 108, 0)
+    :param version: version string
+    :return: tuple: version numbers, empty tuple if version can't be parsed
+    """
+    if type(version) is not str:
+        return ()
+    numbers = []
+    for part in version.lstrip("v").split("."):
+        digits = ""
+        for char in part:
+            if not char.isdigit():
+                break
+            digits += char
+        if digits == "":
+            break
+        numbers.append(int(digits))
+        if len(digits) != len(part):
+            break
+    return tuple(numbers)
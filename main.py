@@ -4,6 +4,7 @@ import time
 import logging
 
 from app.api.connector import ApiConnector
+from app.api.multi_connector import MultiApiConnector
 from app.run_jobs import TestHosts
 from app.parsers.configuration import ConfigParser
 from app.parsers.cli import CliParser
@@ -52,7 +53,13 @@ if __name__ == '__main__':
     logging.getLogger().setLevel(level=log_level)
 
     time.sleep(ConfigStorageConfig.wait())
-    ApiConnector = ApiConnector(config=ConfigStorageApi)
-    TestHosts = TestHosts(api_connector=ApiConnector, jobs_confs=ConfigStorageJobs, config_configs=ConfigStorageConfig)
+    if len(ConfigStorageApi.replicas()) > 0:
+        ApiConnector = MultiApiConnector(connectors=[ApiConnector(config=config) for config in
+                                                     [ConfigStorageApi] + ConfigStorageApi.replicas()])
+    else:
+        ApiConnector = ApiConnector(config=ConfigStorageApi)
+    ApiConnector.wait_for_connection()
+    TestHosts = TestHosts(api_connector=ApiConnector, jobs_confs=ConfigStorageJobs, config_configs=ConfigStorageConfig,
+                          engine=CliParser.engine)
 
     TestHosts.start()
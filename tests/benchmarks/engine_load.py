@@ -0,0 +1,77 @@
+"""
+Compare memory (RSS) and CPU time used by thread per job engine and asyncio engine. Every job pings 127.0.0.1 every
+second and publishes answer to reconciler (which is not started, so AdGuardHome is not needed). Every measurement runs
+in separate process.
+
+Run from main program directory (as root, ping to loopback needs privileged socket):
+    python3 -m tests.benchmarks.engine_load
+"""
+import asyncio
+import logging
+import os
+import resource
+import subprocess
+import sys
+import time
+
+from app.api.reconciler import Reconciler
+from app.data.jobs_configurations import JobPing
+from app.jobs import ping
+from app.scheduler import Scheduler
+
+JOBS = (100, 1000, 10000)
+DURATION = 10
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child(engine: str, jobs_count: int, duration: float):
+    logging.disable(logging.CRITICAL)
+    reconciler = Reconciler(api_connect=None, interval=10, workers=1)
+    conf = JobPing(interval=1, count=1, timeout=1, domain="test.lan", answers=["127.0.0.1"],
+                   privileged=os.geteuid() == 0)
+    # api_connect must be set, so job can run as thread, it is not used because answers go to reconciler
+    jobs = [ping.Test(config=conf, api_connect=reconciler, writer=reconciler) for _ in range(jobs_count)]
+
+    start = time.monotonic()
+    if engine == "threads":
+        for job in jobs:
+            job.daemon = True
+            job.start()
+        time.sleep(max(0.0, duration - (time.monotonic() - start)))
+    else:
+        scheduler = Scheduler()
+        for job in jobs:
+            scheduler.add(job=job)
+        asyncio.run(scheduler.run(duration=duration))
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    print(f"{rss_mb():.1f} {usage.ru_maxrss / 1024:.1f} {usage.ru_utime + usage.ru_stime:.2f}", flush=True)
+    os._exit(0)
+
+
+def main():
+    print(f"{DURATION}s run, every job pings 127.0.0.1 every second")
+    print(f"{'engine':>8} {'jobs':>6} {'rss MB':>8} {'max rss MB':>11} {'cpu s':>7}")
+    for jobs_count in JOBS:
+        for engine in ("threads", "asyncio"):
+            result = subprocess.run([sys.executable, "-m", "tests.benchmarks.engine_load", "child", engine,
+                                     str(jobs_count), str(DURATION)], capture_output=True, text=True)
+            if result.returncode != 0 or result.stdout.strip() == "":
+                print(f"{engine:>8} {jobs_count:>6} failed: {result.stderr.strip().splitlines()[-1:]}")
+                continue
+            rss, max_rss, cpu = result.stdout.split()
+            print(f"{engine:>8} {jobs_count:>6} {rss:>8} {max_rss:>11} {cpu:>7}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "child":
+        child(engine=sys.argv[2], jobs_count=int(sys.argv[3]), duration=float(sys.argv[4]))
+    else:
+        main()
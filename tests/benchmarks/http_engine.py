@@ -0,0 +1,134 @@
+"""
+Compare http probes sent from thread pool (as asyncio engine sends blocking probes, with probe pool) and asyncio http
+engine. Every target is local http server bound on own loopback address and port, server answers after DELAY seconds
+(stand-in for network latency). Every round probes all targets at the same time, first round opens connections, next
+rounds reuse them. Servers and every measurement run in separate processes.
+
+Run from main program directory:
+    python3 -m tests.benchmarks.http_engine
+"""
+import asyncio
+import logging
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.jobs.http import drain
+from app.jobs.http_engine import HttpEngine
+from app.jobs.probe_pool import ProbePool
+from app.scheduler import DEFAULT_WORKERS
+
+TARGETS = (100, 1000, 5000)
+ROUNDS = 5
+DELAY = 0.02
+BASE_PORT = 20000
+PORTS = 100
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"
+
+
+def targets(count: int) -> list:
+    return [(f"127.1.{i // 250}.{i % 250 + 1}", BASE_PORT + i % PORTS) for i in range(count)]
+
+
+def serve(targets_count: int):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                while (line := await reader.readline()) not in (b"\r\n", b""):
+                    pass
+                if line == b"":
+                    break
+                await asyncio.sleep(DELAY)
+                writer.write(RESPONSE)
+        except OSError:
+            pass
+        writer.close()
+
+    async def main():
+        servers = [await asyncio.start_server(handle, host=host, port=port, backlog=1024)
+                   for host, port in targets(count=targets_count)]
+        print("ready", flush=True)
+        await asyncio.gather(*[server.serve_forever() for server in servers])
+
+    asyncio.run(main())
+
+
+def executor_round(executor: ThreadPoolExecutor, pool: ProbePool, urls: list) -> int:
+    def probe(url: str) -> bool:
+        try:
+            with pool.request(method="GET", url=url, timeout=(5, 30)) as response:
+                drain(response=response, max_body=4096)
+            return response.status_code == 200
+        except OSError:
+            return False
+
+    return sum(executor.map(probe, urls))
+
+
+async def engine_round(engine: HttpEngine, urls: list) -> int:
+    async def probe(url: str) -> bool:
+        try:
+            return await engine.async_probe(method="GET", url=url, connect_timeout=5, read_timeout=30,
+                                            max_body=4096) == 200
+        except (OSError, asyncio.TimeoutError):
+            return False
+
+    return sum(await asyncio.gather(*[probe(url) for url in urls]))
+
+
+def child(mode: str, targets_count: int):
+    logging.disable(logging.CRITICAL)
+    urls = [f"http://{host}:{port}/" for host, port in targets(count=targets_count)]
+    executor = ThreadPoolExecutor(max_workers=DEFAULT_WORKERS)
+    pool = ProbePool(targets=targets_count)
+    engine = HttpEngine()
+
+    ok = 0
+    first = 0.0
+    start = time.monotonic()
+    for index in range(ROUNDS):
+        if mode == "threads":
+            ok += executor_round(executor=executor, pool=pool, urls=urls)
+        else:
+            ok += asyncio.run(engine_round(engine=engine, urls=urls))
+        if index == 0:
+            first = time.monotonic() - start
+    elapsed = time.monotonic() - start
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    print(f"{first:.3f} {(elapsed - first) / (ROUNDS - 1):.3f} {usage.ru_utime + usage.ru_stime:.2f} "
+          f"{ok / (ROUNDS * targets_count):.3f}", flush=True)
+
+
+def main():
+    print(f"{ROUNDS} rounds, every round probes all targets at the same time, server delay {DELAY * 1000:.0f} ms, "
+          f"threads: {DEFAULT_WORKERS} workers with probe pool, engine: concurrency 1000")
+    print(f"{'engine':>8} {'targets':>8} {'first s':>8} {'round s':>8} {'cpu s':>7} {'ok':>6}")
+    for targets_count in TARGETS:
+        server = subprocess.Popen([sys.executable, "-m", "tests.benchmarks.http_engine", "serve", str(targets_count)],
+                                  stdout=subprocess.PIPE, text=True)
+        if server.stdout.readline().strip() != "ready":
+            print(f"servers for {targets_count} targets failed to start")
+            server.kill()
+            continue
+        for mode in ("threads", "engine"):
+            result = subprocess.run([sys.executable, "-m", "tests.benchmarks.http_engine", "child", mode,
+                                     str(targets_count)], capture_output=True, text=True)
+            if result.returncode != 0 or result.stdout.strip() == "":
+                print(f"{mode:>8} {targets_count:>8} failed: {result.stderr.strip().splitlines()[-1:]}")
+                continue
+            first, round_time, cpu, ok = result.stdout.split()
+            print(f"{mode:>8} {targets_count:>8} {first:>8} {round_time:>8} {cpu:>7} {ok:>6}")
+        server.kill()
+        server.wait()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "serve":
+        serve(targets_count=int(sys.argv[2]))
+    elif len(sys.argv) == 4 and sys.argv[1] == "child":
+        child(mode=sys.argv[2], targets_count=int(sys.argv[3]))
+    else:
+        main()
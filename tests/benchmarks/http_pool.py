@@ -0,0 +1,122 @@
+"""
+Compare https probes without pool (new connection and full TLS handshake per probe) and with probe pool (keep-alive
+connections, TLS session resumption). Every target is local https server, every round probes all targets one by one.
+With `close` servers close connection after every response, so pool can only resume TLS sessions.
+
+Run from main program directory:
+    python3 -m tests.benchmarks.http_pool
+"""
+import logging
+import os
+import ssl
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.jobs.http import drain
+from app.jobs.probe_pool import ProbePool
+
+TARGETS = 20
+ROUNDS = 20
+TLS_DIRECTORY = os.path.join(os.path.dirname(__file__), "..", "unit", "fixtures", "tls")
+CERT = os.path.join(TLS_DIRECTORY, "cert.pem")
+
+
+class Counters:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.handshakes = 0
+        self.resumed = 0
+
+    def reset(self):
+        with self.lock:
+            self.handshakes = 0
+            self.resumed = 0
+
+
+def start_server(counters: Counters, close: bool) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # headers and body are written separately, without it every keep-alive response waits for delayed ack
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def setup(self):
+            super().setup()
+            with counters.lock:
+                counters.handshakes += 1
+                counters.resumed += self.connection.session_reused
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            if close:
+                self.send_header("Connection", "close")
+                self.close_connection = True
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(CERT, os.path.join(TLS_DIRECTORY, "key.pem"))
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def probe_plain(url: str) -> int:
+    with requests.request(method="GET", url=url, timeout=5, stream=True, verify=CERT) as response:
+        drain(response=response, max_body=4096)
+    return response.status_code
+
+
+def measure(urls: list, probe) -> list:
+    latencies = []
+    for _ in range(ROUNDS):
+        for url in urls:
+            start = time.perf_counter()
+            if probe(url) != 200:
+                raise RuntimeError(f"Probe of {url} failed")
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    counters = Counters()
+    print(f"{TARGETS} https targets, {ROUNDS} rounds, every round probes all targets one by one")
+    print(f"{'server':>10} {'engine':>6} {'mean ms':>8} {'p95 ms':>7} {'handshakes':>11} {'full':>5} {'resumed':>8}")
+    for close in (False, True):
+        servers = [start_server(counters=counters, close=close) for _ in range(TARGETS)]
+        urls = [f"https://127.0.0.1:{server.server_address[1]}/" for server in servers]
+        for mode in ("plain", "pool"):
+            counters.reset()
+            if mode == "plain":
+                latencies = measure(urls=urls, probe=probe_plain)
+            else:
+                pool = ProbePool(targets=TARGETS)
+                pool.context.load_verify_locations(CERT)
+
+                def probe_pool(url: str) -> int:
+                    with pool.request(method="GET", url=url, timeout=5) as response:
+                        drain(response=response, max_body=4096)
+                    return response.status_code
+
+                latencies = measure(urls=urls, probe=probe_pool)
+            mean = statistics.mean(latencies) * 1000
+            p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+            print(f"{'close' if close else 'keep-alive':>10} {mode:>6} {mean:>8.2f} {p95:>7.2f} "
+                  f"{counters.handshakes:>11} {counters.handshakes - counters.resumed:>5} {counters.resumed:>8}")
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Compare icmplib (socket per ping) and batched icmp engine (one socket for all pings). Every target from 127.0.0.0/8 is
+pinged once per round, all targets at the same time. Every measurement runs in separate process.
+
+Run from main program directory (as root, raw ICMP socket is used):
+    python3 -m tests.benchmarks.icmp_engine
+"""
+import asyncio
+import logging
+import resource
+import subprocess
+import sys
+import time
+
+from icmplib import async_ping
+
+from app.jobs.icmp_engine import IcmpEngine
+
+TARGETS = (100, 1000, 10000)
+ROUNDS = 5
+
+
+def targets(count: int) -> list:
+    return [f"127.{i // 62500}.{i // 250 % 250}.{i % 250 + 1}" for i in range(count)]
+
+
+async def icmplib_round(hosts: list) -> int:
+    results = await asyncio.gather(*[async_ping(address=host, count=1, timeout=2, privileged=True)
+                                     for host in hosts], return_exceptions=True)
+    return len([result for result in results if not isinstance(result, Exception) and result.is_alive])
+
+
+async def engine_round(engine: IcmpEngine, hosts: list) -> int:
+    results = await asyncio.gather(*[engine.async_ping(address=host, count=1, timeout=2, privileged=True)
+                                     for host in hosts])
+    return len([result for result in results if result])
+
+
+def child(mode: str, targets_count: int):
+    logging.disable(logging.CRITICAL)
+    hosts = targets(count=targets_count)
+    engine = IcmpEngine()
+
+    alive = 0
+    start = time.monotonic()
+    for _ in range(ROUNDS):
+        if mode == "icmplib":
+            alive += asyncio.run(icmplib_round(hosts=hosts))
+        else:
+            alive += asyncio.run(engine_round(engine=engine, hosts=hosts))
+    elapsed = time.monotonic() - start
+
+    sockets = ROUNDS * targets_count if mode == "icmplib" else engine.stats()["sockets"]
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    print(f"{elapsed / ROUNDS:.3f} {usage.ru_utime + usage.ru_stime:.2f} {alive / (ROUNDS * targets_count):.3f} "
+          f"{sockets}", flush=True)
+
+
+def main():
+    print(f"{ROUNDS} rounds, every round pings all targets at the same time")
+    print(f"{'engine':>8} {'targets':>8} {'round s':>8} {'cpu s':>7} {'alive':>6} {'sockets':>8}")
+    for targets_count in TARGETS:
+        for mode in ("icmplib", "batch"):
+            result = subprocess.run([sys.executable, "-m", "tests.benchmarks.icmp_engine", "child", mode,
+                                     str(targets_count)], capture_output=True, text=True)
+            if result.returncode != 0 or result.stdout.strip() == "":
+                print(f"{mode:>8} {targets_count:>8} failed: {result.stderr.strip().splitlines()[-1:]}")
+                continue
+            round_time, cpu, alive, sockets = result.stdout.split()
+            print(f"{mode:>8} {targets_count:>8} {round_time:>8} {cpu:>7} {alive:>6} {sockets:>8}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "child":
+        child(mode=sys.argv[2], targets_count=int(sys.argv[3]))
+    else:
+        main()
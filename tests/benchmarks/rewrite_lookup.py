@@ -0,0 +1,69 @@
+"""
+Compare cost of rewrite list lookups made by all jobs during one cycle: linear scan over list returned by
+/control/rewrite/list (old ApiConnector behaviour) against RewriteTable index.
+
+Run from main program directory:
+    python3 -m tests.benchmarks.rewrite_lookup
+"""
+import time
+
+from app.api.rewrites import RewriteTable
+
+ENTRIES = 50000
+JOBS = 1000
+
+
+def scan_entry_exist(entries: list, answer: str, domain: str) -> bool:
+    for entry in entries:
+        if entry["domain"] == domain and entry["answer"] == answer:
+            return True
+    return False
+
+
+def scan_domain_exist(entries: list, domain: str) -> bool:
+    for entry in entries:
+        if entry["domain"] == domain:
+            return True
+    return False
+
+
+def scan_get_answer(entries: list, domain: str):
+    for entry in entries:
+        if entry["domain"] == domain:
+            return entry["answer"]
+    return False
+
+
+def main():
+    entries = [{"domain": f"host-{i}.lan", "answer": f"10.{i // 65536}.{i // 256 % 256}.{i % 256}"}
+               for i in range(ENTRIES)]
+    # spread jobs over whole list, every second job looks for domain which doesn't exist
+    jobs = [(entries[i * (ENTRIES // JOBS)]["domain"] if i % 2 == 0 else f"missing-{i}.lan", "10.0.0.1")
+            for i in range(JOBS)]
+
+    start = time.perf_counter()
+    for domain, answer in jobs:
+        scan_entry_exist(entries, answer=answer, domain=domain)
+        scan_domain_exist(entries, domain=domain)
+        scan_get_answer(entries, domain=domain)
+    linear = time.perf_counter() - start
+
+    start = time.perf_counter()
+    table = RewriteTable(entries=entries)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for domain, answer in jobs:
+        table.entry_exist(answer=answer, domain=domain)
+        table.domain_exist(domain=domain)
+        table.answer(domain=domain)
+    indexed = time.perf_counter() - start
+
+    print(f"{ENTRIES} rewrite entries, {JOBS} jobs, 3 lookups per job")
+    print(f"linear scan:  {linear * 1000:10.2f} ms ({linear / (3 * JOBS) * 1e6:8.2f} us per lookup)")
+    print(f"index build:  {build * 1000:10.2f} ms (once per download)")
+    print(f"indexed:      {indexed * 1000:10.2f} ms ({indexed / (3 * JOBS) * 1e6:8.2f} us per lookup)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Minimal in-process imitation of AdGuardHome api, used by unit tests which can't rely on AdGuardVM
+"""
+import base64
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.utils import parse_version
+
+
+class FakeAdGuardHome:
+    """
+    Serve /control/status and /control/rewrite/* endpoints on 127.0.0.1, count requests made to every endpoint.
+    Use start() before and stop() after test.
+    """
+
+    def __init__(self, username: str = "admin", passwd: str = "12345678", version: str = "v0.107.0"):
+        self.username = username
+        self.passwd = passwd
+        self.version = version
+        self.rewrites = []
+        self.requests = {}
+        self.lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def count(self, path: str) -> int:
+        """
+        :param path: endpoint path, for ex.: /control/rewrite/list
+        :return: number of requests made to endpoint
+        """
+        with self.lock:
+            return self.requests.get(path, 0)
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _authorized(self):
+                token = base64.b64encode(f"{fake.username}:{fake.passwd}".encode()).decode()
+                return self.headers.get("Authorization") == "Basic " + token
+
+            def _reply(self, code: int, body=None):
+                data = b"" if body is None else json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length)) if length else {}
+
+            def _handle(self):
+                # always read body, connection is kept alive
+                body = self._body()
+                with fake.lock:
+                    fake.requests[self.path] = fake.requests.get(self.path, 0) + 1
+
+                if self._authorized() is False:
+                    self._reply(code=401)
+                    return
+
+                if self.command == "GET" and self.path == "/control/status":
+                    self._reply(code=200, body={"version": fake.version, "running": True})
+
+                elif self.command == "GET" and self.path == "/control/rewrite/list":
+                    with fake.lock:
+                        self._reply(code=200, body=list(fake.rewrites))
+
+                elif self.command == "POST" and self.path == "/control/rewrite/add":
+                    entry = body
+                    with fake.lock:
+                        fake.rewrites.append({"domain": entry["domain"], "answer": entry["answer"]})
+                    self._reply(code=200)
+
+                elif self.command == "POST" and self.path == "/control/rewrite/delete":
+                    entry = body
+                    with fake.lock:
+                        entry = {"domain": entry["domain"], "answer": entry["answer"]}
+                        if entry in fake.rewrites:
+                            fake.rewrites.remove(entry)
+                            self._reply(code=200)
+                        else:
+                            self._reply(code=400)
+
+                elif self.command == "PUT" and self.path == "/control/rewrite/update" and \
+                        parse_version(version=fake.version) >= (0, 107, 33):
+                    data = body
+                    target = {"domain": data["target"]["domain"], "answer": data["target"]["answer"]}
+                    update = {"domain": data["update"]["domain"], "answer": data["update"]["answer"]}
+                    with fake.lock:
+                        if target in fake.rewrites:
+                            fake.rewrites[fake.rewrites.index(target)] = update
+                            self._reply(code=200)
+                        else:
+                            self._reply(code=400)
+                else:
+                    self._reply(code=404)
+
+            def do_GET(self):
+                self._handle()
+
+            def do_POST(self):
+                self._handle()
+
+            def do_PUT(self):
+                self._handle()
+
+        return Handler
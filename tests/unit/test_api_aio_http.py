@@ -0,0 +1,79 @@
+import asyncio
+import gzip
+import unittest
+
+from app.api.aio_http import AsyncHttpClient, HttpError
+
+
+class TestAsyncHttpClient(unittest.IsolatedAsyncioTestCase):
+    """
+    Test client against raw responses sent by local asyncio server
+    """
+    async def asyncSetUp(self):
+        self.response = b""
+        self.connections = 0
+        self.server = await asyncio.start_server(self.handle, host="127.0.0.1", port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.client = AsyncHttpClient()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(self.response)
+                await writer.drain()
+                if b"Connection: close" in self.response:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+
+    async def test_content_length(self):
+        self.response = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\n[]"
+        response = await self.client.request(method="GET", url=f"http://127.0.0.1:{self.port}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [])
+
+    async def test_chunked_gzip(self):
+        body = gzip.compress(b'[{"domain": "test.lan", "answer": "1.1.1.1"}]')
+        self.response = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nContent-Encoding: gzip\r\n\r\n" + \
+            f"{len(body[:10]):x}\r\n".encode() + body[:10] + b"\r\n" + \
+            f"{len(body[10:]):x}\r\n".encode() + body[10:] + b"\r\n0\r\n\r\n"
+        response = await self.client.request(method="GET", url=f"http://127.0.0.1:{self.port}/")
+        self.assertEqual(response.json(), [{"domain": "test.lan", "answer": "1.1.1.1"}])
+
+    async def test_keep_alive(self):
+        self.response = b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n"
+        for _ in range(3):
+            await self.client.request(method="GET", url=f"http://127.0.0.1:{self.port}/")
+        self.assertEqual((self.client.opened, self.client.reused), (1, 2))
+
+    async def test_connection_close(self):
+        self.response = b"HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: 0\r\n\r\n"
+        for _ in range(2):
+            await self.client.request(method="GET", url=f"http://127.0.0.1:{self.port}/")
+        self.assertEqual((self.client.opened, self.client.reused), (2, 0))
+
+    async def test_max_body(self):
+        self.response = b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n0123456789"
+        response = await self.client.request(method="GET", url=f"http://127.0.0.1:{self.port}/", max_body=5)
+        self.assertEqual((response.status_code, response.content), (200, b""))
+        response = await self.client.request(method="GET", url=f"http://127.0.0.1:{self.port}/", max_body=10)
+        self.assertEqual(response.content, b"0123456789")
+        # connection with unread body is closed
+        self.assertEqual((self.client.opened, self.client.reused), (2, 0))
+
+    async def test_invalid_response(self):
+        self.response = b"garbage\r\n\r\n"
+        with self.assertRaises(HttpError):
+            await self.client.request(method="GET", url=f"http://127.0.0.1:{self.port}/")
+
+
+if __name__ == "__main__":
+    unittest.main()
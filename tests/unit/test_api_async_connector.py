@@ -0,0 +1,141 @@
+import asyncio
+import time
+import unittest
+
+from app.api import breaker
+from app.api.async_connector import AsyncApiConnector
+from app.api.rate_limit import RateLimiter
+from app.data import default
+from app.data.api_configuration import ApiConfiguration
+from tests.unit.fake_adguardhome import FakeAdGuardHome
+
+
+class TestAsyncApi(unittest.IsolatedAsyncioTestCase):
+    """
+    Test AsyncApiConnector against local fake of AdGuardHome
+    """
+    def setUp(self):
+        self.adguard = FakeAdGuardHome().start()
+        self.adguard.rewrites = [{"domain": "test.lan", "answer": "1.1.1.1"}]
+
+    async def asyncTearDown(self):
+        for api in getattr(self, "apis", []):
+            await api.close()
+
+    def tearDown(self):
+        self.adguard.stop()
+
+    def connector(self, passwd: str = "12345678", cache_ttl: float = 60, rate_limit: float = 0):
+        api_configs = ApiConfiguration()
+        api_configs.set(host='127.0.0.1', username='admin', port=self.adguard.port, passwd=passwd, proto='http',
+                        timeout=2, startup_enable=False, cache_ttl=cache_ttl, rate_limit=rate_limit)
+        api = AsyncApiConnector(config=api_configs)
+        self.apis = getattr(self, "apis", []) + [api]
+        return api
+
+    async def test_test_connection(self):
+        self.assertEqual(await self.connector().test_connection(), True)
+
+    async def test_test_connection_wrong_auth(self):
+        self.assertEqual(await self.connector(passwd="wrong").test_connection(), False)
+
+    async def test_queries(self):
+        api = self.connector()
+        self.assertEqual(await api.entry_exist(answer="1.1.1.1", domain="test.lan"), True)
+        self.assertEqual(await api.entry_exist(answer="2.2.2.2", domain="test.lan"), False)
+        self.assertEqual(await api.domain_exist(domain="test.lan"), True)
+        self.assertEqual(await api.domain_exist(domain="not-exist.lan"), False)
+        self.assertEqual(await api.get_answer_of_domain(domain="test.lan"), "1.1.1.1")
+        self.assertEqual(await api.get_answer_of_domain(domain="not-exist.lan"), False)
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 1)
+
+    async def test_queries_wrong_auth(self):
+        api = self.connector(passwd="wrong")
+        self.assertEqual(await api.entry_exist(answer="1.1.1.1", domain="test.lan"), None)
+        self.assertEqual(await api.domain_exist(domain="test.lan"), None)
+        self.assertEqual(await api.get_answer_of_domain(domain="test.lan"), None)
+
+    async def test_concurrent_readers_share_download(self):
+        api = self.connector()
+        await asyncio.gather(*[api.domain_exist(domain="test.lan") for _ in range(50)])
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 1)
+
+    async def test_add_and_delete(self):
+        api = self.connector()
+        self.assertEqual(await api.add_entry(answer="2.2.2.2", domain="new.lan"), True)
+        self.assertEqual(await api.add_entry(answer="2.2.2.2", domain="new.lan"), False)
+        self.assertEqual(await api.delete_entry(answer="2.2.2.2", domain="new.lan"), True)
+        self.assertEqual(await api.delete_entry(answer="2.2.2.2", domain="new.lan"), False)
+        self.assertEqual(self.adguard.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+
+    async def test_change_entry_answer(self):
+        api = self.connector()
+        self.assertEqual(await api.change_entry_answer(new_answer="2.2.2.2", old_answer="1.1.1.1",
+                                                       domain="test.lan"), True)
+        self.assertEqual(await api.change_entry_answer(new_answer="2.2.2.2", old_answer="1.5.5.1",
+                                                       domain="xd-test.lan"), False)
+        self.assertEqual(self.adguard.rewrites, [{"domain": "test.lan", "answer": "2.2.2.2"}])
+
+    async def test_change_entry_answer_single_request(self):
+        self.adguard.version = "v0.107.33"
+        api = self.connector()
+        self.assertEqual(await api.change_entry_answer(new_answer="2.2.2.2", old_answer="1.1.1.1",
+                                                       domain="test.lan"), True)
+        self.assertEqual(self.adguard.count("/control/rewrite/update"), 1)
+        self.assertEqual(self.adguard.count("/control/rewrite/delete"), 0)
+
+    async def test_connection_reused(self):
+        api = self.connector(cache_ttl=0)
+        for _ in range(5):
+            await api.domain_exist(domain="test.lan")
+        self.assertEqual(api.connection_stats(), (1, 4))
+
+    async def test_server_not_running(self):
+        api = self.connector()
+        self.adguard.stop()
+        self.assertEqual(await api.domain_exist(domain="test.lan"), None)
+
+    async def test_ensure_answer(self):
+        api = self.connector()
+        self.assertEqual(await api.ensure_answer(answer="1.1.1.1", domain="test.lan"), True)
+        self.assertEqual(await api.ensure_answer(answer="2.2.2.2", domain="test.lan"), True)
+        self.assertEqual(await api.ensure_answer(answer="3.3.3.3", domain="test.lan", exclusive=False), True)
+        self.assertEqual(self.adguard.rewrites, [{"domain": "test.lan", "answer": "2.2.2.2"},
+                                                 {"domain": "test.lan", "answer": "3.3.3.3"}])
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 1)
+
+    async def test_breaker_skips_requests(self):
+        api = self.connector()
+        self.adguard.stop()
+        for _ in range(default.Api.breaker_threshold + 3):
+            self.assertEqual(await api.domain_exist(domain="test.lan"), None)
+        self.assertEqual(api.stats()[0]["breaker"], breaker.OPEN)
+        self.assertEqual(api.stats()[0]["rejected"], 3)
+
+    async def test_cancelled_trial_releases_breaker(self):
+        api = self.connector()
+        api.breaker = breaker.CircuitBreaker(threshold=1, backoff=0.01, backoff_max=0.01, jitter=0)
+        api.breaker.failure()
+        await asyncio.sleep(0.02)
+        api.limiter = RateLimiter(rate=1, endpoint_rates={})
+        await api.limiter.async_acquire(path="/control/status")
+
+        # trial request waits for rate limiter and is cancelled
+        task = asyncio.create_task(api.test_connection())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+        self.assertEqual(api.breaker.allow(), True)
+
+    async def test_rate_limit(self):
+        api = self.connector(rate_limit=10)
+        start = time.monotonic()
+        await asyncio.gather(*[api.add_entry(answer="2.2.2.2", domain=f"new{i}.lan", check=False) for i in range(12)])
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+        self.assertEqual(api.limiter.delayed, 2)
+        self.assertEqual(len(self.adguard.rewrites), 13)
+
+
+if __name__ == "__main__":
+    unittest.main()
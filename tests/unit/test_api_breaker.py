@@ -0,0 +1,73 @@
+import time
+import unittest
+
+from app.api import breaker
+from app.api.breaker import CircuitBreaker
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.breaker = CircuitBreaker(threshold=2, backoff=0.05, backoff_max=0.2, jitter=0)
+
+    def test_opens_after_threshold(self):
+        self.breaker.failure()
+        self.assertEqual(self.breaker.state(), breaker.CLOSED)
+        self.breaker.failure()
+        self.assertEqual(self.breaker.state(), breaker.OPEN)
+        self.assertEqual(self.breaker.allow(), False)
+        self.assertEqual(self.breaker.stats()["rejected"], 1)
+        self.assertEqual(self.breaker.stats()["closed->open"], 1)
+
+    def test_success_resets_failures(self):
+        self.breaker.failure()
+        self.breaker.success()
+        self.breaker.failure()
+        self.assertEqual(self.breaker.state(), breaker.CLOSED)
+
+    def test_single_trial_in_half_open(self):
+        self.breaker.failure()
+        self.breaker.failure()
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.allow(), True)
+        self.assertEqual(self.breaker.state(), breaker.HALF_OPEN)
+        # trial request is in flight, others are rejected
+        self.assertEqual(self.breaker.allow(), False)
+
+        self.breaker.success()
+        self.assertEqual(self.breaker.state(), breaker.CLOSED)
+        self.assertEqual(self.breaker.allow(), True)
+        self.assertEqual(self.breaker.stats()["open->half-open"], 1)
+        self.assertEqual(self.breaker.stats()["half-open->closed"], 1)
+
+    def test_released_trial_can_be_sent_again(self):
+        self.breaker.failure()
+        self.breaker.failure()
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.allow(), True)
+        self.breaker.release()
+        self.assertEqual(self.breaker.state(), breaker.HALF_OPEN)
+        self.assertEqual(self.breaker.allow(), True)
+
+    def test_failed_trial_doubles_backoff(self):
+        self.breaker.failure()
+        self.breaker.failure()
+        time.sleep(0.06)
+        self.breaker.allow()
+        self.breaker.failure()
+        self.assertEqual(self.breaker.state(), breaker.OPEN)
+        self.assertEqual(self.breaker.stats()["half-open->open"], 1)
+
+        time.sleep(0.06)
+        self.assertEqual(self.breaker.allow(), False)
+        time.sleep(0.05)
+        self.assertEqual(self.breaker.allow(), True)
+
+    def test_jitter_shortens_backoff(self):
+        jittered = CircuitBreaker(threshold=1, backoff=10, backoff_max=10, jitter=0.5)
+        jittered.failure()
+        self.assertLessEqual(jittered._open_until - time.monotonic(), 10)
+        self.assertGreaterEqual(jittered._open_until - time.monotonic(), 4.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
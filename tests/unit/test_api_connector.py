@@ -1,7 +1,13 @@
+import socket
+import threading
+import time
 import unittest
 
+from app.api import breaker
 from app.api.connector import ApiConnector
+from app.data import default
 from app.data.api_configuration import ApiConfiguration
+from tests.unit.fake_adguardhome import FakeAdGuardHome
 
 
 class TestApi(unittest.TestCase):
@@ -211,5 +217,218 @@ class TestApi(unittest.TestCase):
         self.assertEqual(self.api_wrong_auth.get_answer_of_domain(domain="this-domain-not-exist.delete"), None)
 
 
+class TestRewriteListCache(unittest.TestCase):
+    """
+    Test if rewrite list snapshot is shared between calls, uses local fake of AdGuardHome
+    """
+    def setUp(self):
+        self.adguard = FakeAdGuardHome().start()
+        self.adguard.rewrites = [{"domain": "test.lan", "answer": "1.1.1.1"}]
+
+    def tearDown(self):
+        self.adguard.stop()
+
+    def connector(self, cache_ttl: float):
+        api_configs = ApiConfiguration()
+        api_configs.set(host='127.0.0.1', username='admin', port=self.adguard.port, passwd='12345678', proto='http',
+                        timeout=2, startup_enable=False, cache_ttl=cache_ttl)
+        return ApiConnector(config=api_configs)
+
+    def test_lookups_share_snapshot(self):
+        api = self.connector(cache_ttl=60)
+        self.assertEqual(api.entry_exist(answer='1.1.1.1', domain='test.lan'), True)
+        self.assertEqual(api.domain_exist(domain='test.lan'), True)
+        self.assertEqual(api.get_answer_of_domain(domain='test.lan'), '1.1.1.1')
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 1)
+
+    def test_snapshot_expire(self):
+        api = self.connector(cache_ttl=0)
+        api.domain_exist(domain='test.lan')
+        api.domain_exist(domain='test.lan')
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 2)
+
+    def test_concurrent_readers_share_download(self):
+        api = self.connector(cache_ttl=60)
+        threads = [threading.Thread(target=api.domain_exist, kwargs={"domain": "test.lan"}) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 1)
+
+    def test_snapshot_patched_after_add_and_delete(self):
+        api = self.connector(cache_ttl=60)
+        self.assertEqual(api.add_entry(answer='2.2.2.2', domain='new.lan'), True)
+        self.assertEqual(api.entry_exist(answer='2.2.2.2', domain='new.lan'), True)
+        self.assertEqual(api.delete_entry(answer='1.1.1.1', domain='test.lan'), True)
+        self.assertEqual(api.domain_exist(domain='test.lan'), False)
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 1)
+
+    def test_connections_reused(self):
+        api = self.connector(cache_ttl=0)
+        for _ in range(5):
+            api.domain_exist(domain='test.lan')
+        self.assertEqual(api.connection_stats(), (1, 4))
+
+    def test_wrong_auth_not_cached(self):
+        api = self.connector(cache_ttl=60)
+        self.adguard.passwd = "other"
+        self.assertEqual(api.domain_exist(domain='test.lan'), None)
+        self.adguard.passwd = "12345678"
+        self.assertEqual(api.domain_exist(domain='test.lan'), True)
+
+
+class TestChangeEntryAnswer(unittest.TestCase):
+    """
+    Test both ways of changing answer, uses local fake of AdGuardHome
+    """
+    def setUp(self):
+        self.adguard = FakeAdGuardHome().start()
+        self.adguard.rewrites = [{"domain": "test.lan", "answer": "1.1.1.1"}]
+
+        api_configs = ApiConfiguration()
+        api_configs.set(host='127.0.0.1', username='admin', port=self.adguard.port, passwd='12345678', proto='http',
+                        timeout=2, startup_enable=False)
+        self.api = ApiConnector(config=api_configs)
+
+    def tearDown(self):
+        self.adguard.stop()
+
+    def test_single_request_update(self):
+        self.adguard.version = "v0.107.33"
+        self.assertEqual(self.api.change_entry_answer(new_answer='2.2.2.2', old_answer='1.1.1.1', domain='test.lan'),
+                         True)
+        self.assertEqual(self.adguard.rewrites, [{"domain": "test.lan", "answer": "2.2.2.2"}])
+        self.assertEqual(self.adguard.count("/control/rewrite/update"), 1)
+        self.assertEqual(self.adguard.count("/control/rewrite/delete"), 0)
+        self.assertEqual(self.api.get_answer_of_domain(domain='test.lan'), '2.2.2.2')
+
+    def test_update_detected_once(self):
+        self.adguard.version = "v0.107.40"
+        self.api.change_entry_answer(new_answer='2.2.2.2', old_answer='1.1.1.1', domain='test.lan')
+        self.api.change_entry_answer(new_answer='1.1.1.1', old_answer='2.2.2.2', domain='test.lan')
+        self.assertEqual(self.adguard.count("/control/status"), 1)
+        self.assertEqual(self.adguard.count("/control/rewrite/update"), 2)
+
+    def test_fallback_to_delete_and_add(self):
+        self.adguard.version = "v0.107.20"
+        self.assertEqual(self.api.change_entry_answer(new_answer='2.2.2.2', old_answer='1.1.1.1', domain='test.lan'),
+                         True)
+        self.assertEqual(self.adguard.rewrites, [{"domain": "test.lan", "answer": "2.2.2.2"}])
+        self.assertEqual(self.adguard.count("/control/rewrite/update"), 0)
+        self.assertEqual(self.adguard.count("/control/rewrite/delete"), 1)
+        self.assertEqual(self.adguard.count("/control/rewrite/add"), 1)
+
+    def test_fallback_when_endpoint_missing(self):
+        self.adguard.version = "v0.107.33"
+        self.api.update_supported()
+        self.adguard.version = "v0.107.20"
+        self.assertEqual(self.api.change_entry_answer(new_answer='2.2.2.2', old_answer='1.1.1.1', domain='test.lan'),
+                         True)
+        self.assertEqual(self.api.update_supported(), False)
+        self.assertEqual(self.adguard.rewrites, [{"domain": "test.lan", "answer": "2.2.2.2"}])
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Test that api requests are skipped when AdGuardHome is not accessible
+    """
+    def setUp(self):
+        self.adguard = FakeAdGuardHome().start()
+
+        self.api_configs = ApiConfiguration()
+        self.api_configs.set(host='127.0.0.1', username='admin', port=self.adguard.port, passwd='12345678',
+                             proto='http', timeout=0.2, startup_enable=False, cache_ttl=0.01)
+        self.api = ApiConnector(config=self.api_configs)
+
+    def tearDown(self):
+        self.adguard.stop()
+
+    def test_requests_skipped_when_open(self):
+        self.adguard.stop()
+        for _ in range(default.Api.breaker_threshold):
+            self.assertIsNone(self.api.get_rewrite_table(refresh=True))
+        self.assertEqual(self.api.breaker.state(), breaker.OPEN)
+
+        self.assertIsNone(self.api.entry_exist(answer="1.1.1.1", domain="test.lan"))
+        self.assertIsNone(self.api.add_entry(answer="1.1.1.1", domain="test.lan", check=False))
+        self.assertEqual(self.api.breaker.stats()["rejected"], 2)
+
+    def test_wrong_auth_does_not_open(self):
+        self.adguard.passwd = "wrong"
+        for _ in range(default.Api.breaker_threshold):
+            self.assertIsNone(self.api.get_rewrite_table(refresh=True))
+        self.assertEqual(self.api.breaker.state(), breaker.CLOSED)
+
+    def test_rate_limit(self):
+        self.api_configs.set(host='127.0.0.1', username='admin', port=self.adguard.port, passwd='12345678',
+                             proto='http', timeout=2, startup_enable=False, rate_limit=100,
+                             endpoint_rate_limits={"/control/rewrite/list": 10})
+        api = ApiConnector(config=self.api_configs)
+        start = time.monotonic()
+        for _ in range(15):
+            api.get_rewrite_table(refresh=True)
+        self.assertGreaterEqual(time.monotonic() - start, 0.4)
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 15)
+
+    def test_timeout_handled(self):
+        """
+        server accepts connection but never responds
+        """
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        try:
+            self.api_configs.set(host='127.0.0.1', username='admin', port=server.getsockname()[1], passwd='12345678',
+                                 proto='http', timeout=0.2, startup_enable=False)
+            api = ApiConnector(config=self.api_configs)
+            self.assertIsNone(api.get_rewrite_table())
+            self.assertEqual(api.test_connection(), False)
+        finally:
+            server.close()
+
+    def test_truncated_response_fails_trial(self):
+        """
+        server (restarting AdGuardHome) sends shorter body than announced, trial request of half-open breaker must be
+        reported as failure, otherwise breaker stays half-open forever
+        """
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen()
+        server.settimeout(0.1)
+        stop = threading.Event()
+
+        def serve():
+            while stop.is_set() is False:
+                try:
+                    connection, _ = server.accept()
+                except OSError:
+                    continue
+                connection.recv(65536)
+                connection.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 100\r\n"
+                                   b"\r\n[{\"domain\"")
+                connection.close()
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        try:
+            self.api_configs.set(host='127.0.0.1', username='admin', port=server.getsockname()[1], passwd='12345678',
+                                 proto='http', timeout=0.5, startup_enable=False)
+            api = ApiConnector(config=self.api_configs)
+            api.breaker = breaker.CircuitBreaker(threshold=1, backoff=0.01, backoff_max=0.01, jitter=0)
+            api.breaker.failure()
+            time.sleep(0.02)
+
+            self.assertIsNone(api.get_rewrite_table(refresh=True))
+            self.assertEqual(api.breaker.stats()["half-open->open"], 1)
+            time.sleep(0.02)
+            # next trial is let through
+            self.assertEqual(api.breaker.allow(), True)
+        finally:
+            stop.set()
+            thread.join()
+            server.close()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,109 @@
+import time
+import unittest
+
+from app.api import breaker
+from app.api.connector import ApiConnector
+from app.api.multi_connector import MultiApiConnector
+from app.api.reconciler import Reconciler
+from app.data import default
+from app.data.api_configuration import ApiConfiguration
+from tests.unit.fake_adguardhome import FakeAdGuardHome
+
+
+def create_connector(port: int, timeout: float = 2, startup_enable: bool = False):
+    api_configs = ApiConfiguration()
+    api_configs.set(host='127.0.0.1', username='admin', port=port, passwd='12345678', proto='http',
+                    timeout=timeout, startup_enable=startup_enable, pool_size=2)
+    return ApiConnector(config=api_configs)
+
+
+class TestMultiApiConnector(unittest.TestCase):
+    """
+    Test writes to more instances of AdGuardHome, instances are local fakes
+    """
+    def setUp(self):
+        self.primary = FakeAdGuardHome().start()
+        self.replica = FakeAdGuardHome().start()
+        self.api = MultiApiConnector(connectors=[create_connector(port=self.primary.port),
+                                                 create_connector(port=self.replica.port)])
+
+    def tearDown(self):
+        self.primary.stop()
+        self.replica.stop()
+
+    def wait_for(self, condition, timeout: float = 2):
+        stop = time.monotonic() + timeout
+        while condition() is False and time.monotonic() < stop:
+            time.sleep(0.01)
+
+    def test_ensure_answer_written_to_all_instances(self):
+        self.assertTrue(self.api.ensure_answer(answer="1.1.1.1", domain="test.lan"))
+        self.wait_for(lambda: len(self.replica.rewrites) == 1)
+
+        self.assertEqual(self.primary.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+        self.assertEqual(self.replica.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+
+    def test_drifted_instances_fixed(self):
+        """
+        every instance compares answer with own rewrite list
+        """
+        self.primary.rewrites = [{"domain": "test.lan", "answer": "1.1.1.1"}]
+        self.replica.rewrites = [{"domain": "test.lan", "answer": "2.2.2.2"}]
+
+        self.assertTrue(self.api.ensure_answer(answer="1.1.1.1", domain="test.lan"))
+        self.wait_for(lambda: self.replica.rewrites == [{"domain": "test.lan", "answer": "1.1.1.1"}])
+
+        self.assertEqual(self.primary.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+        self.assertEqual(self.replica.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+
+    def test_dead_replica_does_not_block_write(self):
+        self.replica.stop()
+        # write is not confirmed until replica has it too, so caller retries it
+        self.assertIsNone(self.api.ensure_answer(answer="1.1.1.1", domain="test.lan"))
+        self.assertEqual(self.primary.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+
+        self.assertEqual(self.api.stats()[0]["failures"], 0)
+        self.assertEqual(self.api.stats()[1]["failures"], 1)
+
+    def test_unreachable_replica_does_not_block_startup(self):
+        replica_port = self.replica.port
+        self.replica.stop()
+        start = time.monotonic()
+        api = MultiApiConnector(connectors=[create_connector(port=self.primary.port, startup_enable=True),
+                                            create_connector(port=replica_port, startup_enable=True)])
+        api.wait_for_connection()
+        self.assertLess(time.monotonic() - start, 5)
+
+        # replica comes up behind its circuit breaker, writes to primary are not delayed
+        self.assertIsNone(api.ensure_answer(answer="1.1.1.1", domain="test.lan"))
+        self.assertEqual(self.primary.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+
+    def test_dead_instance_skipped_when_breaker_open(self):
+        self.primary.stop()
+        for _ in range(default.Api.breaker_threshold):
+            self.api.ensure_answer(answer="1.1.1.1", domain="test.lan")
+        self.wait_for(lambda: self.api.stats()[0]["breaker"] == breaker.OPEN)
+        self.assertEqual(self.api.stats()[0]["breaker"], breaker.OPEN)
+
+        # reads are answered by replica without waiting for dead primary
+        self.assertEqual(self.api.get_answer_of_domain(domain="test.lan"), "1.1.1.1")
+        self.assertEqual(self.api.stats()[1]["breaker"], breaker.CLOSED)
+
+    def test_read_from_replica_when_primary_is_dead(self):
+        self.replica.rewrites = [{"domain": "test.lan", "answer": "1.1.1.1"}]
+        self.primary.stop()
+        self.assertEqual(self.api.get_answer_of_domain(domain="test.lan"), "1.1.1.1")
+
+    def test_reconciler_writes_all_instances(self):
+        self.replica.rewrites = [{"domain": "test.lan", "answer": "2.2.2.2"}]
+        reconciler = Reconciler(api_connect=self.api, interval=1, workers=2)
+        reconciler.publish(domain="test.lan", answer="1.1.1.1")
+
+        self.assertEqual(reconciler.reconcile(), 2)
+        self.assertEqual(self.primary.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+        self.assertEqual(self.replica.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+        self.assertEqual(reconciler.reconcile(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.api.rate_limit import RateLimiter, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_refill(self):
+        bucket = TokenBucket(rate=10)
+        bucket.tokens = 0
+        bucket.refill(now=bucket.updated + 0.5)
+        self.assertAlmostEqual(bucket.tokens, 5)
+
+    def test_capacity(self):
+        bucket = TokenBucket(rate=10)
+        bucket.refill(now=bucket.updated + 100)
+        self.assertEqual(bucket.tokens, 10)
+
+    def test_slow_rate_has_one_token(self):
+        self.assertEqual(TokenBucket(rate=0.5).capacity, 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_no_limit(self):
+        limiter = RateLimiter(rate=0, endpoint_rates={"/control/rewrite/list": 0})
+        self.assertEqual(limiter.enabled(), False)
+        start = time.monotonic()
+        for _ in range(1000):
+            limiter.acquire(path="/control/rewrite/list")
+        self.assertLess(time.monotonic() - start, 0.5)
+
+    def test_global_limit(self):
+        limiter = RateLimiter(rate=20, endpoint_rates={})
+        start = time.monotonic()
+        # 20 requests from full bucket, next 5 must wait
+        for _ in range(25):
+            limiter.acquire(path="/control/status")
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(limiter.delayed, 5)
+
+    def test_endpoint_limit(self):
+        limiter = RateLimiter(rate=0, endpoint_rates={"/control/rewrite/list": 10})
+        start = time.monotonic()
+        for _ in range(12):
+            limiter.acquire(path="/control/rewrite/list")
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+        # other endpoints are not limited
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.acquire(path="/control/rewrite/add")
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_priority_served_first(self):
+        limiter = RateLimiter(rate=10, endpoint_rates={})
+        for _ in range(10):
+            limiter.acquire(path="/control/rewrite/list")
+
+        order = []
+        lock = threading.Lock()
+
+        def request(name, priority):
+            limiter.acquire(path="/control/rewrite/add" if priority else "/control/rewrite/list", priority=priority)
+            with lock:
+                order.append(name)
+
+        reads = [threading.Thread(target=request, args=(f"read{i}", False)) for i in range(3)]
+        for thread in reads:
+            thread.start()
+        time.sleep(0.02)
+        write = threading.Thread(target=request, args=("write", True))
+        write.start()
+        for thread in reads + [write]:
+            thread.join()
+
+        self.assertEqual(order[0], "write")
+
+
+class TestAsyncRateLimiter(unittest.IsolatedAsyncioTestCase):
+    async def test_global_limit(self):
+        limiter = RateLimiter(rate=20, endpoint_rates={})
+        start = time.monotonic()
+        await asyncio.gather(*[limiter.async_acquire(path="/control/status") for _ in range(25)])
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(limiter.delayed, 5)
+
+    async def test_shared_with_threads(self):
+        limiter = RateLimiter(rate=10, endpoint_rates={})
+        for _ in range(10):
+            limiter.acquire(path="/control/rewrite/list")
+        start = time.monotonic()
+        await limiter.async_acquire(path="/control/rewrite/list")
+        self.assertGreaterEqual(time.monotonic() - start, 0.05)
+
+    async def test_priority_served_first(self):
+        limiter = RateLimiter(rate=10, endpoint_rates={})
+        for _ in range(10):
+            limiter.acquire(path="/control/rewrite/list")
+
+        order = []
+
+        async def request(name, priority):
+            await limiter.async_acquire(path="/control/rewrite/add" if priority else "/control/rewrite/list",
+                                        priority=priority)
+            order.append(name)
+
+        reads = [asyncio.create_task(request(f"read{i}", False)) for i in range(3)]
+        await asyncio.sleep(0.02)
+        await asyncio.gather(request("write", True), *reads)
+
+        self.assertEqual(order[0], "write")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import unittest
+
+from app.api.connector import ApiConnector
+from app.api.reconciler import Reconciler
+from app.data.api_configuration import ApiConfiguration
+from tests.unit.fake_adguardhome import FakeAdGuardHome
+
+
+class TestReconciler(unittest.TestCase):
+    """
+    Test reconciler against local fake of AdGuardHome
+    """
+    def setUp(self):
+        self.adguard = FakeAdGuardHome().start()
+        self.adguard.rewrites = [{"domain": "same.lan", "answer": "1.1.1.1"},
+                                 {"domain": "change.lan", "answer": "1.1.1.1"},
+                                 {"domain": "static.lan", "answer": "3.3.3.3"}]
+
+        api_configs = ApiConfiguration()
+        api_configs.set(host='127.0.0.1', username='admin', port=self.adguard.port, passwd='12345678', proto='http',
+                        timeout=2, startup_enable=False)
+        self.reconciler = Reconciler(api_connect=ApiConnector(config=api_configs), interval=1, workers=2)
+
+    def tearDown(self):
+        self.adguard.stop()
+
+    def test_only_differences_written(self):
+        self.reconciler.publish(domain="same.lan", answer="1.1.1.1")
+        self.reconciler.publish(domain="change.lan", answer="2.2.2.2")
+        self.reconciler.publish(domain="new.lan", answer="4.4.4.4")
+        self.reconciler.publish(domain="static.lan", answer="3.3.3.3", exclusive=False)
+
+        self.assertEqual(self.reconciler.reconcile(), 2)
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 1)
+        self.assertEqual(self.adguard.count("/control/rewrite/add"), 2)
+        self.assertEqual(self.adguard.count("/control/rewrite/delete"), 1)
+        self.assertCountEqual(self.adguard.rewrites, [{"domain": "same.lan", "answer": "1.1.1.1"},
+                                                      {"domain": "change.lan", "answer": "2.2.2.2"},
+                                                      {"domain": "static.lan", "answer": "3.3.3.3"},
+                                                      {"domain": "new.lan", "answer": "4.4.4.4"}])
+
+    def test_no_writes_when_state_match(self):
+        self.reconciler.publish(domain="change.lan", answer="2.2.2.2")
+        self.reconciler.reconcile()
+        self.assertEqual(self.reconciler.reconcile(), 0)
+        self.assertEqual(self.adguard.count("/control/rewrite/list"), 2)
+        self.assertEqual(self.adguard.count("/control/rewrite/add"), 1)
+
+    def test_no_preference(self):
+        self.reconciler.publish(domain="change.lan", answer="2.2.2.2")
+        self.reconciler.publish(domain="change.lan", answer=None)
+        self.assertEqual(self.reconciler.reconcile(), 0)
+
+    def test_list_not_available(self):
+        self.adguard.passwd = "other"
+        self.reconciler.publish(domain="change.lan", answer="2.2.2.2")
+        self.assertEqual(self.reconciler.reconcile(), None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+from app.api.rewrites import RewriteTable
+
+
+class TestRewriteTable(unittest.TestCase):
+    def setUp(self):
+        self.table = RewriteTable(entries=[{"domain": "test.lan", "answer": "1.1.1.1"},
+                                           {"domain": "test.lan", "answer": "2.2.2.2"},
+                                           {"domain": "other.lan", "answer": "3.3.3.3"}])
+
+    def test_entry_exist(self):
+        self.assertEqual(self.table.entry_exist(answer="2.2.2.2", domain="test.lan"), True)
+
+    def test_entry_not_exist(self):
+        self.assertEqual(self.table.entry_exist(answer="3.3.3.3", domain="test.lan"), False)
+
+    def test_domain_exist(self):
+        self.assertEqual(self.table.domain_exist(domain="other.lan"), True)
+
+    def test_domain_not_exist(self):
+        self.assertEqual(self.table.domain_exist(domain="not-exist.lan"), False)
+
+    def test_answer_is_first_answer(self):
+        self.assertEqual(self.table.answer(domain="test.lan"), "1.1.1.1")
+
+    def test_answer_domain_not_exist(self):
+        self.assertEqual(self.table.answer(domain="not-exist.lan"), False)
+
+    def test_answers(self):
+        self.assertEqual(self.table.answers(domain="test.lan"), ["1.1.1.1", "2.2.2.2"])
+
+    def test_len(self):
+        self.assertEqual(len(self.table), 3)
+
+    def test_add(self):
+        self.table.add(answer="4.4.4.4", domain="new.lan")
+        self.assertEqual(self.table.answer(domain="new.lan"), "4.4.4.4")
+
+    def test_delete(self):
+        self.table.delete(answer="1.1.1.1", domain="test.lan")
+        self.assertEqual(self.table.answers(domain="test.lan"), ["2.2.2.2"])
+
+    def test_delete_last_answer(self):
+        self.table.delete(answer="3.3.3.3", domain="other.lan")
+        self.assertEqual(self.table.domain_exist(domain="other.lan"), False)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+import threading
+import time
+import unittest
+
+from app.api.connector import ApiConnector
+from app.api.write_queue import WriteQueue
+from app.data.api_configuration import ApiConfiguration
+from tests.unit.fake_adguardhome import FakeAdGuardHome
+
+
+class TestWriteQueue(unittest.TestCase):
+    """
+    Test write queue against local fake of AdGuardHome, queue thread is not started, writes are taken manually
+    """
+    def setUp(self):
+        self.adguard = FakeAdGuardHome().start()
+        self.adguard.rewrites = [{"domain": "test.lan", "answer": "1.1.1.1"}]
+        self.queue = WriteQueue(api_connect=self.connector(port=self.adguard.port), spacing=0.2)
+
+    def tearDown(self):
+        self.adguard.stop()
+
+    @staticmethod
+    def connector(port: int) -> ApiConnector:
+        api_configs = ApiConfiguration()
+        api_configs.set(host='127.0.0.1', username='admin', port=port, passwd='12345678', proto='http',
+                        timeout=2, startup_enable=False)
+        return ApiConnector(config=api_configs)
+
+    def write_next(self, timeout=None):
+        item = self.queue.take(timeout=timeout)
+        if item is not None:
+            domain, answer, exclusive = item
+            self.queue.write(domain=domain, answer=answer, exclusive=exclusive)
+        return item
+
+    def test_pending_writes_collapsed(self):
+        """
+        only the latest answer for domain is written
+        """
+        self.queue.publish(domain="test.lan", answer="2.2.2.2")
+        self.queue.publish(domain="test.lan", answer="1.1.1.1")
+        self.queue.publish(domain="test.lan", answer="3.3.3.3")
+        self.assertEqual(self.queue.pending(), 1)
+
+        self.assertEqual(self.write_next(), ("test.lan", "3.3.3.3", True))
+        self.assertEqual(self.adguard.rewrites, [{"domain": "test.lan", "answer": "3.3.3.3"}])
+        self.assertEqual(self.queue.stats(), {"processed": 1, "coalesced": 2, "retried": 0, "pending": 0})
+
+    def test_no_preference_cancel_pending_write(self):
+        self.queue.publish(domain="test.lan", answer="2.2.2.2")
+        self.queue.publish(domain="test.lan", answer=None)
+        self.assertEqual(self.queue.pending(), 0)
+        self.assertIsNone(self.write_next(timeout=0.05))
+        self.assertEqual(self.adguard.rewrites, [{"domain": "test.lan", "answer": "1.1.1.1"}])
+
+    def test_writes_for_domain_spaced(self):
+        self.queue.publish(domain="test.lan", answer="2.2.2.2")
+        start = time.monotonic()
+        self.write_next()
+
+        self.queue.publish(domain="test.lan", answer="3.3.3.3")
+        self.assertEqual(self.write_next(), ("test.lan", "3.3.3.3", True))
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    def test_other_domain_not_delayed(self):
+        self.queue.publish(domain="test.lan", answer="2.2.2.2")
+        self.write_next()
+
+        self.queue.publish(domain="test.lan", answer="3.3.3.3")
+        self.queue.publish(domain="other.lan", answer="4.4.4.4")
+        start = time.monotonic()
+        self.assertEqual(self.write_next(), ("other.lan", "4.4.4.4", True))
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_take_wakes_up_on_publish(self):
+        timer = threading.Timer(0.05, self.queue.publish, kwargs={"domain": "new.lan", "answer": "5.5.5.5"})
+        timer.start()
+        self.assertEqual(self.write_next(timeout=2), ("new.lan", "5.5.5.5", True))
+        self.assertIn({"domain": "new.lan", "answer": "5.5.5.5"}, self.adguard.rewrites)
+
+    def test_existing_answer_not_written_again(self):
+        self.queue.publish(domain="test.lan", answer="1.1.1.1")
+        self.write_next()
+        self.assertEqual(self.adguard.count("/control/rewrite/add"), 0)
+        self.assertEqual(self.adguard.count("/control/rewrite/delete"), 0)
+
+    def test_failed_write_retried(self):
+        self.queue.publish(domain="test.lan", answer="2.2.2.2")
+        self.adguard.stop()
+        with self.assertLogs(level="ERROR"):
+            self.write_next()
+        self.assertEqual(self.queue.pending(), 1)
+        self.assertEqual(self.queue.stats()["retried"], 1)
+
+        self.adguard = FakeAdGuardHome().start()
+        self.queue.api_connector = self.connector(port=self.adguard.port)
+        self.assertEqual(self.write_next(), ("test.lan", "2.2.2.2", True))
+        self.assertEqual(self.adguard.rewrites, [{"domain": "test.lan", "answer": "2.2.2.2"}])
+        self.assertEqual(self.queue.pending(), 0)
+
+    def test_failed_write_backoff(self):
+        """
+        with spacing 0 failed write must not be retried immediately, backoff doubles with every failure
+        """
+        self.queue = WriteQueue(api_connect=self.queue.api_connector, spacing=0.0, retry_backoff=0.1,
+                                retry_backoff_max=0.15)
+        self.queue.publish(domain="test.lan", answer="2.2.2.2")
+        self.adguard.stop()
+        with self.assertLogs(level="ERROR"):
+            self.write_next()
+            self.assertIsNone(self.write_next(timeout=0.05))
+
+            start = time.monotonic()
+            self.assertEqual(self.write_next(timeout=1), ("test.lan", "2.2.2.2", True))
+            self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+            start = time.monotonic()
+            self.assertEqual(self.write_next(timeout=1), ("test.lan", "2.2.2.2", True))
+            self.assertGreaterEqual(time.monotonic() - start, 0.14)
+        self.assertEqual(self.queue.stats()["retried"], 3)
+
+        # successful write resets backoff
+        self.adguard = FakeAdGuardHome().start()
+        self.queue.api_connector = self.connector(port=self.adguard.port)
+        self.assertEqual(self.write_next(timeout=1), ("test.lan", "2.2.2.2", True))
+        self.queue.publish(domain="test.lan", answer="3.3.3.3")
+        start = time.monotonic()
+        self.assertEqual(self.write_next(timeout=1), ("test.lan", "3.3.3.3", True))
+        self.assertLess(time.monotonic() - start, 0.05)
+
+    def test_failed_write_not_retried_when_answer_changed(self):
+        self.queue.publish(domain="test.lan", answer="2.2.2.2")
+        item = self.queue.take()
+        self.queue.publish(domain="test.lan", answer=None)
+        self.adguard.stop()
+        with self.assertLogs(level="ERROR"):
+            self.queue.write(*item)
+        self.assertEqual(self.queue.pending(), 0)
+
+
+if __name__ == "__main":
+    unittest.main()
@@ -7,7 +7,8 @@ class TestApi(unittest.TestCase):
     def setUp(self):
         self.api_conf = ApiConfiguration()
         self.api_conf.set(host='host', username='username', passwd='passwd', proto='proto', port=80, timeout=0.4,
-                          startup_enable=False)
+                          startup_enable=False, cache_ttl=3, pool_size=8, rate_limit=10,
+                          endpoint_rate_limits={"/control/rewrite/list": 2})
 
     def test_host(self):
         self.assertEqual(self.api_conf.host(), "host")
@@ -30,6 +31,24 @@ class TestApi(unittest.TestCase):
     def test_startup_enable(self):
         self.assertEqual(self.api_conf.startup_enable(), False)
 
+    def test_cache_ttl(self):
+        self.assertEqual(self.api_conf.cache_ttl(), 3)
+
+    def test_pool_size(self):
+        self.assertEqual(self.api_conf.pool_size(), 8)
+
+    def test_rate_limit(self):
+        self.assertEqual(self.api_conf.rate_limit(), 10)
+        self.assertEqual(self.api_conf.endpoint_rate_limits(), {"/control/rewrite/list": 2})
+
+    def test_replicas(self):
+        self.assertEqual(self.api_conf.replicas(), [])
+        replica = ApiConfiguration()
+        self.api_conf.add_replica(config=replica)
+        self.assertEqual(self.api_conf.replicas(), [replica])
+        # replicas are not shared between instances
+        self.assertEqual(ApiConfiguration().replicas(), [])
+
 
 if __name__ == "__main":
     unittest.main()
@@ -6,7 +6,11 @@ from app.data.config import Config
 class TestConfig(unittest.TestCase):
     def setUp(self):
         self.conf = Config()
-        self.conf.set(wait=2, entry_exist="KEEP", log_file="file", log_level=42)
+        self.conf.set(wait=2, entry_exist="KEEP", log_file="file", log_level=42, write_mode="RECONCILE",
+                      reconcile_interval=7, reconcile_workers=3, write_spacing=0.5,
+                      probe_cache=True, batch_ping=True, probe_pool=True, async_http=True,
+                      http_concurrency=200, stagger=True, jitter=2.5,
+                      drift_check=120)
 
     def test_wait(self):
         self.assertEqual(self.conf.wait(), 2)
@@ -19,3 +23,39 @@ class TestConfig(unittest.TestCase):
 
     def test_log_level(self):
         self.assertEqual(self.conf.log_level(), 42)
+
+    def test_write_mode(self):
+        self.assertEqual(self.conf.write_mode(), "RECONCILE")
+
+    def test_reconcile_interval(self):
+        self.assertEqual(self.conf.reconcile_interval(), 7)
+
+    def test_reconcile_workers(self):
+        self.assertEqual(self.conf.reconcile_workers(), 3)
+
+    def test_write_spacing(self):
+        self.assertEqual(self.conf.write_spacing(), 0.5)
+
+    def test_probe_cache(self):
+        self.assertEqual(self.conf.probe_cache(), True)
+
+    def test_batch_ping(self):
+        self.assertEqual(self.conf.batch_ping(), True)
+
+    def test_probe_pool(self):
+        self.assertEqual(self.conf.probe_pool(), True)
+
+    def test_async_http(self):
+        self.assertEqual(self.conf.async_http(), True)
+
+    def test_http_concurrency(self):
+        self.assertEqual(self.conf.http_concurrency(), 200)
+
+    def test_stagger(self):
+        self.assertEqual(self.conf.stagger(), True)
+
+    def test_jitter(self):
+        self.assertEqual(self.conf.jitter(), 2.5)
+
+    def test_drift_check(self):
+        self.assertEqual(self.conf.drift_check(), 120)
@@ -19,6 +19,19 @@ class TestData(unittest.TestCase):
     def test_api_startup_test(self):
         self.assertEqual(default.Api.startup, True)
 
+    def test_api_cache_ttl(self):
+        self.assertEqual(default.Api.cache_ttl, 5)
+
+    def test_api_pool_size(self):
+        self.assertEqual(default.Api.pool_size, 0)
+
+    def test_api_rate_limit(self):
+        self.assertEqual(default.Api.rate_limit, 0)
+        self.assertEqual(default.Api.rate_limit_list, 0)
+        self.assertEqual(default.Api.rate_limit_add, 0)
+        self.assertEqual(default.Api.rate_limit_delete, 0)
+        self.assertEqual(default.Api.rate_limit_update, 0)
+
     def test_config_wait(self):
         self.assertEqual(default.Config.wait, 0)
 
@@ -31,6 +44,42 @@ class TestData(unittest.TestCase):
     def test_config_invalid_entry(self):
         self.assertEqual(default.Config.entry_exist, 'KEEP')
 
+    def test_config_write_mode(self):
+        self.assertEqual(default.Config.write_mode, 'DIRECT')
+
+    def test_config_reconcile_interval(self):
+        self.assertEqual(default.Config.reconcile_interval, 10)
+
+    def test_config_reconcile_workers(self):
+        self.assertEqual(default.Config.reconcile_workers, 4)
+
+    def test_config_write_spacing(self):
+        self.assertEqual(default.Config.write_spacing, 1.0)
+
+    def test_config_probe_cache(self):
+        self.assertEqual(default.Config.probe_cache, False)
+
+    def test_config_batch_ping(self):
+        self.assertEqual(default.Config.batch_ping, False)
+
+    def test_config_probe_pool(self):
+        self.assertEqual(default.Config.probe_pool, False)
+
+    def test_config_async_http(self):
+        self.assertEqual(default.Config.async_http, False)
+
+    def test_config_http_concurrency(self):
+        self.assertEqual(default.Config.http_concurrency, 1000)
+
+    def test_config_stagger(self):
+        self.assertEqual(default.Config.stagger, False)
+
+    def test_config_jitter(self):
+        self.assertEqual(default.Config.jitter, 0.0)
+
+    def test_config_drift_check(self):
+        self.assertEqual(default.Config.drift_check, 300)
+
     def test_ping_job_interval(self):
         self.assertEqual(default.PingJob.interval, 60)
 
@@ -43,6 +92,38 @@ class TestData(unittest.TestCase):
     def test_ping_job_privileged(self):
         self.assertEqual(default.PingJob.privileged, False)
 
+    def test_ping_job_probe_mode(self):
+        self.assertEqual(default.PingJob.probe_mode, "ALL")
+
+    def test_ping_job_min_max_interval(self):
+        self.assertEqual(default.PingJob.min_interval, 0)
+        self.assertEqual(default.PingJob.max_interval, 0)
+
+    def test_ping_job_thresholds(self):
+        self.assertEqual(default.PingJob.rise, 1)
+        self.assertEqual(default.PingJob.fall, 1)
+        self.assertEqual(default.PingJob.hold, 0.0)
+
+    def test_ping_job_budget(self):
+        self.assertEqual(default.PingJob.budget, 0)
+
+    def test_tcp_job_interval(self):
+        self.assertEqual(default.TcpJob.interval, 60)
+
+    def test_tcp_job_timeout(self):
+        self.assertEqual(default.TcpJob.timeout, 2)
+
+    def test_tcp_job_probe_mode(self):
+        self.assertEqual(default.TcpJob.probe_mode, "ALL")
+
+    def test_tcp_job_thresholds(self):
+        self.assertEqual(default.TcpJob.rise, 1)
+        self.assertEqual(default.TcpJob.fall, 1)
+        self.assertEqual(default.TcpJob.hold, 0.0)
+
+    def test_tcp_job_budget(self):
+        self.assertEqual(default.TcpJob.budget, 0)
+
     def test_http_job_timeout(self):
         self.assertEqual(default.HttpJob.timeout, 10)
 
@@ -58,6 +139,27 @@ class TestData(unittest.TestCase):
     def test_http_job_port(self):
         self.assertEqual(default.HttpJob.port, 80)
 
+    def test_http_job_probe_mode(self):
+        self.assertEqual(default.HttpJob.probe_mode, "ALL")
+
+    def test_http_job_min_max_interval(self):
+        self.assertEqual(default.HttpJob.min_interval, 0)
+        self.assertEqual(default.HttpJob.max_interval, 0)
+
+    def test_http_job_thresholds(self):
+        self.assertEqual(default.HttpJob.rise, 1)
+        self.assertEqual(default.HttpJob.fall, 1)
+        self.assertEqual(default.HttpJob.hold, 0.0)
+
+    def test_http_job_method(self):
+        self.assertEqual(default.HttpJob.method, 'GET')
+        self.assertEqual(default.HttpJob.max_body, 4096)
+
+    def test_http_job_timeouts(self):
+        self.assertEqual(default.HttpJob.connect_timeout, 0)
+        self.assertEqual(default.HttpJob.read_timeout, 0)
+        self.assertEqual(default.HttpJob.budget, 0)
+
     def test_static_entry(self):
         self.assertEqual(default.StaticEntry.interval, 60)
 
@@ -1,7 +1,7 @@
 import unittest
 
 from app.data.jobs_configurations import JobsConfs
-from app.data.jobs_configurations import JobHttp, JobPing, JobStaticEntry
+from app.data.jobs_configurations import JobHttp, JobPing, JobStaticEntry, JobTcp
 
 class TestJobsConfsHttp(unittest.TestCase):
     def setUp(self) -> None:
@@ -9,7 +9,9 @@ class TestJobsConfsHttp(unittest.TestCase):
         self.confs.JobsHttp.append(interval=2, status_code=3, proto="http", domain="x", answers=["1", "2"], timeout=0.3,
                                    port=33)
         self.confs.JobsHttp.append(interval=12, status_code=13, proto="https", domain="xs", answers=["11", "21"],
-                                   timeout=1.3, port=133)
+                                   timeout=1.3, port=133, probe_mode="LAZY", min_interval=4, max_interval=48,
+                                   rise=2, fall=3, hold=15, method="HEAD", max_body=0, connect_timeout=0.5,
+                                   read_timeout=1, budget=5)
 
     def test_interval(self):
         self.assertEqual(self.confs.JobsHttp[0].interval(), 2)
@@ -39,6 +41,42 @@ class TestJobsConfsHttp(unittest.TestCase):
         self.assertEqual(self.confs.JobsHttp[0].port(), 33)
         self.assertEqual(self.confs.JobsHttp[1].port(), 133)
 
+    def test_probe_mode(self):
+        self.assertEqual(self.confs.JobsHttp[0].probe_mode(), "ALL")
+        self.assertEqual(self.confs.JobsHttp[1].probe_mode(), "LAZY")
+
+    def test_min_max_interval(self):
+        self.assertEqual(self.confs.JobsHttp[0].min_interval(), 2)
+        self.assertEqual(self.confs.JobsHttp[0].max_interval(), 2)
+        self.assertEqual(self.confs.JobsHttp[1].min_interval(), 4)
+        self.assertEqual(self.confs.JobsHttp[1].max_interval(), 48)
+
+    def test_thresholds(self):
+        self.assertEqual(self.confs.JobsHttp[0].rise(), 1)
+        self.assertEqual(self.confs.JobsHttp[0].fall(), 1)
+        self.assertEqual(self.confs.JobsHttp[0].hold(), 0)
+        self.assertEqual(self.confs.JobsHttp[1].rise(), 2)
+        self.assertEqual(self.confs.JobsHttp[1].fall(), 3)
+        self.assertEqual(self.confs.JobsHttp[1].hold(), 15)
+
+    def test_method(self):
+        self.assertEqual(self.confs.JobsHttp[0].method(), "GET")
+        self.assertEqual(self.confs.JobsHttp[1].method(), "HEAD")
+
+    def test_max_body(self):
+        self.assertEqual(self.confs.JobsHttp[0].max_body(), 4096)
+        self.assertEqual(self.confs.JobsHttp[1].max_body(), 0)
+
+    def test_split_timeout(self):
+        self.assertLess(abs(self.confs.JobsHttp[0].connect_timeout() - 0.3), 0.001)
+        self.assertLess(abs(self.confs.JobsHttp[0].read_timeout() - 0.3), 0.001)
+        self.assertEqual(self.confs.JobsHttp[1].connect_timeout(), 0.5)
+        self.assertEqual(self.confs.JobsHttp[1].read_timeout(), 1)
+
+    def test_budget(self):
+        self.assertEqual(self.confs.JobsHttp[0].budget(), 0)
+        self.assertEqual(self.confs.JobsHttp[1].budget(), 5)
+
     def test_iter(self):
         self.assertEqual(len(self.confs.JobsHttp), 2)
         for job in self.confs.JobsHttp:
@@ -51,7 +89,8 @@ class TestJobsConfsPing(unittest.TestCase):
         self.confs.JobsPing.append(interval=2, count=3, domain="x", answers=["1", "2"], timeout=0.3,
                                    privileged=False)
         self.confs.JobsPing.append(interval=12, count=13, domain="xs", answers=["11", "21"],
-                                   timeout=1.3, privileged=True)
+                                   timeout=1.3, privileged=True, probe_mode="RACE", min_interval=3, max_interval=60,
+                                   rise=4, fall=5, hold=0.5, budget=3)
 
     def test_interval(self):
         self.assertEqual(self.confs.JobsPing[0].interval(), 2)
@@ -65,6 +104,26 @@ class TestJobsConfsPing(unittest.TestCase):
         self.assertEqual(self.confs.JobsPing[0].privileged(), False)
         self.assertEqual(self.confs.JobsPing[1].privileged(), True)
 
+    def test_probe_mode(self):
+        self.assertEqual(self.confs.JobsPing[0].probe_mode(), "ALL")
+        self.assertEqual(self.confs.JobsPing[1].probe_mode(), "RACE")
+
+    def test_min_max_interval(self):
+        self.assertEqual(self.confs.JobsPing[0].min_interval(), 2)
+        self.assertEqual(self.confs.JobsPing[0].max_interval(), 2)
+        self.assertEqual(self.confs.JobsPing[1].min_interval(), 3)
+        self.assertEqual(self.confs.JobsPing[1].max_interval(), 60)
+
+    def test_thresholds(self):
+        self.assertEqual(self.confs.JobsPing[0].rise(), 1)
+        self.assertEqual(self.confs.JobsPing[1].rise(), 4)
+        self.assertEqual(self.confs.JobsPing[1].fall(), 5)
+        self.assertEqual(self.confs.JobsPing[1].hold(), 0.5)
+
+    def test_budget(self):
+        self.assertEqual(self.confs.JobsPing[0].budget(), 0)
+        self.assertEqual(self.confs.JobsPing[1].budget(), 3)
+
     def test_timeout(self):
         self.assertLess(abs(self.confs.JobsPing[0].timeout() - 0.3), 0.001)
         self.assertLess(abs(self.confs.JobsPing[1].timeout() - 1.3), 0.001)
@@ -83,6 +142,60 @@ class TestJobsConfsPing(unittest.TestCase):
             self.assertIsInstance(job, JobPing)
 
 
+class TestJobsConfsTcp(unittest.TestCase):
+    def setUp(self) -> None:
+        self.confs = JobsConfs()
+        self.confs.JobsTcp.append(interval=2, domain="x", answers=["1", "2"], timeout=0.3, port=22)
+        self.confs.JobsTcp.append(interval=12, domain="xs", answers=["11", "21"], timeout=1.3, port=5432,
+                                  probe_mode="LAZY", min_interval=3, max_interval=60, rise=4, fall=5, hold=0.5,
+                                  budget=3)
+
+    def test_interval(self):
+        self.assertEqual(self.confs.JobsTcp[0].interval(), 2)
+        self.assertEqual(self.confs.JobsTcp[1].interval(), 12)
+
+    def test_port(self):
+        self.assertEqual(self.confs.JobsTcp[0].port(), 22)
+        self.assertEqual(self.confs.JobsTcp[1].port(), 5432)
+
+    def test_probe_mode(self):
+        self.assertEqual(self.confs.JobsTcp[0].probe_mode(), "ALL")
+        self.assertEqual(self.confs.JobsTcp[1].probe_mode(), "LAZY")
+
+    def test_min_max_interval(self):
+        self.assertEqual(self.confs.JobsTcp[0].min_interval(), 2)
+        self.assertEqual(self.confs.JobsTcp[0].max_interval(), 2)
+        self.assertEqual(self.confs.JobsTcp[1].min_interval(), 3)
+        self.assertEqual(self.confs.JobsTcp[1].max_interval(), 60)
+
+    def test_thresholds(self):
+        self.assertEqual(self.confs.JobsTcp[0].rise(), 1)
+        self.assertEqual(self.confs.JobsTcp[1].rise(), 4)
+        self.assertEqual(self.confs.JobsTcp[1].fall(), 5)
+        self.assertEqual(self.confs.JobsTcp[1].hold(), 0.5)
+
+    def test_budget(self):
+        self.assertEqual(self.confs.JobsTcp[0].budget(), 0)
+        self.assertEqual(self.confs.JobsTcp[1].budget(), 3)
+
+    def test_timeout(self):
+        self.assertLess(abs(self.confs.JobsTcp[0].timeout() - 0.3), 0.001)
+        self.assertLess(abs(self.confs.JobsTcp[1].timeout() - 1.3), 0.001)
+
+    def test_domain(self):
+        self.assertEqual(self.confs.JobsTcp[0].domain(), "x")
+        self.assertEqual(self.confs.JobsTcp[1].domain(), "xs")
+
+    def test_answers(self):
+        self.assertEqual(self.confs.JobsTcp[0].answers(), ['1', '2'])
+        self.assertEqual(self.confs.JobsTcp[1].answers(), ['11', '21'])
+
+    def test_iter(self):
+        self.assertEqual(len(self.confs.JobsTcp), 2)
+        for job in self.confs.JobsTcp:
+            self.assertIsInstance(job, JobTcp)
+
+
 class TestJobsStaticEntry(unittest.TestCase):
     def setUp(self) -> None:
         self.confs = JobsConfs()
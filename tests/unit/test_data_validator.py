@@ -2,7 +2,10 @@ import unittest
 
 from app.data.validator import validate_domain, validate_ip, validate_ips, validate_network_port, \
                                validate_http_response_code, validate_interval, validate_timeout, validate_ping_count, \
-                               validate_proto
+                               validate_proto, validate_pool_size, validate_write_mode, validate_write_spacing, \
+                               validate_rate_limit, validate_probe_mode, \
+                               validate_interval_range, validate_threshold, validate_http_method, validate_max_body, \
+                               validate_tcp_port
 
 
 class ValidateDomain(unittest.TestCase):
@@ -657,5 +660,144 @@ class ValidateProto(unittest.TestCase):
         self.assertEqual(validate_proto(proto="http-://"), False)
 
 
+class ValidateRateLimit(unittest.TestCase):
+    def test_zero(self):
+        """
+        Test behavior when rate limit is zero (no limit)
+        """
+        self.assertEqual(validate_rate_limit(rate_limit=0), True)
+
+    def test_negative(self):
+        self.assertEqual(validate_rate_limit(rate_limit=-1), False)
+
+    def test_not_a_number(self):
+        self.assertEqual(validate_rate_limit(rate_limit="ten"), False)
+
+    def test_fraction(self):
+        self.assertEqual(validate_rate_limit(rate_limit=0.5), True)
+
+
+class ValidatePoolSize(unittest.TestCase):
+    def test_zero(self):
+        """
+        Test behavior when pool size is zero
+        """
+        self.assertEqual(validate_pool_size(pool_size=0), False)
+
+    def test_not_a_number(self):
+        """
+        Test behavior when pool size is not a number
+        """
+        self.assertEqual(validate_pool_size(pool_size="ten"), False)
+
+    def test_more_zero(self):
+        """
+        Test behavior when pool size is more than zero
+        """
+        self.assertEqual(validate_pool_size(pool_size=4), True)
+
+
+class ValidateWriteSpacing(unittest.TestCase):
+    def test_zero(self):
+        """
+        Test behavior when write spacing is zero, failed writes would be retried without any delay
+        """
+        self.assertEqual(validate_write_spacing(write_spacing=0), False)
+
+    def test_negative(self):
+        self.assertEqual(validate_write_spacing(write_spacing=-1), False)
+
+    def test_not_a_number(self):
+        self.assertEqual(validate_write_spacing(write_spacing="one"), False)
+
+    def test_more_zero(self):
+        self.assertEqual(validate_write_spacing(write_spacing=0.5), True)
+        self.assertEqual(validate_write_spacing(write_spacing=2), True)
+
+
+class ValidateWriteMode(unittest.TestCase):
+    def test_direct(self):
+        self.assertEqual(validate_write_mode(write_mode="DIRECT"), True)
+
+    def test_reconcile(self):
+        self.assertEqual(validate_write_mode(write_mode="RECONCILE"), True)
+
+    def test_queue(self):
+        self.assertEqual(validate_write_mode(write_mode="QUEUE"), True)
+
+    def test_unknown(self):
+        self.assertEqual(validate_write_mode(write_mode="direct"), False)
+        self.assertEqual(validate_write_mode(write_mode=None), False)
+
+
+class ValidateProbeMode(unittest.TestCase):
+    def test_known(self):
+        self.assertEqual(validate_probe_mode(probe_mode="ALL"), True)
+        self.assertEqual(validate_probe_mode(probe_mode="LAZY"), True)
+        self.assertEqual(validate_probe_mode(probe_mode="RACE"), True)
+
+    def test_unknown(self):
+        self.assertEqual(validate_probe_mode(probe_mode="lazy"), False)
+        self.assertEqual(validate_probe_mode(probe_mode=None), False)
+
+
+
+class ValidateIntervalRange(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(validate_interval_range(min_interval=5, interval=60, max_interval=300), True)
+        self.assertEqual(validate_interval_range(min_interval=60, interval=60, max_interval=60), True)
+
+    def test_min_greater(self):
+        self.assertEqual(validate_interval_range(min_interval=61, interval=60, max_interval=300), False)
+
+    def test_max_lower(self):
+        self.assertEqual(validate_interval_range(min_interval=5, interval=60, max_interval=30), False)
+
+
+
+class ValidateThreshold(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(validate_threshold(threshold=1), True)
+        self.assertEqual(validate_threshold(threshold=5), True)
+
+    def test_zero(self):
+        self.assertEqual(validate_threshold(threshold=0), False)
+
+    def test_not_int(self):
+        self.assertEqual(validate_threshold(threshold=1.5), False)
+        self.assertEqual(validate_threshold(threshold="two"), False)
+
+
 if __name__ == "__main__":
     unittest.main()
+
+
+class ValidateHttpMethod(unittest.TestCase):
+    def test_known(self):
+        self.assertEqual(validate_http_method(method="GET"), True)
+        self.assertEqual(validate_http_method(method="HEAD"), True)
+
+    def test_unknown(self):
+        self.assertEqual(validate_http_method(method="POST"), False)
+        self.assertEqual(validate_http_method(method="head"), False)
+
+
+class ValidateMaxBody(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(validate_max_body(max_body=0), True)
+        self.assertEqual(validate_max_body(max_body=4096), True)
+
+    def test_invalid(self):
+        self.assertEqual(validate_max_body(max_body=-1), False)
+        self.assertEqual(validate_max_body(max_body=1.5), False)
+
+
+class ValidateTcpPort(unittest.TestCase):
+    def test_valid(self):
+        self.assertEqual(validate_tcp_port(port=1), True)
+        self.assertEqual(validate_tcp_port(port=65535), True)
+
+    def test_invalid(self):
+        self.assertEqual(validate_tcp_port(port=0), False)
+        self.assertEqual(validate_tcp_port(port=65536), False)
+        self.assertEqual(validate_tcp_port(port="22"), False)
@@ -1,7 +1,18 @@
+import asyncio
 import logging
+import socket
+import threading
+import time
 import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
+import requests
+
+from app.api.reconciler import Reconciler
+from app.api.write_queue import WriteQueue
 from app.jobs import ping, http, static_entry
+from app.jobs.probe_cache import ProbeCache
+from app.jobs.probe_pool import ProbePool
 from app.data.jobs_configurations import JobPing, JobHttp, JobStaticEntry
 
 
@@ -123,6 +134,155 @@ class TestHttp(unittest.TestCase):
         self.assertEqual(self.http.hosts_statuses, [True, False])
 
 
+class TestStreamingProbe(unittest.TestCase):
+    """
+    Test http probe against local server, server sends body of length given in path, /redirect/<length> redirects to /
+    """
+    def setUp(self):
+        self.methods = []
+        self.connections = 0
+        test = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                test.connections += 1
+                super().setup()
+
+            def _reply(self, send_body: bool):
+                test.methods.append(self.command)
+                redirect = self.path.startswith("/redirect/")
+                body = b"x" * int(self.path.rsplit("/", 1)[1] or 0)
+                self.send_response(302 if redirect else 200)
+                if redirect:
+                    self.send_header("Location", "/")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if send_body:
+                    try:
+                        self.wfile.write(body)
+                    except OSError:
+                        pass
+
+            def do_GET(self):
+                self._reply(send_body=True)
+
+            def do_HEAD(self):
+                self._reply(send_body=False)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def job(self, method: str, pool: ProbePool = None) -> http.Test:
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan", answers=["127.0.0.1"],
+                         timeout=1, port=self.server.server_address[1], method=method)
+        return http.Test(config=c_http, api_connect=None, pool=pool)
+
+    def test_get(self):
+        self.assertEqual(self.job(method="GET").job_request(host="127.0.0.1"), True)
+        self.assertEqual(self.methods, ["GET"])
+
+    def test_head(self):
+        self.assertEqual(self.job(method="HEAD").job_request(host="127.0.0.1"), True)
+        self.assertEqual(self.methods, ["HEAD"])
+
+    def test_small_body_connection_reused(self):
+        with requests.Session() as session:
+            for _ in range(3):
+                with session.get(url=self.url + "/100", stream=True) as response:
+                    self.assertEqual(http.drain(response=response, max_body=4096), True)
+        self.assertEqual(self.connections, 1)
+
+    def test_large_body_not_read(self):
+        with requests.Session() as session:
+            for _ in range(2):
+                with session.get(url=self.url + "/10000000", stream=True) as response:
+                    self.assertEqual(http.drain(response=response, max_body=4096), False)
+                    self.assertEqual(response.raw.tell(), 0)
+        self.assertEqual(self.connections, 2)
+
+    def test_redirect_followed(self):
+        self.assertEqual(self.job(method="GET").probe(url=self.url + "/redirect/100"), 200)
+        self.assertEqual(self.methods, ["GET", "GET"])
+
+    def test_large_body_of_redirect_not_read(self):
+        job = self.job(method="GET", pool=ProbePool(targets=1))
+        self.assertEqual(job.probe(url=self.url + "/redirect/10000000"), 200)
+        # connection with unread body is closed, redirect is sent over new one
+        self.assertEqual(self.connections, 2)
+
+    def test_small_body_of_redirect_drained(self):
+        job = self.job(method="GET", pool=ProbePool(targets=1))
+        self.assertEqual(job.probe(url=self.url + "/redirect/100"), 200)
+        self.assertEqual(self.connections, 1)
+
+
+class TestProbeTimeouts(unittest.TestCase):
+    """
+    Test timeouts of http probe, server accepts connections (kernel backlog) but never responds
+    """
+    def setUp(self):
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(8)
+
+    def tearDown(self):
+        self.server.close()
+
+    def job(self, budget: float = 0) -> http.Test:
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan", answers=["127.0.0.1"],
+                         timeout=10, port=self.server.getsockname()[1], connect_timeout=1, read_timeout=0.2,
+                         budget=budget)
+        return http.Test(config=c_http, api_connect=None)
+
+    def test_read_timeout(self):
+        job = self.job()
+        start = time.monotonic()
+        self.assertEqual(job.job_request(host="127.0.0.1"), False)
+        self.assertLess(time.monotonic() - start, 1)
+        stats = job.timeout_stats()
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertGreaterEqual(stats["timeout_time"], 0.2)
+
+    def test_budget_of_single_answer(self):
+        job = self.job(budget=0.05)
+        job.conf._read_timeout = 1
+        start = time.monotonic()
+        self.assertEqual(job.probe_hosts(), [False])
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(job.timeout_stats()["expired"], 1)
+
+
+class TestCachedProbe(unittest.TestCase):
+    def test_failure_not_cached_longer_than_min_interval(self):
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan", answers=["192.168.56.105"],
+                         timeout=1, port=80, min_interval=0.1)
+        job = http.Test(config=c_http, api_connect=None, cache=ProbeCache())
+        probed = []
+
+        def probe(host):
+            probed.append(host)
+            return False
+
+        self.assertEqual(job.cache_ttl(), 0.1)
+        job.cached(probe=probe)("192.168.56.105")
+        job.cached(probe=probe)("192.168.56.105")
+        time.sleep(0.15)
+        # quick re-probe which confirms change of answer is sent
+        job.cached(probe=probe)("192.168.56.105")
+        self.assertEqual(len(probed), 2)
+
+
 class TestStaticJob(unittest.TestCase):
     # TODO: tests for static entry
     def setUp(self):
@@ -130,5 +290,298 @@ class TestStaticJob(unittest.TestCase):
         self.staticEntry = static_entry.Test(config=c_static_entry, api_connect=None)
 
 
+class TestPublishAnswer(unittest.TestCase):
+    """
+    Test answers published to reconciler, reconciler is never started so api is not needed
+    """
+    def setUp(self):
+        self.reconciler = Reconciler(api_connect=None, interval=10, workers=1)
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan",
+                         answers=["192.168.56.105", "192.168.56.22"], timeout=1, port=80)
+        self.http = http.Test(config=c_http, api_connect=None, writer=self.reconciler)
+
+    def test_first_accessible_host(self):
+        self.http.hosts_statuses = [False, True]
+        self.http.api_callback()
+        self.assertEqual(self.reconciler._desired, {"test.lan": ("192.168.56.22", True)})
+
+    def test_all_hosts_down(self):
+        self.http.hosts_statuses = [True, False]
+        self.http.api_callback()
+        self.http.hosts_statuses = [False, False]
+        self.http.api_callback()
+        self.assertEqual(self.reconciler._desired, {})
+
+    def test_static_entry(self):
+        c_static_entry = JobStaticEntry(interval=10, domain="static.lan", answer="192.168.56.105")
+        static_entry.Test(config=c_static_entry, api_connect=None, writer=self.reconciler).run()
+        self.assertEqual(self.reconciler._desired, {"static.lan": ("192.168.56.105", False)})
+
+
+class CountingConnector:
+    """
+    Api connector which counts writes, ensure_answer() returns result
+    """
+    def __init__(self):
+        self.calls = []
+        self.result = True
+
+    def ensure_answer(self, domain: str, answer: str, exclusive: bool = True) -> bool:
+        self.calls.append((domain, answer, exclusive))
+        return self.result
+
+
+class SingleAnswerConnector:
+    """
+    Api connector with rewrite list of one domain, counts added entries
+    """
+    def __init__(self, answer):
+        self.answer = answer
+        self.added = []
+
+    def get_answer_of_domain(self, domain: str):
+        return self.answer
+
+    def add_entry(self, answer: str, domain: str, check: bool = True) -> bool:
+        self.added.append((domain, answer))
+        self.answer = answer
+        return True
+
+
+class TestStaticEntryQueue(unittest.TestCase):
+    """
+    Static entry is published to write queue every interval, so entry deleted in AdGuardHome is added again
+    """
+    def test_published_every_interval(self):
+        api = CountingConnector()
+        queue = WriteQueue(api_connect=api, spacing=0.01)
+        c_static_entry = JobStaticEntry(interval=0.05, domain="static.lan", answer="192.168.56.105")
+        job = static_entry.Test(config=c_static_entry, api_connect=api, writer=queue)
+        job.daemon = True
+        job.start()
+
+        for _ in range(3):
+            item = queue.take(timeout=1)
+            self.assertEqual(item, ("static.lan", "192.168.56.105", False))
+            queue.write(*item)
+        self.assertEqual(job.is_alive(), True)
+        self.assertEqual(len(api.calls), 3)
+
+
+class TestSingleAnswer(unittest.TestCase):
+    """
+    Only host of job is down, its answer is added only when domain has no answer
+    """
+    def job(self, api: SingleAnswerConnector) -> http.Test:
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan", answers=["192.168.56.105"],
+                         timeout=1, port=80)
+        job = http.Test(config=c_http, api_connect=api)
+        job.hosts_statuses = [False]
+        return job
+
+    def test_answer_added_to_absent_domain(self):
+        api = SingleAnswerConnector(answer=False)
+        job = self.job(api=api)
+        job.api_callback()
+        self.assertEqual(api.added, [("test.lan", "192.168.56.105")])
+        self.assertEqual(job.applied_answer, ("192.168.56.105", False))
+
+    def test_other_answer_kept(self):
+        api = SingleAnswerConnector(answer="192.168.56.22")
+        job = self.job(api=api)
+        job.api_callback()
+        self.assertEqual(api.added, [])
+        self.assertEqual(job.actual_dns_answer, "192.168.56.22")
+
+    def test_connection_error_retried(self):
+        job = self.job(api=SingleAnswerConnector(answer=None))
+        job.api_callback()
+        self.assertIsNone(job.applied_answer)
+
+
+class TestEdgeTriggered(unittest.TestCase):
+    """
+    Test that api is used only when answer changes or drift check is due
+    """
+    def setUp(self):
+        self.api = CountingConnector()
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan",
+                         answers=["192.168.56.105", "192.168.56.22"], timeout=1, port=80)
+        self.http = http.Test(config=c_http, api_connect=self.api, drift_check=300)
+
+    def test_unchanged_answer_skipped(self):
+        self.http.hosts_statuses = [True, False]
+        self.http.api_callback()
+        self.http.api_callback()
+        self.assertEqual(self.api.calls, [("test.lan", "192.168.56.105", True)])
+
+    def test_changed_answer_written(self):
+        self.http.hosts_statuses = [True, False]
+        self.http.api_callback()
+        self.http.hosts_statuses = [False, True]
+        self.http.api_callback()
+        self.assertEqual(self.api.calls, [("test.lan", "192.168.56.105", True), ("test.lan", "192.168.56.22", True)])
+
+    def test_drift_check(self):
+        self.http.hosts_statuses = [True, False]
+        self.http.api_callback()
+        self.http._drift_check_at = time.monotonic()
+        self.http.api_callback()
+        self.assertEqual(len(self.api.calls), 2)
+
+    def test_failed_write_retried(self):
+        self.api.result = False
+        self.http.hosts_statuses = [True, False]
+        self.http.api_callback()
+        self.api.result = True
+        self.http.api_callback()
+        self.http.api_callback()
+        self.assertEqual(len(self.api.calls), 2)
+        self.assertEqual(self.http.applied_answer, ("192.168.56.105", True))
+
+    def test_writer_unchanged_answer_skipped(self):
+        reconciler = Reconciler(api_connect=None, interval=10, workers=1)
+        self.http.writer = reconciler
+        self.http.hosts_statuses = [True, False]
+        self.http.api_callback()
+        reconciler._desired = {}
+        self.http.api_callback()
+        self.assertEqual(reconciler._desired, {})
+
+
+class TestConcurrentProbing(unittest.TestCase):
+    """
+    Probes are replaced with slow dummy probes, so hosts are not needed
+    """
+    def setUp(self):
+        self.http = self.job(probe_mode="ALL")
+
+    @staticmethod
+    def job(probe_mode: str, budget: float = 0) -> http.Test:
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan",
+                         answers=["192.168.56.105", "192.168.56.22", "192.168.56.23", "192.168.56.24"], timeout=1,
+                         port=80, probe_mode=probe_mode, budget=budget)
+        return http.Test(config=c_http, api_connect=None)
+
+    def test_cycle_bounded_by_slowest_probe(self):
+        def slow_probe(host):
+            time.sleep(0.2)
+            return host == "192.168.56.23"
+
+        self.http.job_request = slow_probe
+        start = time.monotonic()
+        statuses = self.http.probe_hosts()
+        self.assertLess(time.monotonic() - start, 0.4)
+        self.assertEqual(statuses, [False, False, True, False])
+
+    def test_order_preserved(self):
+        delays = {"192.168.56.105": 0.15, "192.168.56.22": 0.1, "192.168.56.23": 0.05, "192.168.56.24": 0}
+
+        def probe(host):
+            time.sleep(delays[host])
+            return host
+
+        self.http.job_request = probe
+        self.assertEqual(self.http.probe_hosts(), self.http.answers)
+
+    def test_lazy_stops_at_first_healthy(self):
+        probed = []
+
+        def probe(host):
+            probed.append(host)
+            return host == "192.168.56.22"
+
+        self.http = self.job(probe_mode="LAZY")
+        self.http.job_request = probe
+        self.assertEqual(self.http.probe_hosts(), [False, True, None, None])
+        self.assertEqual(probed, ["192.168.56.105", "192.168.56.22"])
+
+    def test_race_waits_only_for_higher_priority(self):
+        def probe(host):
+            time.sleep(0.5 if host == "192.168.56.24" else 0.05)
+            return host == "192.168.56.22"
+
+        self.http = self.job(probe_mode="RACE")
+        self.http.job_request = probe
+        start = time.monotonic()
+        statuses = self.http.probe_hosts()
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(statuses, [False, True, None, None])
+
+    def test_async_race_cancels_lower_priority(self):
+        cancelled = []
+
+        async def probe(host):
+            try:
+                await asyncio.sleep(0.5 if host == "192.168.56.24" else 0.05)
+            except asyncio.CancelledError:
+                cancelled.append(host)
+                raise
+            return host == "192.168.56.105"
+
+        statuses = asyncio.run(self.http.async_probe_all(probe=probe, mode="RACE"))
+        self.assertEqual(statuses, [True, None, None, None])
+        self.assertIn("192.168.56.24", cancelled)
+
+    def test_async_lazy(self):
+        probed = []
+
+        async def probe(host):
+            probed.append(host)
+            return host == "192.168.56.23"
+
+        statuses = asyncio.run(self.http.async_probe_all(probe=probe, mode="LAZY"))
+        self.assertEqual(statuses, [False, False, True, None])
+        self.assertEqual(probed, ["192.168.56.105", "192.168.56.22", "192.168.56.23"])
+
+    def test_budget_expired(self):
+        def probe(host):
+            time.sleep(0.5 if host in ("192.168.56.22", "192.168.56.24") else 0.01)
+            return True
+
+        self.http = self.job(probe_mode="ALL", budget=0.1)
+        self.http.job_request = probe
+        start = time.monotonic()
+        statuses = self.http.probe_hosts()
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(statuses, [True, False, True, False])
+        self.assertEqual(self.http.timeout_stats()["expired"], 2)
+
+    def test_budget_expired_next_cycle(self):
+        def probe(host):
+            time.sleep(0.5 if host == "192.168.56.105" else 0.01)
+            return True
+
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan",
+                         answers=["192.168.56.105", "192.168.56.22"], timeout=1, port=80, budget=0.1)
+        self.http = http.Test(config=c_http, api_connect=None)
+        self.http.job_request = probe
+        for _ in range(3):
+            # abandoned probe of previous cycle doesn't hold thread needed by other answer
+            self.assertEqual(self.http.probe_hosts(), [False, True])
+        self.assertEqual(self.http.timeout_stats()["expired"], 3)
+
+    def test_lazy_budget_expired(self):
+        def probe(host):
+            time.sleep(0.5)
+            return True
+
+        self.http = self.job(probe_mode="LAZY", budget=0.1)
+        self.http.job_request = probe
+        self.assertEqual(self.http.probe_hosts(), [False, None, None, None])
+
+    def test_async_budget_expired(self):
+        async def probe(host):
+            await asyncio.sleep(0.5 if host == "192.168.56.105" else 0.01)
+            return True
+
+        self.http = self.job(probe_mode="ALL", budget=0.1)
+        start = time.monotonic()
+        statuses = asyncio.run(self.http.async_probe_all(probe=probe, mode="ALL"))
+        self.assertLess(time.monotonic() - start, 0.3)
+        self.assertEqual(statuses, [False, True, True, True])
+        self.assertEqual(self.http.timeout_stats()["expired"], 1)
+
+
 if __name__ == "__main__":
     unittest.main()
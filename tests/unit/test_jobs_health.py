@@ -0,0 +1,82 @@
+import unittest
+
+from app.data.jobs_configurations import JobPing
+from app.jobs import ping
+from app.jobs.health import HostHealth
+
+
+class TestHostHealth(unittest.TestCase):
+    def test_default_follows_tests(self):
+        health = HostHealth(hosts=2)
+        self.assertEqual(health.update(statuses=[True, True], now=0), [True, True])
+        self.assertEqual(health.update(statuses=[False, True], now=1), [False, True])
+        self.assertEqual(health.update(statuses=[True, None], now=2), [True, True])
+        self.assertEqual(health.suppressed, 0)
+
+    def test_fall(self):
+        health = HostHealth(hosts=2, fall=3)
+        health.update(statuses=[True, True], now=0)
+        self.assertEqual(health.update(statuses=[False, True], now=1), [True, True])
+        self.assertEqual(health.update(statuses=[False, True], now=2), [True, True])
+        self.assertEqual(health.update(statuses=[False, True], now=3), [False, True])
+        # one change of answer was delayed, it is counted once
+        self.assertEqual(health.suppressed, 1)
+
+    def test_blip_ignored(self):
+        """
+        single lost test doesn't change state
+        """
+        health = HostHealth(hosts=2, fall=2)
+        health.update(statuses=[True, True], now=0)
+        health.update(statuses=[False, True], now=1)
+        self.assertEqual(health.update(statuses=[True, True], now=2), [True, True])
+        self.assertEqual(health.update(statuses=[False, True], now=3), [True, True])
+        self.assertEqual(health.suppressed, 2)
+
+    def test_rise(self):
+        health = HostHealth(hosts=2, rise=2)
+        health.update(statuses=[False, True], now=0)
+        self.assertEqual(health.update(statuses=[True, True], now=1), [False, True])
+        self.assertEqual(health.update(statuses=[True, True], now=2), [True, True])
+
+    def test_not_tested_host_kept(self):
+        health = HostHealth(hosts=2, fall=2)
+        health.update(statuses=[True, True], now=0)
+        health.update(statuses=[False, None], now=1)
+        self.assertEqual(health.update(statuses=[False, None], now=2), [False, True])
+
+    def test_hold(self):
+        """
+        after failover answer is kept for hold time, even if primary host recovered
+        """
+        health = HostHealth(hosts=2, hold=30)
+        health.update(statuses=[True, True], now=0)
+        self.assertEqual(health.update(statuses=[False, True], now=100), [False, True])
+        self.assertEqual(health.update(statuses=[True, True], now=110), [False, True])
+        self.assertEqual(health.update(statuses=[True, True], now=131), [True, True])
+        self.assertEqual(health.suppressed, 1)
+
+    def test_hold_held_answer_fails(self):
+        health = HostHealth(hosts=3, hold=30)
+        health.update(statuses=[False, True, True], now=0)
+        self.assertEqual(health.update(statuses=[True, False, True], now=10), [True, False, True])
+
+
+class TestJobWithThresholds(unittest.TestCase):
+    def test_single_lost_ping_doesnt_change_answer(self):
+        conf = JobPing(interval=60, count=1, timeout=1, domain="test.lan", answers=["192.168.56.105", "192.168.56.22"],
+                       privileged=False, fall=2)
+        job = ping.Test(config=conf, api_connect=None)
+        results = iter([True, False, True, True])
+        job.job_request = lambda host: next(results) if host == "192.168.56.105" else True
+
+        answers = []
+        for _ in range(2):
+            job.update_statuses(statuses=job.probe_hosts())
+            answers.append(job.healthy_answer)
+        self.assertEqual(answers, ["192.168.56.105", "192.168.56.105"])
+        self.assertEqual(job.health.suppressed, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+import asyncio
+import os
+import ssl
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app.data.jobs_configurations import JobHttp
+from app.jobs import http
+from app.jobs.http_engine import HttpEngine
+
+TLS_DIRECTORY = os.path.join(os.path.dirname(__file__), "fixtures", "tls")
+
+
+class Server:
+    """
+    Local http(s) server, counts connections and requests in flight. Path decides how request is handled:
+    /redirect - redirect to /, /big - body longer than max_body, /slow - response is sent after 0.3 seconds
+    """
+
+    def __init__(self, tls: bool = False):
+        self.connections = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_HEAD(self):
+                self.do_GET()
+
+            def do_GET(self):
+                with server.lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                if self.path == "/slow":
+                    time.sleep(0.3)
+                body = b"x" * 100000 if self.path == "/big" else b"ok"
+                self.send_response(302 if self.path == "/redirect" else 200)
+                if self.path == "/redirect":
+                    self.send_header("Location", "/")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                with server.lock:
+                    server.in_flight -= 1
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        if tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(os.path.join(TLS_DIRECTORY, "cert.pem"), os.path.join(TLS_DIRECTORY, "key.pem"))
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self.port = self.server.server_address[1]
+        self.url = f"{'https' if tls else 'http'}://127.0.0.1:{self.port}"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestHttpEngine(unittest.TestCase):
+    def setUp(self):
+        self.server = Server()
+        self.engine = HttpEngine(concurrency=2)
+
+    def tearDown(self):
+        self.engine.stop()
+        self.server.stop()
+
+    def probe(self, path: str, method: str = "GET", connect_timeout: float = 1, read_timeout: float = 2) -> int:
+        return self.engine.probe(method=method, url=self.server.url + path, connect_timeout=connect_timeout,
+                                 read_timeout=read_timeout, max_body=4096)
+
+    def test_keep_alive(self):
+        for _ in range(3):
+            self.assertEqual(self.probe(path="/"), 200)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.engine.stats()["opened"], 1)
+        self.assertEqual(self.engine.stats()["reused"], 2)
+
+    def test_head(self):
+        self.assertEqual(self.probe(path="/", method="HEAD"), 200)
+        self.assertEqual(self.probe(path="/", method="HEAD"), 200)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_redirect_followed(self):
+        self.assertEqual(self.probe(path="/redirect"), 200)
+        self.assertEqual(self.engine.stats()["requests"], 1)
+
+    def test_big_body_not_read(self):
+        self.assertEqual(self.probe(path="/big"), 200)
+        self.assertEqual(self.probe(path="/"), 200)
+        self.assertEqual(self.server.connections, 2)
+
+    def test_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            # connect and read timeouts limit whole request together
+            self.probe(path="/slow", connect_timeout=0.1, read_timeout=0.1)
+
+    def test_refused(self):
+        port = self.server.port
+        self.server.stop()
+        with self.assertRaises(OSError):
+            self.engine.probe(method="GET", url=f"http://127.0.0.1:{port}/", connect_timeout=1, read_timeout=1,
+                              max_body=4096)
+
+    def test_concurrency_limit(self):
+        async def probe_all():
+            return await asyncio.gather(*[self.engine.async_probe(method="GET", url=self.server.url + "/slow",
+                                                                  connect_timeout=1, read_timeout=5, max_body=4096)
+                                          for _ in range(6)])
+
+        self.assertEqual(asyncio.run(probe_all()), [200] * 6)
+        self.assertEqual(self.engine.stats()["max_in_flight"], 2)
+        self.assertEqual(self.server.max_in_flight, 2)
+        self.assertEqual(self.engine.stats()["in_flight"], 0)
+
+
+class TestHttpEngineTls(unittest.TestCase):
+    def setUp(self):
+        self.server = Server(tls=True)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_certificate_verified(self):
+        engine = HttpEngine()
+        with self.assertRaises(ssl.SSLError):
+            engine.probe(method="GET", url=self.server.url + "/", connect_timeout=1, read_timeout=1, max_body=4096)
+        engine.stop()
+
+    def test_keep_alive(self):
+        context = ssl.create_default_context(cafile=os.path.join(TLS_DIRECTORY, "cert.pem"))
+        engine = HttpEngine(ssl_context=context)
+        for _ in range(2):
+            self.assertEqual(engine.probe(method="GET", url=self.server.url + "/", connect_timeout=1, read_timeout=1,
+                                          max_body=4096), 200)
+        self.assertEqual(self.server.connections, 1)
+        engine.stop()
+
+
+class TestHttpJobEngine(unittest.TestCase):
+    def setUp(self):
+        self.server = Server()
+        self.engine = HttpEngine()
+
+    def tearDown(self):
+        self.engine.stop()
+        self.server.stop()
+
+    def job(self, status_code: int = 200, timeout: float = 1) -> http.Test:
+        c_http = JobHttp(interval=60, status_code=status_code, proto="http", domain="test.lan",
+                         answers=["127.0.0.1"], timeout=timeout, port=self.server.port)
+        return http.Test(config=c_http, api_connect=None, http_engine=self.engine)
+
+    def test_job_request(self):
+        job = self.job()
+        self.assertEqual(job.job_request(host="127.0.0.1"), True)
+        self.assertEqual(job.job_request(host="127.0.0.1"), True)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_status_code_differs(self):
+        with self.assertLogs(level="INFO") as captured_logs:
+            self.assertEqual(self.job(status_code=404).job_request(host="127.0.0.1"), False)
+        self.assertEqual(captured_logs.records[1].getMessage(),
+                         f"Test (status) of: http://127.0.0.1:{self.server.port} failed (status code 200)")
+
+    def test_async_probe_hosts(self):
+        self.assertEqual(asyncio.run(self.job().async_probe_hosts(executor=None)), [True])
+
+    def test_connection_error(self):
+        job = self.job()
+        self.server.stop()
+        self.assertEqual(asyncio.run(job.async_probe_hosts(executor=None)), [False])
+        self.assertEqual(job.timeout_stats()["timeouts"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import os
+import socket
+import struct
+import unittest
+
+from app.data.jobs_configurations import JobPing
+from app.jobs import ping
+from app.jobs.icmp_engine import IcmpEngine, checksum
+
+
+class TestPacket(unittest.TestCase):
+    def test_checksum(self):
+        packet = struct.pack("!BBHHH", 8, 0, 0, 1, 2) + b"abcd"
+        packet = packet[:2] + struct.pack("!H", checksum(packet)) + packet[4:]
+        self.assertEqual(checksum(packet), 0)
+
+    def test_checksum_odd_length(self):
+        self.assertEqual(checksum(b"\x01"), 0xfeff)
+
+
+@unittest.skipUnless(os.geteuid() == 0, "raw ICMP socket needs root")
+class TestIcmpEngine(unittest.TestCase):
+    """
+    Ping loopback addresses, every address from 127.0.0.0/8 replies
+    """
+    def setUp(self):
+        self.engine = IcmpEngine()
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def test_ping(self):
+        self.assertEqual(self.engine.ping(address="127.0.0.1", count=1, timeout=1, privileged=True), True)
+        self.assertEqual(self.engine.stats()["received"], 1)
+
+    def test_ping_ipv6(self):
+        self.assertEqual(self.engine.ping(address="::1", count=1, timeout=1, privileged=True), True)
+
+    def test_not_an_ip(self):
+        self.assertEqual(self.engine.ping(address="test.lan", count=1, timeout=1, privileged=True), False)
+
+    def test_many_targets_one_socket(self):
+        async def ping_all():
+            return await asyncio.gather(*[self.engine.async_ping(address=f"127.0.{i // 250}.{i % 250 + 1}", count=1,
+                                                                 timeout=2, privileged=True) for i in range(1000)])
+
+        self.assertEqual(asyncio.run(ping_all()), [True] * 1000)
+        stats = self.engine.stats()
+        self.assertEqual(stats["sockets"], 1)
+        self.assertEqual(stats["received"], 1000)
+        self.assertLess(stats["batches"], 1000)
+
+    def test_reply_matched_by_sequence(self):
+        """
+        reply to other request (other sequence) doesn't resolve waiting request
+        """
+        async def probe():
+            channel = self.engine._channel(family=socket.AF_INET, privileged=True)
+            future = asyncio.get_running_loop().create_future()
+            channel.waiting[("127.0.0.1", 60000)] = future
+            result = await self.engine._ping(address="127.0.0.1", count=1, timeout=1, privileged=True)
+            return result, future.done()
+
+        loop = self.engine._start()
+        self.assertEqual(asyncio.run_coroutine_threadsafe(probe(), loop).result(), (True, False))
+
+    def test_ping_job(self):
+        job = ping.Test(config=JobPing(interval=60, count=1, timeout=1, domain="test.lan",
+                                       answers=["127.0.0.2", "127.0.0.3"], privileged=True),
+                        api_connect=None, icmp_engine=self.engine)
+        self.assertEqual(job.probe_hosts(), [True, True])
+        self.assertEqual(asyncio.run(job.async_probe_hosts(executor=None)), [True, True])
+        self.assertEqual(self.engine.stats()["sent"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+
+from app.data.jobs_configurations import JobHttp
+from app.jobs import http
+from app.jobs.pacing import Pacing
+
+
+class TestPacing(unittest.TestCase):
+    def test_no_stagger(self):
+        pacing = Pacing(domain="test.lan", interval=60)
+        self.assertEqual(pacing.start_delay(), 0.0)
+        self.assertEqual(pacing.first(now=100), 0.0)
+
+    def test_offset_deterministic(self):
+        first = Pacing(domain="test.lan", interval=60, stagger=True)
+        second = Pacing(domain="test.lan", interval=60, stagger=True)
+        self.assertEqual(first.start_delay(), second.start_delay())
+        self.assertGreaterEqual(first.start_delay(), 0)
+        self.assertLess(first.start_delay(), 60)
+
+    def test_offsets_spread(self):
+        """
+        offsets of many domains are spread over whole interval
+        """
+        offsets = [Pacing(domain=f"host{i}.lan", interval=60, stagger=True).start_delay() for i in range(600)]
+        buckets = [0] * 6
+        for offset in offsets:
+            buckets[int(offset // 10)] += 1
+        for bucket in buckets:
+            self.assertGreater(bucket, 60)
+
+    def test_jitter(self):
+        pacing = Pacing(domain="test.lan", interval=60, jitter=5)
+        pacing.first(now=0)
+        delays = []
+        for cycle in range(100):
+            pacing.begin(now=cycle * 60)
+            delays.append(pacing.end(now=cycle * 60))
+        self.assertGreaterEqual(min(delays), 55)
+        self.assertLessEqual(max(delays), 65)
+        self.assertGreater(len(set(delays)), 1)
+        # jitter doesn't accumulate, deadlines stay on interval grid
+        self.assertEqual(pacing.deadline, 6000)
+
+
+class TestDeadlines(unittest.TestCase):
+    def setUp(self):
+        self.pacing = Pacing(domain="test.lan", interval=10)
+        self.pacing.first(now=100)
+
+    def test_no_drift(self):
+        """
+        time spent by test is subtracted from sleep
+        """
+        self.pacing.begin(now=100)
+        self.assertEqual(self.pacing.end(now=103), 7)
+        self.pacing.begin(now=110)
+        self.assertEqual(self.pacing.end(now=119), 1)
+        self.assertEqual(self.pacing.deadline, 120)
+        self.assertEqual(self.pacing.overruns, 0)
+
+    def test_overrun(self):
+        """
+        late job waits whole interval, it doesn't run missed tests back to back
+        """
+        self.pacing.begin(now=100)
+        self.assertEqual(self.pacing.end(now=125), 10)
+        self.assertEqual(self.pacing.overruns, 1)
+        self.assertEqual(self.pacing.deadline, 135)
+
+    def test_lag(self):
+        self.pacing.begin(now=100.5)
+        self.assertEqual(self.pacing.lag, 0.5)
+        self.pacing.end(now=101)
+        self.pacing.begin(now=112)
+        self.assertEqual(self.pacing.stats(), {"domain": "test.lan", "interval": 10, "overruns": 0, "lag": 2,
+                                               "max_lag": 2})
+
+
+class TestAdaptiveInterval(unittest.TestCase):
+    def setUp(self):
+        self.pacing = Pacing(domain="test.lan", interval=20, min_interval=5, max_interval=80)
+
+    def test_fixed_by_default(self):
+        pacing = Pacing(domain="test.lan", interval=20)
+        for stable in (False, True, True, True, True):
+            pacing.adapt(stable=stable)
+            self.assertEqual(pacing.interval, 20)
+
+    def test_change_probed_quickly(self):
+        self.pacing.adapt(stable=False)
+        self.assertEqual(self.pacing.interval, 5)
+
+    def test_backoff_when_stable(self):
+        intervals = []
+        for _ in range(12):
+            self.pacing.adapt(stable=True)
+            intervals.append(self.pacing.interval)
+        self.assertEqual(intervals, [20, 20, 40, 40, 40, 80, 80, 80, 80, 80, 80, 80])
+
+    def test_next_deadline_uses_interval(self):
+        self.pacing.first(now=0)
+        self.pacing.begin(now=0)
+        self.pacing.adapt(stable=False)
+        self.assertEqual(self.pacing.end(now=1), 4)
+
+
+class TestAdaptiveJob(unittest.TestCase):
+    """
+    Interval of job follows changes of its answer
+    """
+    def test_job(self):
+        job = http.Test(config=JobHttp(interval=20, status_code=200, proto="http", domain="test.lan",
+                                       answers=["192.168.56.105", "192.168.56.22"], timeout=1, port=80,
+                                       min_interval=5, max_interval=80), api_connect=None)
+        healthy = {"192.168.56.105": True, "192.168.56.22": True}
+        job.job_request = lambda host: healthy[host]
+        job.api_callback = lambda: None
+
+        job.cycle()
+        self.assertEqual(job.pacing.interval, 20)
+        healthy["192.168.56.105"] = False
+        job.cycle()
+        self.assertEqual(job.pacing.interval, 5)
+        for _ in range(3):
+            job.cycle()
+        self.assertEqual(job.pacing.interval, 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from app.data.jobs_configurations import JobPing
+from app.jobs import ping
+from app.jobs.probe_cache import ProbeCache
+
+
+class TestProbeCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ProbeCache()
+        self.probes = 0
+
+    def probe(self, delay: float = 0.0):
+        time.sleep(delay)
+        self.probes += 1
+        return True
+
+    def test_result_cached(self):
+        self.assertEqual(self.cache.get(key=("ping", "1.1.1.1"), probe=self.probe, ttl=10), True)
+        self.assertEqual(self.cache.get(key=("ping", "1.1.1.1"), probe=self.probe, ttl=10), True)
+        self.assertEqual(self.probes, 1)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    def test_different_keys(self):
+        self.cache.get(key=("ping", "1.1.1.1"), probe=self.probe, ttl=10)
+        self.cache.get(key=("ping", "2.2.2.2"), probe=self.probe, ttl=10)
+        self.cache.get(key=("http", "1.1.1.1"), probe=self.probe, ttl=10)
+        self.assertEqual(self.probes, 3)
+
+    def test_shortest_ttl_used(self):
+        """
+        result is kept at most for the shortest interval of jobs using it
+        """
+        self.cache.get(key=("ping", "1.1.1.1"), probe=self.probe, ttl=0.1)
+        time.sleep(0.15)
+        self.cache.get(key=("ping", "1.1.1.1"), probe=self.probe, ttl=10)
+        self.assertEqual(self.probes, 2)
+
+    def test_concurrent_probes_collapsed(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+            self.cache.get(key=("ping", "1.1.1.1"), probe=lambda: self.probe(delay=0.2), ttl=10)))
+            for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [True] * 5)
+        self.assertEqual(self.probes, 1)
+        self.assertEqual(self.cache.stats()["shared"], 4)
+
+    def test_failed_probe_not_cached(self):
+        def failing():
+            raise OSError("probe failed")
+
+        with self.assertRaises(OSError):
+            self.cache.get(key=("ping", "1.1.1.1"), probe=failing, ttl=10)
+        self.assertEqual(self.cache.get(key=("ping", "1.1.1.1"), probe=self.probe, ttl=10), True)
+        self.assertEqual(self.probes, 1)
+
+    def test_async_concurrent_probes_collapsed(self):
+        async def probe():
+            await asyncio.sleep(0.1)
+            self.probes += 1
+            return False
+
+        async def main():
+            return await asyncio.gather(*[self.cache.async_get(key=("ping", "1.1.1.1"), probe=probe, ttl=10)
+                                          for _ in range(5)])
+
+        self.assertEqual(asyncio.run(main()), [False] * 5)
+        self.assertEqual(self.probes, 1)
+
+    def test_async_cancelled_owner_does_not_cancel_shared_probe(self):
+        """
+        job which started probe is cancelled while other job waits for the same probe
+        """
+        async def probe():
+            await asyncio.sleep(0.1)
+            self.probes += 1
+            return True
+
+        async def main():
+            owner = asyncio.ensure_future(self.cache.async_get(key=("ping", "1.1.1.1"), probe=probe, ttl=10))
+            await asyncio.sleep(0)
+            waiter = asyncio.ensure_future(self.cache.async_get(key=("ping", "1.1.1.1"), probe=probe, ttl=10))
+            await asyncio.sleep(0.01)
+            owner.cancel()
+            return await waiter
+
+        self.assertEqual(asyncio.run(main()), True)
+        self.assertEqual(self.probes, 1)
+        self.assertEqual(self.cache.get(key=("ping", "1.1.1.1"), probe=self.probe, ttl=10), True)
+        self.assertEqual(self.probes, 1)
+
+
+class TestSharedJobs(unittest.TestCase):
+    """
+    Two jobs with the same host share one probe
+    """
+    def test_jobs_share_probe(self):
+        cache = ProbeCache()
+        jobs = [ping.Test(config=JobPing(interval=60, count=1, timeout=1, domain=domain,
+                                         answers=["192.168.56.105", "192.168.56.22"], privileged=False),
+                          api_connect=None, cache=cache) for domain in ("a.lan", "b.lan")]
+        probed = []
+
+        def probe(host):
+            probed.append(host)
+            return host == "192.168.56.22"
+
+        for job in jobs:
+            job.job_request = probe
+            self.assertEqual(job.probe_hosts(), [False, True])
+        self.assertEqual(sorted(probed), ["192.168.56.105", "192.168.56.22"])
+        self.assertEqual(cache.stats()["hits"], 2)
+
+    def test_race_job_does_not_cancel_shared_probe(self):
+        """
+        job A races [P, Q] and stops at healthy P, job B probes [Q, R] and waits for probe of Q started by job A
+        """
+        cache = ProbeCache()
+        hosts = {"a.lan": ["192.168.56.1", "192.168.56.2"], "b.lan": ["192.168.56.2", "192.168.56.3"]}
+        jobs = {domain: ping.Test(config=JobPing(interval=60, count=1, timeout=1, domain=domain, answers=answers,
+                                                 privileged=False), api_connect=None, cache=cache)
+                for domain, answers in hosts.items()}
+        delays = {"192.168.56.1": 0.01, "192.168.56.2": 0.1, "192.168.56.3": 0.01}
+
+        async def probe(host):
+            await asyncio.sleep(delays[host])
+            return True
+
+        async def main():
+            race = asyncio.ensure_future(jobs["a.lan"].async_probe_all(probe=jobs["a.lan"].async_cached(probe),
+                                                                      mode="RACE"))
+            await asyncio.sleep(0)
+            statuses = await jobs["b.lan"].async_probe_all(probe=jobs["b.lan"].async_cached(probe))
+            return await race, statuses
+
+        race_statuses, statuses = asyncio.run(main())
+        self.assertEqual(race_statuses, [True, None])
+        self.assertEqual(statuses, [True, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
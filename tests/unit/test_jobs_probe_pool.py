@@ -0,0 +1,177 @@
+import os
+import socket
+import ssl
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.data.jobs_configurations import JobHttp
+from app.jobs import http
+from app.jobs.probe_pool import ProbePool
+
+TLS_DIRECTORY = os.path.join(os.path.dirname(__file__), "fixtures", "tls")
+
+
+class Server:
+    """
+    Local http(s) server, counts connections, requests and resumed TLS sessions. Path decides how request is handled:
+    /close - connection is closed after response, /stale - connection is closed without response on second request,
+    /broken - connection is always closed without response
+    """
+
+    def __init__(self, tls: bool = False):
+        self.connections = 0
+        self.requests = 0
+        self.resumed = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                self.served = 0
+                server.connections += 1
+
+            def do_GET(self):
+                server.requests += 1
+                self.served += 1
+                if isinstance(self.connection, ssl.SSLSocket):
+                    server.resumed += self.connection.session_reused
+                if self.path == "/broken" or (self.path == "/stale" and self.served > 1):
+                    self.close_connection = True
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                if self.path == "/close":
+                    self.send_header("Connection", "close")
+                    self.close_connection = True
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        if tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(os.path.join(TLS_DIRECTORY, "cert.pem"), os.path.join(TLS_DIRECTORY, "key.pem"))
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True)
+        self.port = self.server.server_address[1]
+        self.url = f"{'https' if tls else 'http'}://127.0.0.1:{self.port}"
+        threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestProbePool(unittest.TestCase):
+    def setUp(self):
+        self.server = Server()
+        self.pool = ProbePool(targets=1)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def get(self, path: str) -> int:
+        with self.pool.request(method="GET", url=self.server.url + path, timeout=2) as response:
+            http.drain(response=response, max_body=4096)
+        return response.status_code
+
+    def test_keep_alive(self):
+        for _ in range(3):
+            self.assertEqual(self.get(path="/"), 200)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.pool.stats()["requests"], 3)
+
+    def test_stale_connection_retried(self):
+        self.assertEqual(self.get(path="/stale"), 200)
+        self.assertEqual(self.get(path="/stale"), 200)
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(self.server.requests, 3)
+
+    def test_broken_host_retried_once(self):
+        with self.assertRaises(requests.ConnectionError):
+            self.get(path="/broken")
+        self.assertEqual(self.server.requests, 2)
+
+    def test_refused_not_retried(self):
+        port = self.server.port
+        self.server.stop()
+        with self.assertRaises(requests.ConnectionError):
+            self.pool.request(method="GET", url=f"http://127.0.0.1:{port}/", timeout=2)
+
+    def test_read_timeout(self):
+        # server accepts connection (kernel backlog) but never responds
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        with self.assertRaises(requests.ReadTimeout):
+            self.pool.request(method="GET", url=f"http://127.0.0.1:{listener.getsockname()[1]}/", timeout=(1, 0.2))
+        listener.close()
+
+
+class TestTlsResumption(unittest.TestCase):
+    def setUp(self):
+        self.server = Server(tls=True)
+        self.pool = ProbePool(targets=1)
+        self.pool.context.load_verify_locations(os.path.join(TLS_DIRECTORY, "cert.pem"))
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_session_resumed(self):
+        for _ in range(3):
+            with self.pool.request(method="GET", url=self.server.url + "/close", timeout=2) as response:
+                http.drain(response=response, max_body=4096)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.connections, 3)
+        self.assertEqual(self.server.resumed, 2)
+        self.assertEqual(self.pool.stats()["handshakes"], 3)
+        self.assertEqual(self.pool.stats()["resumed"], 2)
+
+    def test_keep_alive_without_handshake(self):
+        for _ in range(3):
+            with self.pool.request(method="GET", url=self.server.url + "/", timeout=2) as response:
+                http.drain(response=response, max_body=4096)
+        self.assertEqual(self.pool.stats()["handshakes"], 1)
+
+    def test_certificate_verified(self):
+        pool = ProbePool(targets=1)
+        with self.assertRaises(requests.exceptions.SSLError):
+            pool.request(method="GET", url=self.server.url + "/", timeout=2)
+
+
+class TestHttpJobPool(unittest.TestCase):
+    def setUp(self):
+        self.server = Server()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_connection_reused_by_job(self):
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan", answers=["127.0.0.1"],
+                         timeout=1, port=self.server.port)
+        job = http.Test(config=c_http, api_connect=None, pool=ProbePool(targets=1))
+        self.assertEqual(job.job_request(host="127.0.0.1"), True)
+        self.assertEqual(job.job_request(host="127.0.0.1"), True)
+        self.assertEqual(self.server.connections, 1)
+
+    def test_read_timeout_counted(self):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(8)
+        port = listener.getsockname()[1]
+        c_http = JobHttp(interval=60, status_code=200, proto="http", domain="test.lan", answers=["127.0.0.1"],
+                         timeout=1, port=port, connect_timeout=1, read_timeout=0.2)
+        job = http.Test(config=c_http, api_connect=None, pool=ProbePool(targets=1))
+        with self.assertLogs(level="INFO") as captured_logs:
+            self.assertEqual(job.job_request(host="127.0.0.1"), False)
+        listener.close()
+        self.assertEqual(captured_logs.records[1].getMessage(),
+                         f"Test (status) of: http://127.0.0.1:{port} failed (Timeout)")
+        self.assertEqual(job.timeout_stats()["timeouts"], 1)
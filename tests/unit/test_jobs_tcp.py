@@ -0,0 +1,142 @@
+import asyncio
+import socket
+import time
+import unittest
+
+from app.data.jobs_configurations import JobTcp
+from app.jobs import tcp
+from app.jobs.tcp_engine import TcpEngine
+
+
+def closed_port() -> int:
+    """
+    :return: loopback port on which nothing listens
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+class Listener:
+    """
+    Listening socket which never accepts, when full is set its accept queue is filled, so next handshakes are dropped
+    by kernel and connects time out
+    """
+
+    def __init__(self, full: bool = False):
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(0 if full else 256)
+        self.port = self.sock.getsockname()[1]
+        self.clients = []
+        if full:
+            for _ in range(2):
+                client = socket.socket()
+                client.setblocking(False)
+                client.connect_ex(("127.0.0.1", self.port))
+                self.clients.append(client)
+            time.sleep(0.1)
+
+    def close(self):
+        for client in self.clients:
+            client.close()
+        self.sock.close()
+
+
+class TestTcpEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = TcpEngine()
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def test_established(self):
+        listener = Listener()
+        self.engine.connect(address="127.0.0.1", port=listener.port, timeout=1)
+        listener.close()
+        self.assertEqual(self.engine.stats()["established"], 1)
+
+    def test_ipv6(self):
+        sock = socket.socket(socket.AF_INET6)
+        sock.bind(("::1", 0))
+        sock.listen(1)
+        self.engine.connect(address="::1", port=sock.getsockname()[1], timeout=1)
+        sock.close()
+
+    def test_refused_without_waiting(self):
+        started = time.monotonic()
+        with self.assertRaises(ConnectionRefusedError):
+            self.engine.connect(address="127.0.0.1", port=closed_port(), timeout=5)
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual(self.engine.stats()["refused"], 1)
+
+    def test_timeout(self):
+        listener = Listener(full=True)
+        with self.assertRaises(asyncio.TimeoutError):
+            self.engine.connect(address="127.0.0.1", port=listener.port, timeout=0.2)
+        listener.close()
+        self.assertEqual(self.engine.stats()["timeouts"], 1)
+
+    def test_multiplexed(self):
+        listeners = [Listener() for _ in range(5)]
+
+        async def connect_all():
+            await asyncio.gather(*[self.engine.async_connect(address="127.0.0.1", port=listener.port, timeout=1)
+                                   for listener in listeners for _ in range(40)], return_exceptions=True)
+
+        asyncio.run(connect_all())
+        for listener in listeners:
+            listener.close()
+        self.assertEqual(self.engine.stats()["connects"], 200)
+        self.assertGreater(self.engine.stats()["max_in_flight"], 1)
+
+
+class TestTcpJob(unittest.TestCase):
+    def setUp(self):
+        self.engine = TcpEngine()
+
+    def tearDown(self):
+        self.engine.stop()
+
+    def job(self, port: int, answers: list = None) -> tcp.Test:
+        c_tcp = JobTcp(interval=60, timeout=0.2, domain="test.lan", answers=answers or ["127.0.0.1"], port=port)
+        return tcp.Test(config=c_tcp, api_connect=None, tcp_engine=self.engine)
+
+    def test_job_request(self):
+        listener = Listener()
+        with self.assertLogs(level="INFO") as captured_logs:
+            self.assertEqual(self.job(port=listener.port).job_request(host="127.0.0.1"), True)
+        listener.close()
+        self.assertEqual(captured_logs.records[1].getMessage(), f"Test (status) of: 127.0.0.1:{listener.port} ok")
+
+    def test_refused(self):
+        port = closed_port()
+        job = self.job(port=port)
+        with self.assertLogs(level="INFO") as captured_logs:
+            self.assertEqual(job.job_request(host="127.0.0.1"), False)
+        self.assertEqual(captured_logs.records[1].getMessage(),
+                         f"Test (status) of: 127.0.0.1:{port} failed (Connection refused)")
+        self.assertEqual(job.timeout_stats()["timeouts"], 0)
+
+    def test_timeout(self):
+        listener = Listener(full=True)
+        job = self.job(port=listener.port)
+        with self.assertLogs(level="INFO") as captured_logs:
+            self.assertEqual(asyncio.run(job.async_job_request(host="127.0.0.1")), False)
+        listener.close()
+        self.assertEqual(captured_logs.records[1].getMessage(),
+                         f"Test (status) of: 127.0.0.1:{listener.port} failed (Timeout)")
+        self.assertEqual(job.timeout_stats()["timeouts"], 1)
+
+    def test_probe_hosts(self):
+        listener = Listener()
+        job = self.job(port=listener.port, answers=["127.0.0.2", "127.0.0.1"])
+        self.assertEqual(job.probe_hosts(), [False, True])
+        self.assertEqual(asyncio.run(job.async_probe_hosts(executor=None)), [False, True])
+        listener.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -129,6 +129,22 @@ class TestCliParser(unittest.TestCase):
         self.assertEqual(self.parser_5.config_file, "config-file")
         self.assertEqual(self.parser_6.config_file, "config-file")
 
+    def test_engine(self):
+        """
+        Test if '--engine' argument is recognised correctly, threads is default engine
+        :return:
+        """
+        self.assertEqual(self.parser_0.engine, "threads")
+        parser = CliParser(['main.py', '--log-file=file.log', '--log-level=DEBUG', '-p', '--engine=asyncio',
+                            'config-file'])
+        parser.find_args()
+        self.assertEqual(parser.engine, "asyncio")
+        self.assertEqual(parser.config_file, "config-file")
+        self.assertEqual(parser.run_privileged, True)
+
+        with self.assertRaises(SystemExit):
+            CliParser(['main.py', '--engine=fibers', 'config-file']).find_args()
+
     def test_wrong_usage(self):
         """
         Test behavior when wrong count of arguments is provided or unrecognised arguments are used
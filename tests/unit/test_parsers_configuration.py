@@ -114,6 +114,11 @@ class TestApi(unittest.TestCase):
         self.assertEqual(c_api.port(), 93)
         self.assertEqual(c_api.timeout(), 7)
         self.assertEqual(c_api.startup_enable(), False)
+        self.assertEqual(c_api.cache_ttl(), 3)
+        self.assertEqual(c_api.pool_size(), 12)
+        self.assertEqual(c_api.rate_limit(), 20)
+        self.assertEqual(c_api.endpoint_rate_limits(), {"/control/rewrite/list": 2, "/control/rewrite/add": 5,
+                                                        "/control/rewrite/delete": 0, "/control/rewrite/update": 0})
 
     def test_api_port_default(self):
         """
@@ -172,6 +177,51 @@ class TestApi(unittest.TestCase):
         self.assertEqual(c_api.port(), 80)
         self.assertEqual(c_api.timeout(), 10)
         self.assertEqual(c_api.startup_enable(), True)
+        self.assertEqual(c_api.cache_ttl(), 5)
+        self.assertEqual(c_api.pool_size(), 1)
+        self.assertEqual(c_api.rate_limit(), 0)
+
+    def test_pool_size_match_number_of_jobs(self):
+        """
+        check if pool size is set to number of jobs when it's not provided
+        :return:
+        """
+        c_api = ApiConfiguration()
+        parser = ConfigParser(file=self.working_directory + 'api_only_all_default.yml', jobs_confs=self.c_jobs,
+                              api_confs=c_api, confs=self.c_conf)
+        parser.get_configs()
+        self.c_jobs.JobsStaticEntry.append(interval=60, domain="test.lan", answer="1.1.1.1")
+        self.c_jobs.JobsStaticEntry.append(interval=60, domain="test2.lan", answer="1.1.1.1")
+        self.c_jobs.JobsTcp.append(interval=60, timeout=1, domain="test3.lan", answers=["1.1.1.1"], port=22)
+        parser.parse_api()
+
+        self.assertEqual(c_api.pool_size(), 3)
+
+    def test_api_multiple_instances(self):
+        """
+        check if first instance is stored directly and others are stored as replicas
+        :return:
+        """
+        c_api = ApiConfiguration()
+        parser = ConfigParser(file=self.working_directory + 'api_only_multiple.yml', jobs_confs=self.c_jobs,
+                              api_confs=c_api, confs=self.c_conf)
+        parser.get_configs()
+        parser.parse_api()
+
+        self.assertEqual(c_api.host(), "adguard.example.com")
+        self.assertEqual(c_api.port(), 93)
+        self.assertEqual(c_api.startup_enable(), False)
+        self.assertEqual(len(c_api.replicas()), 1)
+
+        replica = c_api.replicas()[0]
+        self.assertEqual(replica.host(), "192.168.1.2")
+        self.assertEqual(replica.username(), "admin2")
+        self.assertEqual(replica.passwd(), "87654321")
+        self.assertEqual(replica.proto(), "http")
+        self.assertEqual(replica.port(), 80)
+        self.assertEqual(replica.timeout(), 3)
+        self.assertEqual(replica.startup_enable(), True)
+        self.assertEqual(replica.replicas(), [])
 
     def test_timeout_no_provided(self):
         c_api = ApiConfiguration()
@@ -333,6 +383,36 @@ class TestHttpJobs(unittest.TestCase):
         self.assertEqual(c_jobs.JobsHttp[0].timeout(), 10)
         self.assertEqual(c_jobs.JobsHttp[0].answers(), ["1.1.1.1", "2.2.2.2", "3.3.3.3"])
 
+    def test_http_job_split_timeout(self):
+        """
+        Test behavior of http job parser when connect and read timeouts and budget of cycle are provided
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'timeout/split.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        parser.parse_http()
+
+        self.assertEqual(c_jobs.JobsHttp[0].timeout(), 10)
+        self.assertEqual(c_jobs.JobsHttp[0].connect_timeout(), 2)
+        self.assertEqual(c_jobs.JobsHttp[0].read_timeout(), 5)
+        self.assertEqual(c_jobs.JobsHttp[0].budget(), 8)
+
+    def test_http_job_budget_negative(self):
+        """
+        Test parser behavior when budget of http job is negative
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'timeout/budget_negative.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        with self.assertLogs(level=logging.DEBUG) as captured_logs:
+            parser.parse_http()
+        self.assertEqual(captured_logs.records[0].getMessage(), "Timeout is not valid (value to low)")
+        self.assertEqual(len(c_jobs.JobsHttp), 0)
+
     def test_http_job_auto_port_http(self):
         c_jobs = JobsConfs()
         parser = ConfigParser(file=self.working_directory + 'port/auto_port_http.yml', jobs_confs=c_jobs,
@@ -429,6 +509,105 @@ class TestHttpJobs(unittest.TestCase):
         self.assertEqual(c_jobs.JobsHttp[0].port(), 80)
         self.assertEqual(c_jobs.JobsHttp[0].timeout(), 10)
         self.assertEqual(c_jobs.JobsHttp[0].answers(), ["1.1.1.1", "2.2.2.2", "3.3.3.3"])
+        self.assertEqual(c_jobs.JobsHttp[0].probe_mode(), "ALL")
+        self.assertEqual(c_jobs.JobsHttp[0].min_interval(), 60)
+        self.assertEqual(c_jobs.JobsHttp[0].max_interval(), 60)
+        self.assertEqual(c_jobs.JobsHttp[0].method(), "GET")
+        self.assertEqual(c_jobs.JobsHttp[0].max_body(), 4096)
+        self.assertEqual(c_jobs.JobsHttp[0].connect_timeout(), 10)
+        self.assertEqual(c_jobs.JobsHttp[0].read_timeout(), 10)
+        self.assertEqual(c_jobs.JobsHttp[0].budget(), 0)
+
+    def test_method(self):
+        """
+        Test behavior of http job parser when method and maximum body size are provided
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'method/head.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        parser.parse_http()
+
+        self.assertEqual(c_jobs.JobsHttp[0].method(), "HEAD")
+        self.assertEqual(c_jobs.JobsHttp[0].max_body(), 0)
+
+    def test_method_invalid(self):
+        """
+        Test parser behavior when http method is not supported
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'method/invalid.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        with self.assertLogs(level=logging.DEBUG) as captured_logs:
+            parser.parse_http()
+        self.assertEqual(captured_logs.records[0].getMessage(),
+                         "Http method is not valid (only GET and HEAD are supported)")
+        self.assertEqual(captured_logs.records[1].getMessage(),
+                         "Job for domain: test.com not added, due to invalid parameters")
+        self.assertEqual(len(c_jobs.JobsHttp), 0)
+
+    def test_probe_mode(self):
+        """
+        Test behavior of http job parser when probe mode is provided
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'probe_mode/lazy.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        parser.parse_http()
+
+        self.assertEqual(c_jobs.JobsHttp[0].probe_mode(), "LAZY")
+
+    def test_adaptive_interval(self):
+        """
+        Test behavior of http job parser when minimum and maximum interval are provided
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'interval/adaptive.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        parser.parse_http()
+
+        self.assertEqual(c_jobs.JobsHttp[0].interval(), 30)
+        self.assertEqual(c_jobs.JobsHttp[0].min_interval(), 5)
+        self.assertEqual(c_jobs.JobsHttp[0].max_interval(), 300)
+
+    def test_adaptive_interval_invalid(self):
+        """
+        Test parser behavior when minimum interval of http job is greater than interval
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'interval/adaptive_invalid.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        with self.assertLogs(level=logging.DEBUG) as captured_logs:
+            parser.parse_http()
+        self.assertEqual(captured_logs.records[0].getMessage(),
+                         "Interval range is not valid (min_interval <= interval <= max_interval)")
+        self.assertEqual(captured_logs.records[1].getMessage(),
+                         "Job for domain: test.com not added, due to invalid parameters")
+
+    def test_probe_mode_invalid(self):
+        """
+        Test parser behavior when probe mode of http job is unknown
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'probe_mode/invalid.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        with self.assertLogs(level=logging.DEBUG) as captured_logs:
+            parser.parse_http()
+        self.assertEqual(captured_logs.records[0].getMessage(), "Probe mode is not valid (unknown mode)")
+        self.assertEqual(captured_logs.records[1].getMessage(),
+                         "Job for domain: test.com not added, due to invalid parameters")
+        self.assertEqual(len(c_jobs.JobsHttp), 0)
 
     def test_interval_negative(self):
         """
@@ -816,6 +995,56 @@ class TestPingJobs(unittest.TestCase):
         self.assertEqual(c_jobs.JobsPing[0].timeout(), 2)
         self.assertEqual(c_jobs.JobsPing[0].answers(), ["1.1.1.1", "2.2.2.2", "3.3.3.3"])
         self.assertEqual(c_jobs.JobsPing[0].privileged(), False)
+        self.assertEqual(c_jobs.JobsPing[0].probe_mode(), "ALL")
+        self.assertEqual(c_jobs.JobsPing[0].min_interval(), 60)
+        self.assertEqual(c_jobs.JobsPing[0].max_interval(), 60)
+        self.assertEqual(c_jobs.JobsPing[0].rise(), 1)
+        self.assertEqual(c_jobs.JobsPing[0].fall(), 1)
+        self.assertEqual(c_jobs.JobsPing[0].hold(), 0)
+
+    def test_thresholds(self):
+        """
+        Test behavior of ping job parser when rise, fall and hold are provided
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'thresholds/thresholds.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        parser.parse_ping()
+
+        self.assertEqual(c_jobs.JobsPing[0].rise(), 2)
+        self.assertEqual(c_jobs.JobsPing[0].fall(), 3)
+        self.assertEqual(c_jobs.JobsPing[0].hold(), 120)
+
+    def test_thresholds_invalid(self):
+        """
+        Test parser behavior when fall of ping job is zero
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'thresholds/invalid.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        with self.assertLogs(level=logging.DEBUG) as captured_logs:
+            parser.parse_ping()
+        self.assertEqual(captured_logs.records[0].getMessage(),
+                         "Threshold is not valid (value must be greater or equal to one)")
+        self.assertEqual(captured_logs.records[1].getMessage(),
+                         "Job for domain: test.com not added, due to invalid parameters")
+
+    def test_probe_mode(self):
+        """
+        Test behavior of ping job parser when probe mode is provided
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'probe_mode/race.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        parser.parse_ping()
+
+        self.assertEqual(c_jobs.JobsPing[0].probe_mode(), "RACE")
 
     def test_ping_job_multiple_instances(self):
         """
@@ -1092,6 +1321,86 @@ class TestPingJobs(unittest.TestCase):
                          "Job for domain: test.com not added, due to invalid parameters")
 
 
+class TestTcpJobs(unittest.TestCase):
+    def setUp(self):
+        """
+        Create absolute path to config file directory
+        :return:
+        """
+        self.working_directory = os.getcwd() + "/tests/unit/fixtures/config_files/tcp_job/"
+        self.c_api = ApiConfiguration()
+        self.c_conf = Config()
+
+    def test_tcp_job_all_provided(self):
+        """
+        Test behavior of tcp job parser when all configuration all provided
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'tcp_job.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        parser.parse_tcp()
+
+        self.assertEqual(c_jobs.JobsTcp[0].domain(), "test.com")
+        self.assertEqual(c_jobs.JobsTcp[0].interval(), 44)
+        self.assertEqual(c_jobs.JobsTcp[0].timeout(), 3)
+        self.assertEqual(c_jobs.JobsTcp[0].port(), 22)
+        self.assertEqual(c_jobs.JobsTcp[0].probe_mode(), "LAZY")
+        self.assertEqual(c_jobs.JobsTcp[0].answers(), ["1.1.1.1", "2.2.2.2", "3.3.3.3"])
+
+    def test_tcp_job_all_default(self):
+        """
+        Test behavior of tcp job parser when only necessary configuration options are provided
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'tcp_job_default.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        parser.parse_tcp()
+
+        self.assertEqual(c_jobs.JobsTcp[0].interval(), 60)
+        self.assertEqual(c_jobs.JobsTcp[0].timeout(), 2)
+        self.assertEqual(c_jobs.JobsTcp[0].probe_mode(), "ALL")
+        self.assertEqual(c_jobs.JobsTcp[0].min_interval(), 60)
+        self.assertEqual(c_jobs.JobsTcp[0].max_interval(), 60)
+        self.assertEqual(c_jobs.JobsTcp[0].rise(), 1)
+        self.assertEqual(c_jobs.JobsTcp[0].fall(), 1)
+        self.assertEqual(c_jobs.JobsTcp[0].hold(), 0)
+        self.assertEqual(c_jobs.JobsTcp[0].budget(), 0)
+
+    def test_port_zero(self):
+        """
+        Test parser behavior when port of tcp job is zero
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'port/zero.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        with self.assertLogs(level=logging.DEBUG) as captured_logs:
+            parser.parse_tcp()
+        self.assertEqual(captured_logs.records[0].getMessage(), "Tcp port is not valid (out of range)")
+        self.assertEqual(captured_logs.records[1].getMessage(),
+                         "Job for domain: test.com not added, due to invalid parameters")
+        self.assertEqual(len(c_jobs.JobsTcp), 0)
+
+    def test_no_port(self):
+        """
+        Test parser behavior when port of tcp job is missing, tcp job has no default port
+        :return:
+        """
+        c_jobs = JobsConfs()
+        parser = ConfigParser(file=self.working_directory + 'port/no_port.yml', jobs_confs=c_jobs,
+                              api_confs=self.c_api, confs=self.c_conf)
+        parser.get_configs()
+        with self.assertLogs(level=logging.DEBUG) as captured_logs:
+            parser.parse_tcp()
+        self.assertEqual(captured_logs.records[0].getMessage(), "Error in config file, tcp_jobs KeyError")
+        self.assertEqual(len(c_jobs.JobsTcp), 0)
+
+
 class TestStaticEntry(unittest.TestCase):
     def setUp(self):
         """
@@ -1255,6 +1564,92 @@ class TestConfig(unittest.TestCase):
         self.assertEqual(c_conf.log_level(), False)
         self.assertEqual(c_conf.log_file(), "N/A")
         self.assertEqual(c_conf.entry_exist(), "KEEP")
+        self.assertEqual(c_conf.write_mode(), "DIRECT")
+        self.assertEqual(c_conf.reconcile_interval(), 10)
+        self.assertEqual(c_conf.reconcile_workers(), 4)
+        self.assertEqual(c_conf.write_spacing(), 1.0)
+        self.assertEqual(c_conf.probe_cache(), False)
+        self.assertEqual(c_conf.batch_ping(), False)
+        self.assertEqual(c_conf.probe_pool(), False)
+        self.assertEqual(c_conf.async_http(), False)
+        self.assertEqual(c_conf.http_concurrency(), 1000)
+        self.assertEqual(c_conf.stagger(), False)
+        self.assertEqual(c_conf.jitter(), 0.0)
+        self.assertEqual(c_conf.drift_check(), 300)
+
+    def test_write_mode_reconcile(self):
+        """
+        Test behavior of method parse_config() when reconciler is configured
+        :return:
+        """
+        c_conf = Config()
+        parser = ConfigParser(file=self.working_directory + 'write_mode/reconcile.yml', jobs_confs=self.c_jobs,
+                              api_confs=self.c_api, confs=c_conf)
+        parser.get_configs()
+        parser.parse_config()
+
+        self.assertEqual(c_conf.write_mode(), "RECONCILE")
+        self.assertEqual(c_conf.reconcile_interval(), 5)
+        self.assertEqual(c_conf.reconcile_workers(), 2)
+
+    def test_write_mode_queue(self):
+        """
+        Test behavior of method parse_config() when write queue is configured
+        :return:
+        """
+        c_conf = Config()
+        parser = ConfigParser(file=self.working_directory + 'write_mode/queue.yml', jobs_confs=self.c_jobs,
+                              api_confs=self.c_api, confs=c_conf)
+        parser.get_configs()
+        parser.parse_config()
+
+        self.assertEqual(c_conf.write_mode(), "QUEUE")
+        self.assertEqual(c_conf.write_spacing(), 0.5)
+        self.assertEqual(c_conf.probe_cache(), True)
+        self.assertEqual(c_conf.batch_ping(), True)
+        self.assertEqual(c_conf.probe_pool(), True)
+        self.assertEqual(c_conf.async_http(), True)
+        self.assertEqual(c_conf.http_concurrency(), 500)
+        self.assertEqual(c_conf.stagger(), True)
+        self.assertEqual(c_conf.jitter(), 3)
+        self.assertEqual(c_conf.drift_check(), 120)
+
+    def test_write_mode_invalid(self):
+        """
+        Test behavior of method parse_config() when reconciler configuration is invalid, defaults should be used
+        :return:
+        """
+        c_conf = Config()
+        parser = ConfigParser(file=self.working_directory + 'write_mode/invalid.yml', jobs_confs=self.c_jobs,
+                              api_confs=self.c_api, confs=c_conf)
+        parser.get_configs()
+        with self.assertLogs(level=logging.DEBUG) as captured_logs:
+            parser.parse_config()
+
+        self.assertEqual(captured_logs.records[0].getMessage(), "Write mode is not valid (unknown mode)")
+        self.assertEqual(c_conf.write_mode(), "DIRECT")
+        self.assertEqual(c_conf.reconcile_interval(), 10)
+        self.assertEqual(c_conf.reconcile_workers(), 4)
+        self.assertEqual(c_conf.write_spacing(), 1.0)
+        self.assertEqual(c_conf.jitter(), 0.0)
+        self.assertEqual(c_conf.drift_check(), 300)
+        self.assertEqual(c_conf.http_concurrency(), 1000)
+
+    def test_write_spacing_zero(self):
+        """
+        Test behavior of method parse_config() when write spacing is zero, default should be used
+        :return:
+        """
+        c_conf = Config()
+        parser = ConfigParser(file=self.working_directory + 'write_mode/zero_spacing.yml', jobs_confs=self.c_jobs,
+                              api_confs=self.c_api, confs=c_conf)
+        parser.get_configs()
+        with self.assertLogs(level=logging.DEBUG) as captured_logs:
+            parser.parse_config()
+
+        self.assertEqual(captured_logs.records[0].getMessage(), "Write spacing is not valid (value to low)")
+        self.assertEqual(c_conf.write_mode(), "QUEUE")
+        self.assertEqual(c_conf.write_spacing(), 1.0)
 
     def test_section_name_only(self):
         """
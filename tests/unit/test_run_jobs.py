@@ -4,7 +4,8 @@ from logging import DEBUG
 from app.run_jobs import TestHosts
 from app.api.connector import ApiConnector
 from app.data.api_configuration import ApiConfiguration
-from app.data.jobs_configurations import JobsConfs
+from app.data.jobs_configurations import JobsConfs, JobTcp
+from app.jobs import tcp
 from app.data.config import Config
 
 
@@ -160,5 +161,34 @@ class TestHost(unittest.TestCase):
         self.api_correct.delete_entry(domain='test-host.lan', answer="2.2.2.2")
 
 
+class StatsConnector:
+    """
+    Api connector which only reports statistics
+    """
+    def stats(self) -> list:
+        return [{"target": "http://127.0.0.1:80", "breaker": "closed", "rejected": 2}]
+
+
+class TestStatsReport(unittest.TestCase):
+    def test_report_stats(self):
+        test_hosts = TestHosts(api_connector=StatsConnector(), config_configs=Config(), jobs_confs=JobsConfs())
+        job = tcp.Test(config=JobTcp(interval=60, timeout=1, domain="test.lan", answers=["127.0.0.1"], port=80,
+                                     fall=2),
+                       api_connect=None)
+        job.count_timeout(seconds=1)
+        job.update_statuses(statuses=[True])
+        job.update_statuses(statuses=[False])
+        job.update_statuses(statuses=[False])
+        test_hosts.tasks.append(job)
+
+        with self.assertLogs(level="DEBUG") as captured_logs:
+            test_hosts.report_stats()
+        messages = [record.getMessage() for record in captured_logs.records]
+        self.assertEqual(messages[-3:], [
+            "Jobs: 0 overruns, maximum lag 0.0s (test.lan), 1 timeouts, 0 over budget, 1 answer changes suppressed",
+            "Job test.lan: interval 60s, 0 overruns, lag 0.0s, 1 timeouts (1.0s), 0 over budget, 1 suppressed",
+            "Api http://127.0.0.1:80: breaker closed, 2 requests rejected"])
+
+
 if __name__ == "__main__":
     unittest.main()
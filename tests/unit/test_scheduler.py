@@ -0,0 +1,111 @@
+import asyncio
+import threading
+import unittest
+
+from app.api.reconciler import Reconciler
+from app.data.jobs_configurations import JobPing, JobStaticEntry
+from app.jobs import ping, static_entry
+from app.jobs.pacing import Pacing
+from app.scheduler import Scheduler
+
+
+class CountingJob:
+    """
+    Minimal job, counts cycles
+    """
+    def __init__(self, domain: str, interval: float):
+        self.domain = domain
+        self.pacing = Pacing(domain=domain, interval=interval)
+        self.cycles = 0
+
+    def async_cycle(self, executor):
+        self.cycles += 1
+        return asyncio.sleep(0)
+
+
+class SlowJob(CountingJob):
+    async def async_cycle(self, executor):
+        self.cycles += 1
+        await asyncio.sleep(0.15)
+
+
+class FailingJob(CountingJob):
+    async def async_cycle(self, executor):
+        self.cycles += 1
+        raise RuntimeError("test")
+
+
+class TestScheduler(unittest.TestCase):
+    def test_jobs_run_on_interval(self):
+        scheduler = Scheduler(workers=2)
+        fast = CountingJob(domain="fast.lan", interval=0.05)
+        slow = CountingJob(domain="slow.lan", interval=10)
+        scheduler.add(job=fast)
+        scheduler.add(job=slow)
+        asyncio.run(scheduler.run(duration=0.3))
+
+        self.assertGreaterEqual(fast.cycles, 4)
+        self.assertEqual(slow.cycles, 1)
+        self.assertEqual(len(scheduler), 2)
+
+    def test_overrun_not_back_to_back(self):
+        """
+        job which takes longer than interval waits whole interval after every test
+        """
+        scheduler = Scheduler(workers=1)
+        job = SlowJob(domain="slow.lan", interval=0.1)
+        scheduler.add(job=job)
+        with self.assertLogs(level="WARNING"):
+            asyncio.run(scheduler.run(duration=0.65))
+        # one test per 0.25 s (0.15 s test + 0.1 s interval)
+        self.assertEqual(job.cycles, 3)
+        self.assertGreaterEqual(job.pacing.overruns, 2)
+
+    def test_delay(self):
+        scheduler = Scheduler(workers=1)
+        job = CountingJob(domain="test.lan", interval=0.05)
+        scheduler.add(job=job, delay=10)
+        asyncio.run(scheduler.run(duration=0.1))
+        self.assertEqual(job.cycles, 0)
+
+    def test_failing_job_rescheduled(self):
+        scheduler = Scheduler(workers=1)
+        job = FailingJob(domain="test.lan", interval=0.05)
+        scheduler.add(job=job)
+        with self.assertLogs() as captured_logs:
+            asyncio.run(scheduler.run(duration=0.2))
+        self.assertGreaterEqual(job.cycles, 2)
+        self.assertEqual(captured_logs.records[0].getMessage(), "Test of test.lan failed: RuntimeError('test')")
+
+    def test_many_jobs_one_thread(self):
+        scheduler = Scheduler(workers=2)
+        jobs = [CountingJob(domain=f"test{i}.lan", interval=60) for i in range(1000)]
+        for job in jobs:
+            scheduler.add(job=job)
+        threads = threading.active_count()
+        asyncio.run(scheduler.run(duration=0.2))
+        self.assertEqual(sum([job.cycles for job in jobs]), 1000)
+        self.assertLessEqual(threading.active_count(), threads)
+
+    def test_real_jobs(self):
+        """
+        ping job to loopback (privileged ping, needs root) and static entry publishing to reconciler
+        """
+        reconciler = Reconciler(api_connect=None, interval=10, workers=1)
+        c_ping = JobPing(interval=10, count=1, timeout=1, domain="ping.lan", answers=["127.0.0.1"], privileged=True)
+        c_static = JobStaticEntry(interval=10, domain="static.lan", answer="1.1.1.1")
+        ping_job = ping.Test(config=c_ping, api_connect=None, writer=reconciler)
+        static_job = static_entry.Test(config=c_static, api_connect=None, writer=reconciler)
+
+        scheduler = Scheduler(workers=2)
+        scheduler.add(job=ping_job)
+        scheduler.add(job=static_job)
+        asyncio.run(scheduler.run(duration=0.5))
+
+        self.assertEqual(static_job.writer._desired["static.lan"], ("1.1.1.1", False))
+        if ping_job.hosts_statuses == [True]:
+            self.assertEqual(reconciler._desired["ping.lan"], ("127.0.0.1", True))
+
+
+if __name__ == "__main__":
+    unittest.main()
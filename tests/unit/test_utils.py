@@ -6,6 +6,7 @@ from app.utils import parse_value_with_default
 from app.utils import check_linux_permissions
 from app.utils import parse_logging_level
 from app.utils import match_port_to_protocol
+from app.utils import parse_version
 
 
 class CheckProtocolSlashed(unittest.TestCase):
@@ -183,5 +184,22 @@ class MatchPortToProtocol(unittest.TestCase):
         self.assertEqual(match_port_to_protocol(proto="tests"), 80)
 
 
+class ParseVersion(unittest.TestCase):
+    def test_release(self):
+        self.assertEqual(parse_version(version="v0.107.33"), (0, 107, 33))
+
+    def test_no_prefix(self):
+        self.assertEqual(parse_version(version="0.107.33"), (0, 107, 33))
+
+    def test_pre_release(self):
+        self.assertEqual(parse_version(version="v0.108.0-b.1"), (0, 108, 0))
+
+    def test_not_a_version(self):
+        self.assertEqual(parse_version(version="edge"), ())
+
+    def test_not_a_string(self):
+        self.assertEqual(parse_version(version=None), ())
+
+
 if __name__ == '__main__':
     unittest.main()